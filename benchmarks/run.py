@@ -0,0 +1,302 @@
+"""Benchmark suite for pyransac.
+
+This script times find_inliers, find_inliers_custom and the Line2D
+primitives on seeded synthetic scenes of 2D lines among uniform
+outliers, over a grid of point counts, outlier ratios, noise levels and
+line counts. For every case it records the best time of a few repeats,
+the throughput in hypotheses and points scored per second and the peak
+memory allocated while the case runs.
+
+Results can be written to a JSON file and compared with a stored
+baseline from an earlier run on the same machine. A case regresses if
+its throughput drops or its peak memory grows by more than the
+tolerance, and the script then exits with status 1.
+
+Usage::
+
+    python -m benchmarks.run --quick --output baseline.json
+    python -m benchmarks.run --quick --baseline baseline.json
+    python -m benchmarks.run --sizes 1000000 10000000 --filter find_inliers
+
+Everything runs offline on the CPU.
+"""
+
+# Standard library imports
+import argparse
+import itertools
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from math import radians, tan
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Third party imports
+import numpy as np
+
+# Local application imports
+from pyransac.line2d import Line2D, PointCloud2D
+from pyransac.ransac import RansacParams, find_inliers, find_inliers_custom
+from pyransac.stats import RansacStats
+
+SIZES = (10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7)
+QUICK_SIZES = (10 ** 3, 10 ** 4, 10 ** 5)
+OUTLIER_RATIOS = (0.2, 0.5, 0.8)
+NOISE_LEVELS = (0.1, 1.)
+LINE_COUNTS = (1, 3)
+
+# Scenes span a square of this width, with lines at these angles in degrees
+EXTENT = 1000.
+LINE_ANGLES = (20., 50., -30.)
+LINE_SPACING = 150.
+
+# Inliers are within this many noise standard deviations of their line
+THRESHOLD_SCALE = 3.
+ITERATIONS = 200
+CONFIDENCE = 0.999
+
+# Number of hypotheses and points used by calc_errors_batch
+BATCH_MODELS = 16
+BATCH_POINTS = 10 ** 6
+
+# Peak memory differences below this many bytes are never regressions
+MEMORY_SLACK = 1 << 20
+
+
+@dataclass
+class Scene:
+    """Synthetic scene of 2D lines among uniform outliers.
+
+    """
+    size: int
+    """Number of points."""
+
+    outlier_ratio: float
+    """Ratio of outliers among the points."""
+
+    noise: float
+    """Standard deviation of the inliers' offsets from their line."""
+
+    lines: int
+    """Number of lines."""
+
+    cloud: PointCloud2D
+    """Points of the scene."""
+
+    @property
+    def name(self) -> str:
+        """Gets the name of the scene used in case names.
+
+        :return: name of the scene
+        """
+        return f'n={self.size},outliers={self.outlier_ratio},noise={self.noise},lines={self.lines}'
+
+
+def make_scene(size: int, outlier_ratio: float, noise: float, lines: int) -> Scene:
+    """Make a seeded synthetic scene.
+
+    The same parameters always give the same points. Inliers are split
+    evenly between the lines, which cross the middle of the scene at the
+    angles in LINE_ANGLES, LINE_SPACING apart.
+
+    :param size: number of points
+    :param outlier_ratio: ratio of outliers among the points
+    :param noise: standard deviation of the inliers' offsets from their line
+    :param lines: number of lines (at most len(LINE_ANGLES))
+    :return: scene with shuffled points
+    """
+    rng = np.random.default_rng([size, round(outlier_ratio * 1000), round(noise * 1000), lines])
+    inliers = size - round(size * outlier_ratio)
+
+    x = rng.uniform(0, EXTENT, size)
+    y = rng.uniform(0, EXTENT, size)
+    for k, points in enumerate(np.array_split(np.arange(inliers), lines)):
+        offset = EXTENT / 2 + LINE_SPACING * (k - (lines - 1) / 2)
+        slope = tan(radians(LINE_ANGLES[k]))
+        y[points] = offset + slope * (x[points] - EXTENT / 2) + rng.normal(0, noise, len(points))
+
+    order = rng.permutation(size)
+    return Scene(size, outlier_ratio, noise, lines, PointCloud2D(x[order], y[order]))
+
+
+def make_cases(scene: Scene) -> Dict[str, Tuple[Callable[[], int], int]]:
+    """Make the benchmark cases of a scene.
+
+    :param scene: scene to run the cases on
+    :return: dictionary from case name to a function running the case once
+        and returning the number of hypotheses it scored, and the number of
+        points each hypothesis is scored against
+    """
+    cloud = scene.cloud
+    threshold = THRESHOLD_SCALE * scene.noise
+    params = RansacParams(samples=2, iterations=ITERATIONS, confidence=CONFIDENCE, threshold=threshold,
+                          expected_angle=LINE_ANGLES[0], seed=0)
+    stats = RansacStats()
+
+    def run_find_inliers() -> int:
+        find_inliers(cloud, Line2D(), params, stats=stats)
+        return stats.hypotheses_scored
+
+    def run_find_inliers_custom() -> int:
+        find_inliers_custom(cloud, Line2D(), params, stats=stats)
+        return stats.hypotheses_scored
+
+    line = Line2D()
+    line.make_model([cloud[0], cloud[1]])
+    batch_points = cloud[:BATCH_POINTS]
+    samples = np.random.default_rng(0).integers(len(cloud), size=(BATCH_MODELS, 2))
+    models = line.make_models(cloud, samples)
+    errors = np.empty(len(cloud))
+
+    def run_calc_errors() -> int:
+        line.calc_errors(cloud, out=errors)
+        return 1
+
+    def run_calc_errors_batch() -> int:
+        line.calc_errors_batch(models, batch_points)
+        return BATCH_MODELS
+
+    def run_fit() -> int:
+        Line2D().fit(cloud)
+        return 1
+
+    return {'find_inliers': (run_find_inliers, len(cloud)),
+            'find_inliers_custom': (run_find_inliers_custom, len(cloud)),
+            'Line2D.calc_errors': (run_calc_errors, len(cloud)),
+            'Line2D.calc_errors_batch': (run_calc_errors_batch, len(batch_points)),
+            'Line2D.fit': (run_fit, len(cloud))}
+
+
+def measure(run: Callable[[], int], points: int, repeats: int) -> Dict[str, float]:
+    """Measure one benchmark case.
+
+    The case is timed repeats times, and run once more under tracemalloc,
+    which tracks NumPy allocations, to find its peak memory.
+
+    :param run: function running the case once
+    :param points: number of points each hypothesis is scored against
+    :param repeats: number of timed runs
+    :return: dictionary of the best time in seconds, the number of
+        hypotheses scored, throughputs and peak memory in bytes
+    """
+    seconds = np.inf
+    for _ in range(repeats):
+        start = time.perf_counter()
+        hypotheses = run()
+        seconds = min(seconds, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    seconds = max(seconds, 1e-9)
+    return {'seconds': seconds,
+            'hypotheses': hypotheses,
+            'hypotheses_per_second': hypotheses / seconds,
+            'points_per_second': hypotheses * points / seconds,
+            'peak_bytes': peak}
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            tolerance: float) -> List[str]:
+    """Compare benchmark results with a baseline.
+
+    :param results: dictionary from case name to measurements
+    :param baseline: dictionary from case name to baseline measurements
+    :param tolerance: largest allowed relative loss of throughput or
+        growth of peak memory
+    :return: list of descriptions of the regressions
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+
+        expected = baseline[name]
+        if result['points_per_second'] < expected['points_per_second'] / (1 + tolerance):
+            regressions.append(f'{name}: {result["points_per_second"]:.3g} points/s, '
+                               f'baseline {expected["points_per_second"]:.3g}')
+        if result['peak_bytes'] > expected['peak_bytes'] * (1 + tolerance) + MEMORY_SLACK:
+            regressions.append(f'{name}: peak {result["peak_bytes"]} bytes, '
+                               f'baseline {expected["peak_bytes"]}')
+
+    return regressions
+
+
+def run_benchmarks(sizes: Sequence[int], case_filter: Optional[str] = None,
+                   repeats: int = 3) -> Dict[str, Dict[str, float]]:
+    """Run the benchmarks over the grid of scenes.
+
+    :param sizes: point counts of the scenes
+    :param case_filter: only run cases whose name contains this text
+    :param repeats: number of timed runs of each case
+    :return: dictionary from case name to measurements
+    """
+    results = {}
+    for size, outlier_ratio, noise, lines in itertools.product(sizes, OUTLIER_RATIOS, NOISE_LEVELS,
+                                                               LINE_COUNTS):
+        scene = make_scene(size, outlier_ratio, noise, lines)
+        for case, (run, points) in make_cases(scene).items():
+            name = f'{case}[{scene.name}]'
+            if case_filter is not None and case_filter not in name:
+                continue
+
+            results[name] = measure(run, points, repeats)
+            print(f'{name}: {results[name]["seconds"] * 1000:.2f} ms, '
+                  f'{results[name]["hypotheses_per_second"]:.3g} hypotheses/s, '
+                  f'{results[name]["points_per_second"]:.3g} points/s, '
+                  f'peak {results[name]["peak_bytes"] / 2 ** 20:.1f} MiB', flush=True)
+
+    return results
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run the benchmark suite from the command line.
+
+    :param argv: command line arguments (defaults to sys.argv)
+    :return: exit status, 1 if any case regressed
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+', help='point counts of the scenes')
+    parser.add_argument('--quick', action='store_true', help=f'only use point counts {QUICK_SIZES}')
+    parser.add_argument('--filter', help='only run cases whose name contains this text')
+    parser.add_argument('--repeats', type=int, default=3, help='number of timed runs of each case')
+    parser.add_argument('--output', help='JSON file to write the results to')
+    parser.add_argument('--baseline', help='JSON file of results to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='largest allowed relative regression (default 0.25)')
+    args = parser.parse_args(argv)
+
+    sizes = args.sizes or (QUICK_SIZES if args.quick else SIZES)
+    results = run_benchmarks(sizes, args.filter, args.repeats)
+
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump({'machine': {'python': platform.python_version(), 'numpy': np.__version__,
+                                   'platform': platform.platform(), 'processor': platform.processor()},
+                       'cases': results}, fh, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)['cases']
+
+        missing = sorted(set(results) - set(baseline))
+        if missing:
+            print(f'{len(missing)} cases are not in the baseline')
+
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f'REGRESSION {regression}', file=sys.stderr)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
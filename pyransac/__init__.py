@@ -7,3 +7,25 @@ only need to import from pyransac.
 # Local application imports
 from pyransac.ransac import RansacParams
 from pyransac.ransac import find_inliers
+from pyransac.ransac import find_inliers_batched
+from pyransac.parallel import find_inliers_parallel
+from pyransac.aio import find_inliers_async
+from pyransac.aio import find_inliers_custom_async
+from pyransac.mapped import find_inliers_mapped
+from pyransac.mapped import map_npy
+from pyransac.mapped import map_raw
+from pyransac.multi import find_lines_jlinkage
+from pyransac.multi import find_multiple_lines
+from pyransac.sampling import AngularSampler
+from pyransac.sampling import NapsacSampler
+from pyransac.sampling import ProsacSampler
+from pyransac.verification import SprtVerifier
+from pyransac.verification import TddVerifier
+from pyransac.scoring import MagsacScorer
+from pyransac.scoring import MlesacScorer
+from pyransac.scoring import MsacScorer
+from pyransac.streaming import StreamingRansac
+from pyransac.stats import RansacStats
+from pyransac.optimization import GraphCutOptimizer
+from pyransac.optimization import LeastSquaresOptimizer
+from pyransac.grid import GridIndex
@@ -0,0 +1,91 @@
+"""Asynchronous random sample consensus (RANSAC) module.
+
+This module contains coroutines that run RANSAC in an executor, so that
+an asyncio event loop keeps serving other tasks while lines are fitted.
+"""
+
+# Standard library imports
+import asyncio
+from concurrent.futures import Executor
+import functools
+import threading
+from typing import Callable, List, Optional
+
+# Local application imports
+from pyransac.base import Model
+from pyransac.ransac import RansacParams, find_inliers, find_inliers_custom
+
+
+async def find_inliers_async(points: List, model: Model, params: RansacParams,
+                             timeout: Optional[float] = None,
+                             executor: Optional[Executor] = None, **kwargs):
+    """Find the inliers from a data set without blocking the event loop.
+
+    Runs find_inliers in an executor thread. If timeout seconds pass
+    before it finishes, the search is stopped before its next hypothesis
+    and the best inliers found so far are returned. If the coroutine is
+    cancelled, the search is stopped the same way and its result is
+    discarded.
+
+    :param points: data points to evaluate
+    :param model: type of model to which the data should adhere (it must
+        not be used by other tasks until the coroutine returns)
+    :param params: parameters for the RANSAC algorithm
+    :param timeout: optional time budget in seconds
+    :param executor: thread-based executor to run the search in
+        (defaults to the event loop's default executor)
+    :param kwargs: further arguments of find_inliers, e.g. sampler or stats
+    :return: inliers, as returned by find_inliers
+    """
+    return await _run_stoppable(find_inliers, points, model, params, timeout, executor, kwargs)
+
+
+async def find_inliers_custom_async(points: List, model: Model, params: RansacParams,
+                                    timeout: Optional[float] = None,
+                                    executor: Optional[Executor] = None, **kwargs):
+    """Find the top models of a data set without blocking the event loop.
+
+    Runs find_inliers_custom in an executor thread, stopping it on a
+    timeout or cancellation like find_inliers_async.
+
+    :param points: data points to evaluate
+    :param model: type of model to which the data should adhere (it must
+        not be used by other tasks until the coroutine returns)
+    :param params: parameters for the RANSAC algorithm
+    :param timeout: optional time budget in seconds
+    :param executor: thread-based executor to run the search in
+        (defaults to the event loop's default executor)
+    :param kwargs: further arguments of find_inliers_custom, e.g. sampler
+    :return: list of (performance, sample points, supporters) tuples, as
+        returned by find_inliers_custom
+    """
+    return await _run_stoppable(find_inliers_custom, points, model, params, timeout, executor,
+                                kwargs)
+
+
+async def _run_stoppable(function: Callable, points, model: Model, params: RansacParams,
+                         timeout: Optional[float], executor: Optional[Executor], kwargs: dict):
+    """Run a RANSAC function in an executor until it finishes or is stopped.
+
+    :param function: RANSAC function accepting a stop event
+    :param points: data points to evaluate
+    :param model: type of model to which the data should adhere
+    :param params: parameters for the RANSAC algorithm
+    :param timeout: optional time budget in seconds
+    :param executor: thread-based executor to run the function in
+    :param kwargs: further arguments of the function
+    :return: result of the function
+    """
+    loop = asyncio.get_running_loop()
+    stop = threading.Event()
+    future = loop.run_in_executor(executor, functools.partial(function, points, model, params,
+                                                              stop=stop, **kwargs))
+    try:
+        done, _ = await asyncio.wait({future}, timeout=timeout)
+        if not done:
+            stop.set()
+
+        return await future
+    finally:
+        # Stop the search if the caller was cancelled while waiting
+        stop.set()
@@ -5,7 +5,11 @@ This module contains definitions for base classes.
 
 # Standard library imports
 import abc
-from typing import List
+import copy
+from typing import List, Optional
+
+# Third party imports
+import numpy as np
 
 
 class Model(abc.ABC):
@@ -27,3 +31,92 @@ class Model(abc.ABC):
 
         :param point: data point to test against
         """
+
+    def is_degenerate(self, points: List) -> bool:
+        """Checks whether a minimal sample cannot make a valid model.
+
+        Called before make_model so that invalid samples are rejected
+        cheaply. The default implementation accepts every sample.
+
+        :param points: list of sampled data points
+        :return: True if the sample should be rejected, False if not
+        """
+        return False
+
+    def prepare_points(self, points):
+        """Converts data points into the form accepted by calc_errors.
+
+        Called once per RANSAC run so that a model can convert its input
+        into a vectorised representation up front. The default
+        implementation returns the points unchanged.
+
+        :param points: list of data points
+        :return: data points in the form accepted by calc_errors
+        """
+        return points
+
+    def calc_errors(self, points, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Calculates errors between many data points and model.
+
+        The default implementation calls calc_error once per data point.
+        Models should override it with a vectorised implementation where
+        possible, storing the errors in out if it is given so that callers
+        can reuse one array for many hypotheses.
+
+        :param points: data points as returned by prepare_points
+        :param out: optional array of length N to store the errors in
+        :return: array of errors, one per data point
+        """
+        errors = np.fromiter((self.calc_error(point) for point in points),
+                             dtype=float, count=len(points))
+        if out is None:
+            return errors
+
+        out[...] = errors
+        return out
+
+    def make_models(self, points, samples: np.ndarray) -> List:
+        """Makes one model per minimal sample.
+
+        The default implementation copies this model and calls make_model
+        on each copy. Models should override it with a vectorised
+        implementation where possible, returning any representation
+        accepted by calc_errors_batch.
+
+        :param points: data points as returned by prepare_points
+        :param samples: (K, S) array of indexes into points
+        :return: collection of K models
+        """
+        models = []
+        for sample in samples:
+            model = copy.copy(self)
+            model.make_model([points[i] for i in sample])
+            models.append(model)
+
+        return models
+
+    def calc_errors_batch(self, models, points) -> np.ndarray:
+        """Calculates errors between many data points and many models.
+
+        :param models: collection of models as returned by make_models
+        :param points: data points as returned by prepare_points
+        :return: (K, N) array of errors, one row per model
+        """
+        errors = np.stack([model.calc_errors(points) for model in models])
+        return errors.reshape(len(models), len(points))
+
+
+def _take(points, indices: np.ndarray):
+    """Select data points by index.
+
+    Lists and tuples produce a new list, while array-backed containers
+    such as PointCloud2D are indexed directly with the index array.
+
+    :param points: data points to select from
+    :param indices: array of indexes to select
+    :return: selected data points
+    """
+    if isinstance(points, (list, tuple)):
+        return [points[i] for i in indices]
+
+    return points[indices]
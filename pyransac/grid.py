@@ -0,0 +1,199 @@
+"""Spatial index module.
+
+This module contains a uniform grid over 2D points that finds the
+supporters of a line by only looking at the cells its corridor crosses.
+"""
+
+# Standard library imports
+import math
+from typing import List, Optional, Tuple, Union
+
+# Third party imports
+import numpy as np
+
+# Local application imports
+from pyransac.line2d import Line2D, Point2D, PointCloud2D, _coordinates
+
+# Relative slack added to the corridor so that rounding cannot drop a cell
+CORRIDOR_SLACK = 1e-9
+
+
+class GridIndex:
+    """Uniform grid index for scoring 2D lines.
+
+    The points supporting a line with threshold t all lie in a corridor
+    of width 2t around it. The grid finds the cells the corridor crosses,
+    one column (or row, for steep lines) at a time, and calculates exact
+    errors with the line's calc_errors only for the points in those
+    cells. Points are stored sorted by cell both column by column and
+    row by row, so the crossed cells of each column or row are one
+    contiguous range and the cost of scoring grows with the number of
+    points near the line rather than with the number of points.
+    """
+
+    def __init__(self, cell_size: Optional[float] = None):
+        """
+        :param cell_size: width of the square grid cells (defaults to a
+            size giving about one point per cell, but no more cells along
+            either axis than there are points)
+        """
+        self.cell_size = cell_size
+
+        self._x = np.empty(0)
+        self._y = np.empty(0)
+        self._origin = (0., 0.)
+        self._size = 1.
+        self._shape = (0, 0)
+        self._by_column = None
+        self._by_row = None
+
+    def reset(self, data: Union[PointCloud2D, np.ndarray, List[Point2D]]) -> None:
+        """
+            Builds the grid over a set of points.
+
+            :param data: point cloud, (N, 2) array or list of data points
+            :return: None
+        """
+        self._x, self._y = _coordinates(data)
+        if len(self._x) == 0:
+            self._shape = (0, 0)
+            return
+
+        x_0, y_0 = self._x.min(), self._y.min()
+        width, height = self._x.max() - x_0, self._y.max() - y_0
+
+        size = self.cell_size
+        if size is None:
+            # Thin, axis-aligned clouds would otherwise get far more cells than points
+            size = max(math.sqrt(width * height / len(self._x)), max(width, height) / len(self._x))
+        size = size or 1.
+
+        columns = int(width // size) + 1
+        rows = int(height // size) + 1
+        column = np.minimum(((self._x - x_0) // size).astype(np.intp), columns - 1)
+        row = np.minimum(((self._y - y_0) // size).astype(np.intp), rows - 1)
+
+        self._origin = (float(x_0), float(y_0))
+        self._size = float(size)
+        self._shape = (columns, rows)
+        self._by_column = _sort_cells(column * rows + row, columns * rows)
+        self._by_row = _sort_cells(row * columns + column, columns * rows)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """
+            Gets the number of columns and rows of the grid.
+
+            :return: tuple of the numbers of columns and rows
+        """
+        return self._shape
+
+    def support_indices(self, model: Line2D, threshold: float) -> np.ndarray:
+        """
+            Finds the indexes of the points that support a line.
+
+            The result is the same as comparing model.calc_errors of every
+            point with the threshold.
+
+            :param model: line to find the supporters of
+            :param threshold: error threshold to consider a point an inlier
+            :return: sorted array of indexes of the supporting points
+        """
+        order, positions = self._candidates(model, threshold)
+        if len(positions) == 0:
+            return np.empty(0, dtype=np.intp)
+
+        candidates = order[positions]
+        cloud = PointCloud2D(self._x[candidates], self._y[candidates], dtype=self._x.dtype)
+        errors = model.calc_errors(cloud)
+        return np.sort(candidates[errors <= threshold])
+
+    def _candidates(self, model: Line2D, threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+            Finds the points in the cells crossed by a line's corridor.
+
+            :param model: line whose corridor to search
+            :param threshold: half the width of the corridor
+            :return: cell ordering of the points and positions in it of the
+                candidate points
+        """
+        columns, rows = self._shape
+        a, b, c = _line_coefficients(model)
+        if columns == 0 or not (math.isfinite(a) and math.isfinite(b) and math.isfinite(c)):
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+
+        x_0, y_0 = self._origin
+        if abs(b) >= abs(a):
+            # Sweep the columns, finding the rows the corridor crosses in each
+            order, starts = self._by_column
+            lanes, cells = columns, rows
+            c = c + a * x_0 + b * y_0
+        else:
+            # Sweep the rows of steep lines, with x and y swapped
+            order, starts = self._by_row
+            lanes, cells = rows, columns
+            a, b, c = b, a, c + b * y_0 + a * x_0
+
+        half_width = (threshold * (1 + CORRIDOR_SLACK)
+                      + CORRIDOR_SLACK * self._size * (lanes + cells))
+        edges = np.arange(lanes + 1) * self._size
+        across = -(a * edges + c) / b
+        low = np.minimum(across[:-1], across[1:]) - half_width / abs(b)
+        high = np.maximum(across[:-1], across[1:]) + half_width / abs(b)
+
+        first = np.clip(np.floor(low / self._size), 0, cells).astype(np.intp)
+        last = np.clip(np.floor(high / self._size), -1, cells - 1).astype(np.intp)
+
+        lane = np.arange(lanes) * cells
+        begin = starts[lane + first]
+        end = starts[lane + np.maximum(last + 1, first)]
+        return order, _concatenate_ranges(begin, end)
+
+
+def _sort_cells(cells: np.ndarray, count: int):
+    """
+        Sorts points by cell number.
+
+        :param cells: cell number of each point
+        :param count: number of cells
+        :return: order of the points and the position in it of the start
+            of each cell, followed by the number of points
+    """
+    order = np.argsort(cells, kind='stable')
+    starts = np.zeros(count + 1, dtype=np.intp)
+    np.cumsum(np.bincount(cells, minlength=count), out=starts[1:])
+    return order, starts
+
+
+def _concatenate_ranges(begin: np.ndarray, end: np.ndarray) -> np.ndarray:
+    """
+        Concatenates the integer ranges [begin, end) without a Python loop.
+
+        :param begin: first value of each range
+        :param end: stop value of each range
+        :return: array of every value in the ranges
+    """
+    lengths = np.maximum(end - begin, 0)
+    total = int(lengths.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.intp)
+
+    offsets = np.repeat(begin - np.cumsum(lengths) + lengths, lengths)
+    return offsets + np.arange(total)
+
+
+def _line_coefficients(model: Line2D) -> Tuple[float, float, float]:
+    """
+        Gets the normalised coefficients (a, b, c) of a * x + b * y + c = 0.
+
+        :param model: line with a slope
+        :return: tuple of coefficients with a ** 2 + b ** 2 = 1
+    """
+    if model.slope is None:
+        raise ValueError('Line has no model to search for')
+
+    if math.isnan(model.slope):
+        return 1., 0., -model.x_int
+
+    norm = math.sqrt(model.slope ** 2 + 1)
+    return model.slope / norm, -1 / norm, model.y_int / norm
@@ -7,9 +7,11 @@ This module contains the model for a 2-dimensional line.
 from __future__ import annotations
 from dataclasses import dataclass
 import math
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple, Union
 from scipy import spatial
-import itertools
+
+# Third party imports
+import numpy as np
 
 # Local application imports
 from pyransac.base import Model
@@ -42,6 +44,143 @@ class Point2D:
         return hash((self.x, self.y, self.index))
 
 
+class PointCloud2D:
+    """
+    Array-backed collection of 2-dimensional points.
+
+    Coordinates are stored in contiguous float64 x and y arrays, with an
+    optional integer index column referring to each point's place in its
+    original list. Indexing with an integer returns a Point2D, while slices
+    return views and index arrays return compact copies.
+
+    Clouds can also be stored as float32, which halves their size and the
+    memory traffic of calculating errors where that precision is enough.
+    """
+
+    def __init__(self, x, y, index=None, dtype=np.float64):
+        dtype = np.dtype(dtype)
+        if dtype not in (np.float32, np.float64):
+            raise ValueError(f'Coordinates must be float32 or float64, not {dtype}')
+
+        self._x = np.ascontiguousarray(x, dtype=dtype)
+        self._y = np.ascontiguousarray(y, dtype=dtype)
+        self._index = None if index is None else np.ascontiguousarray(index, dtype=np.intp)
+
+        if self._x.ndim != 1 or self._x.shape != self._y.shape:
+            raise ValueError('x and y must be one-dimensional arrays of equal length')
+
+        if self._index is not None and self._index.shape != self._x.shape:
+            raise ValueError('index must have the same length as x and y')
+
+    @classmethod
+    def from_points(cls, points: List[Point2D]) -> PointCloud2D:
+        """
+            Converts a list of Point2D objects into a point cloud.
+
+            The index column is kept only if every point has an index.
+
+            :param points: list of data points
+            :return: point cloud containing the same points
+        """
+        x = np.fromiter((point.x for point in points), dtype=np.float64, count=len(points))
+        y = np.fromiter((point.y for point in points), dtype=np.float64, count=len(points))
+
+        index = None
+        if points and all(point.index is not None for point in points):
+            index = np.fromiter((point.index for point in points), dtype=np.intp, count=len(points))
+
+        return cls(x, y, index)
+
+    @classmethod
+    def from_array(cls, array: np.ndarray, index=None, dtype=np.float64) -> PointCloud2D:
+        """
+            Converts an (N, 2) array of x and y coordinates into a point cloud.
+
+            :param array: (N, 2) array of coordinates
+            :param index: optional array of original indexes
+            :param dtype: coordinate type (float64 or float32)
+            :return: point cloud containing the same points
+        """
+        array = _xy_array(array, dtype)
+        return cls(array[:, 0], array[:, 1], index, dtype)
+
+    @property
+    def x(self) -> np.ndarray:
+        """
+            Gets the x coordinates of the points.
+
+            :return: array of x coordinates
+        """
+        return self._x
+
+    @property
+    def y(self) -> np.ndarray:
+        """
+            Gets the y coordinates of the points.
+
+            :return: array of y coordinates
+        """
+        return self._y
+
+    @property
+    def dtype(self) -> np.dtype:
+        """
+            Gets the type of the coordinates.
+
+            :return: float64 or float32 dtype
+        """
+        return self._x.dtype
+
+    @property
+    def index(self) -> Optional[np.ndarray]:
+        """
+            Gets the original indexes of the points.
+
+            :return: integer array of indexes (None if the cloud has no index column)
+        """
+        return self._index
+
+    def __len__(self) -> int:
+        return len(self._x)
+
+    def __getitem__(self, item) -> Union[Point2D, PointCloud2D]:
+        if isinstance(item, (int, np.integer)):
+            index = None if self._index is None else int(self._index[item])
+            return Point2D(float(self._x[item]), float(self._y[item]), index)
+
+        index = None if self._index is None else self._index[item]
+        return PointCloud2D(self._x[item], self._y[item], index, self.dtype)
+
+    def __iter__(self) -> Iterator[Point2D]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def astype(self, dtype) -> PointCloud2D:
+        """
+            Converts the point cloud to another coordinate type.
+
+            :param dtype: coordinate type (float64 or float32)
+            :return: point cloud with the same points and indexes
+        """
+        return PointCloud2D(self._x, self._y, self._index, dtype)
+
+    def to_array(self) -> np.ndarray:
+        """
+            Gets the points as an (N, 2) array of x and y coordinates.
+
+            :return: (N, 2) array with the cloud's coordinate type
+        """
+        return np.column_stack((self._x, self._y))
+
+    def to_points(self) -> List[Point2D]:
+        """
+            Converts the point cloud back into a list of Point2D objects.
+
+            :return: list of data points
+        """
+        return list(self)
+
+
 class Line2D(Model):
     """
         Model for a 2-dimensional line.
@@ -125,6 +264,47 @@ class Line2D(Model):
             return True
         return False
 
+    def is_duplicate(self, other, threshold: float = 0) -> bool:
+        """
+            Checks if two lines are the same within a threshold.
+
+            Lines are compared by the sine of the angle between them and by
+            the difference of their perpendicular distances from the origin.
+            Unlike the intercepts compared by equals_within_threshold, both
+            stay finite for horizontal and vertical lines.
+
+            :param other: line to compare with
+            :param threshold: maximum sine of the angle and difference of the
+                              distances
+            :return: True if the lines are the same within the threshold, False if not.
+        """
+        if not isinstance(other, Line2D) or self.slope is None or other.slope is None:
+            return False
+
+        angle, offset = self._normal_form()
+        other_angle, other_offset = other._normal_form()
+
+        # Normals more than 90 degrees apart point in opposite directions
+        difference = angle - other_angle
+        if math.cos(difference) < 0:
+            difference += math.pi
+            other_offset = -other_offset
+
+        return abs(math.sin(difference)) <= threshold and abs(offset - other_offset) <= threshold
+
+    def _normal_form(self) -> Tuple[float, float]:
+        """
+            Gets the line's direction and signed distance from the origin.
+
+            :return: tuple of the angle of the line in radians and the offset
+                     of the line along its normal (-sin(angle), cos(angle))
+        """
+        if math.isnan(self.slope):
+            return math.pi / 2, -self.x_int
+
+        angle = math.atan(self.slope)
+        return angle, self.y_int * math.cos(angle)
+
     def update_slope(self, points: List[Point2D]) -> None:
         """
             Updates the slope of the model using the given points as a basis
@@ -140,55 +320,57 @@ class Line2D(Model):
         """
             Calculates which pair of points are the furthest apart in the input set
 
-            Calculates a convex hull first because the furthest apart points must be on the convex
-            hull.
+            Two points are returned as they are, without building a hull.
 
-            Then iterates through the points on the convex hull to find which pair are the furthest
-            apart.
+            Otherwise a convex hull is calculated first because the furthest apart points must be
+            on the convex hull, and its diameter is found with rotating calipers in time linear in
+            the number of hull vertices.
 
-            :param points: list of data points - assumed they are approximately in a line but 
-                           will work with any set of points
-            :return: list containing two points that are the furthest apart of all the input points
+            :param points: list of data points or point cloud - assumed they are approximately in
+                           a line but will work with any set of points
+            :return: list containing two of the input points (with their original indexes) that
+                     are the furthest apart of all the input points
         """
-        furthest_points = []
-        if len(set(points)) < 2:
-            raise ValueError(f"Need at least two distinct points to calculate the furthest apart points")
-
-        elif len(points) > 2:
-            primitive_points = [[point.x, point.y] for point in points]
+        if len(points) < 2:
+            raise ValueError("Need at least two distinct points to calculate the "
+                             "furthest apart points")
 
-            # Find the convex hull of the list of points as the furthest apart points must
-            # be in the convex hull
-            try:
-                convex_hull_indices = spatial.ConvexHull(primitive_points).vertices
-            except spatial._qhull.QhullError:
+        if len(points) == 2:
+            if points[0] == points[1]:
+                raise ValueError("Need at least two distinct points to calculate the "
+                                 "furthest apart points")
 
-                # This error is thrown if the points are all perfectly on the same line
-                # In this case, the furthest points don't matter because the slope will
-                # be the same no matter what points are used to calculate it
-                # Cast to a set first to avoid returning duplicate points
-                # Sorted to ensure the same result if run multiple times
-                return sorted(list(set(points)))[:2]
+            return [points[0], points[1]]
 
-            max_distance = 0
+        x, y = _coordinates(points)
+        moved = np.flatnonzero((x != x[0]) | (y != y[0]))
 
-            # Iterate over all combinations of the points on the convex hull
-            for i, j in itertools.product(convex_hull_indices, convex_hull_indices):
-                # Find the euclidean distance between the points
-                distance = math.dist(primitive_points[i], primitive_points[j])
+        if len(moved) == 0:
+            # All points share one position, so only their indexes can tell them apart
+            if len(set(points)) < 2:
+                raise ValueError("Need at least two distinct points to calculate the "
+                                 "furthest apart points")
 
-                # Update the furthest apart points
-                if distance > max_distance:
-                    max_distance = distance
-                    furthest_points = [primitive_points[i], primitive_points[j]]
+            return sorted(list(set(points)))[:2]
 
-            # Convert points back to a list of Point2D objects
-            furthest_points = [Point2D(point[0], point[1]) for point in furthest_points]
-
-        elif len(points) == 2:
-            furthest_points = points
-
-        return furthest_points
+        # Find the convex hull of the list of points as the furthest apart points must
+        # be in the convex hull
+        try:
+            convex_hull_indices = spatial.ConvexHull(np.column_stack((x, y))).vertices
+        except spatial._qhull.QhullError:
+
+            # This error is thrown if the points are all perfectly on the same line
+            # In this case, the furthest points don't matter because the slope will
+            # be the same no matter what points are used to calculate it
+            # The lowest point in (x, y) order and the next lowest point at a different
+            # position are returned to ensure the same result if run multiple times
+            order = np.lexsort((y, x))
+            first = order[0]
+            second = order[np.argmax((x[order] != x[first]) | (y[order] != y[first]))]
+            return [points[first], points[second]]
+
+        i, j = _hull_diameter(x[convex_hull_indices].tolist(), y[convex_hull_indices].tolist())
+        return [points[convex_hull_indices[i]], points[convex_hull_indices[j]]]
 
     def calculate_slope(self, points: List[Point2D]) -> float:
         """
@@ -210,6 +392,19 @@ class Line2D(Model):
                  (furthest_points[0].x - furthest_points[1].x))
         return slope
 
+    def is_degenerate(self, points: List[Point2D]) -> bool:
+        """
+            Checks whether the sampled points are all at the same position.
+
+            A line cannot be made through a single position, even if the
+            points have different indexes.
+
+            :param points: list of sampled data points
+            :return: True if fewer than two distinct positions were sampled
+        """
+        first = points[0]
+        return all(point.x == first.x and point.y == first.y for point in points[1:])
+
     def make_model(self, points: List[Point2D]) -> None:
         """
             Makes equation for 2D line given two data points.
@@ -256,3 +451,197 @@ class Line2D(Model):
 
         return abs(point.y - self._y_int - self._slope * point.x) / math.sqrt(
             self._slope ** 2 + 1)
+
+    def fit(self, points: Union[PointCloud2D, np.ndarray, List[Point2D]]) -> None:
+        """
+            Fits the line to many data points by orthogonal (total least squares) regression.
+
+            The line passes through the centroid of the points along their principal direction,
+            minimising the sum of squared perpendicular distances that calc_error measures.
+
+            :param points: point cloud, (N, 2) array or list of data points (at least 2)
+            :return: None
+        """
+        x, y = _coordinates(points)
+        if len(x) < 2:
+            raise ValueError(f'Need at least 2 points to fit line, not {len(x)}')
+
+        x_mean = x.mean()
+        y_mean = y.mean()
+        dx = x - x_mean
+        dy = y - y_mean
+        sxx = np.dot(dx, dx)
+        syy = np.dot(dy, dy)
+        sxy = np.dot(dx, dy)
+
+        if sxy == 0 and sxx < syy:
+            self._slope = math.nan
+            self._angle = self.get_angle(self._slope)
+            self._y_int = math.nan
+            self._x_int = float(x_mean)
+            return
+
+        self._slope = math.tan(0.5 * math.atan2(2 * sxy, sxx - syy))
+        self._angle = self.get_angle(self._slope)
+        self._y_int = float(y_mean - self._slope * x_mean)
+
+        try:
+            self._x_int = -1 * self._y_int / self._slope
+        except ZeroDivisionError:
+            self._x_int = math.nan
+
+    def prepare_points(self, points: Union[List[Point2D], PointCloud2D]) -> PointCloud2D:
+        """
+            Converts data points into a point cloud accepted by calc_errors.
+
+            :param points: list of data points, an (N, 2) array or a point cloud
+            :return: point cloud containing the same points
+        """
+        if isinstance(points, PointCloud2D):
+            return points
+
+        if isinstance(points, np.ndarray):
+            return PointCloud2D.from_array(points)
+
+        return PointCloud2D.from_points(points)
+
+    def calc_errors(self, points: Union[PointCloud2D, np.ndarray],
+                    out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+            Calculate errors between many data points and 2D model.
+
+            The errors are calculated in place in a single array, in the
+            coordinates' type (float32 for float32 point clouds), so a
+            preallocated out array makes the calculation allocation-free.
+
+            :param points: point cloud, (N, 2) array of x and y coordinates or
+                           list of data points
+            :param out: optional array of length N to store the errors in
+            :return: array of calculated errors, one per data point
+        """
+        x, y = _coordinates(points)
+        if out is None:
+            out = np.empty(len(x), dtype=np.result_type(x, y, np.float32))
+
+        if self._slope == 0:
+            np.subtract(y, self._y_int, out=out)
+        elif math.isnan(self._slope):
+            np.subtract(x, self._x_int, out=out)
+        else:
+            np.multiply(x, self._slope, out=out)
+            np.subtract(y, out, out=out)
+            out -= self._y_int
+            out /= math.sqrt(self._slope ** 2 + 1)
+
+        return np.abs(out, out=out)
+
+    def make_models(self, points: PointCloud2D, samples: np.ndarray) -> np.ndarray:
+        """
+            Makes one line per pair of sampled points in vectorised form.
+
+            Each line is returned as normalised coefficients (a, b, c) of
+            a * x + b * y + c = 0 with a ** 2 + b ** 2 = 1, which handles
+            vertical lines without special cases. Samples made from two
+            coincident points produce NaN coefficients and support no points.
+
+            :param points: point cloud as returned by prepare_points
+            :param samples: (K, 2) array of indexes into points
+            :return: (K, 3) array of line coefficients
+        """
+        x, y = _coordinates(points)
+        samples = np.asarray(samples)
+        x_1, y_1 = x[samples[:, 0]], y[samples[:, 0]]
+        x_2, y_2 = x[samples[:, 1]], y[samples[:, 1]]
+
+        length = np.hypot(x_2 - x_1, y_2 - y_1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            a = (y_2 - y_1) / length
+            b = (x_1 - x_2) / length
+
+        return np.column_stack((a, b, -(a * x_1 + b * y_1)))
+
+    def calc_errors_batch(self, models: np.ndarray, points: PointCloud2D) -> np.ndarray:
+        """
+            Calculate errors between many data points and many 2D lines.
+
+            :param models: (K, 3) array of line coefficients from make_models
+            :param points: point cloud or (N, 2) array of x and y coordinates
+            :return: (K, N) array of calculated errors, one row per line
+        """
+        x, y = _coordinates(points)
+        models = np.asarray(models, dtype=np.float64)
+
+        errors = np.multiply.outer(models[:, 0], x)
+        errors += np.multiply.outer(models[:, 1], y)
+        errors += models[:, 2, np.newaxis]
+        return np.abs(errors, out=errors)
+
+
+def _hull_diameter(x: List[float], y: List[float]):
+    """
+        Finds the two furthest apart vertices of a convex polygon with rotating calipers.
+
+        For each edge the calipers advance to the vertex furthest from that edge, so every
+        antipodal pair of vertices is checked once.
+
+        :param x: x coordinates of the polygon's vertices in counterclockwise order
+        :param y: y coordinates of the polygon's vertices in counterclockwise order
+        :return: tuple of the positions of the two furthest apart vertices
+    """
+    count = len(x)
+
+    def area(i, j, k):
+        return abs((x[j] - x[i]) * (y[k] - y[i]) - (y[j] - y[i]) * (x[k] - x[i]))
+
+    def distance(i, j):
+        return (x[i] - x[j]) ** 2 + (y[i] - y[j]) ** 2
+
+    furthest = (0, 1)
+    max_distance = distance(0, 1)
+    k = 1
+
+    for i in range(count):
+        j = (i + 1) % count
+        while area(i, j, (k + 1) % count) > area(i, j, k):
+            k = (k + 1) % count
+
+        for vertex in (i, j):
+            if distance(vertex, k) > max_distance:
+                max_distance = distance(vertex, k)
+                furthest = (vertex, k)
+
+    return furthest
+
+
+def _coordinates(points: Union[PointCloud2D, np.ndarray, List[Point2D]]):
+    """
+        Gets the x and y coordinate arrays of the given points.
+
+        :param points: point cloud, (N, 2) array of x and y coordinates or
+                       list of data points
+        :return: tuple of x and y arrays
+    """
+    if isinstance(points, PointCloud2D):
+        return points.x, points.y
+
+    if isinstance(points, (list, tuple)) and points and isinstance(points[0], Point2D):
+        points = PointCloud2D.from_points(points)
+        return points.x, points.y
+
+    points = _xy_array(points)
+    return points[:, 0], points[:, 1]
+
+
+def _xy_array(array, dtype=np.float64) -> np.ndarray:
+    """
+        Converts an array of x and y coordinates into an (N, 2) array.
+
+        :param array: (N, 2) array of x and y coordinates (or an empty array)
+        :param dtype: coordinate type
+        :return: (N, 2) array of coordinates
+    """
+    array = np.asarray(array, dtype=dtype)
+    if array.size and array.shape[-1] != 2:
+        raise ValueError(f'Need 2 coordinates per point, not {array.shape[-1]}')
+
+    return array.reshape(-1, 2)
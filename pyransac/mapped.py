@@ -0,0 +1,209 @@
+"""Memory-mapped random sample consensus (RANSAC) module.
+
+This module contains loaders that memory-map point files larger than
+memory as read-only arrays, and a version of RANSAC that scores
+hypotheses over such arrays in fixed-size chunks.
+"""
+
+# Standard library imports
+import os
+from typing import Optional, Union
+
+# Third party imports
+import numpy as np
+
+# Local application imports
+from pyransac.base import Model
+from pyransac.ransac import RansacParams, _finish_run, _iteration_bound, _make_hypothesis
+from pyransac.ransac import _out_of_time, _too_few_points
+from pyransac.sampling import Sampler, UniformSampler
+from pyransac.stats import RansacStats
+
+# Number of points scored at once by find_inliers_mapped
+MAPPED_CHUNK_SIZE = 2 ** 20
+
+PathLike = Union[str, os.PathLike]
+
+
+def map_raw(path: PathLike, dtype=np.float32, columns: int = 2, offset: int = 0) -> np.ndarray:
+    """Memory-map a raw binary file of points as a read-only array.
+
+    The file holds the coordinates of each point one after the other,
+    e.g. x0 y0 x1 y1 ... for 2D points, in the machine's byte order.
+    Nothing is read until the array is accessed.
+
+    :param path: path of the file
+    :param dtype: type of the coordinates (float32 or float64)
+    :param columns: number of coordinates per point
+    :param offset: number of bytes to skip at the start of the file
+    :return: read-only (N, columns) memory-mapped array
+    """
+    dtype = np.dtype(dtype)
+    if dtype not in (np.float32, np.float64):
+        raise ValueError(f'Coordinates must be float32 or float64, not {dtype}')
+
+    size = os.path.getsize(path) - offset
+    if size < 0 or size % (dtype.itemsize * columns):
+        raise ValueError(f'{path} does not hold whole points of {columns} {dtype} coordinates')
+
+    return np.memmap(path, dtype=dtype, mode='r', offset=offset,
+                     shape=(size // (dtype.itemsize * columns), columns))
+
+
+def map_npy(path: PathLike) -> np.ndarray:
+    """Memory-map a .npy file of points as a read-only array.
+
+    :param path: path of the file, holding an (N, D) float32 or float64 array
+    :return: read-only (N, D) memory-mapped array
+    """
+    array = np.load(path, mmap_mode='r')
+    if array.ndim != 2 or array.dtype not in (np.float32, np.float64):
+        raise ValueError(f'{path} does not hold a two-dimensional float32 or float64 array')
+
+    return array
+
+
+def find_inliers_mapped(points: np.ndarray, model: Model, params: RansacParams,
+                        sampler: Optional[Sampler] = None,
+                        chunk_size: int = MAPPED_CHUNK_SIZE,
+                        stats: Optional[RansacStats] = None) -> np.ndarray:
+    """Find the inliers from an array of points too large for memory.
+
+    Works like find_inliers on an (N, D) array such as those returned by
+    map_raw and map_npy. Minimal samples are read from the array one at a
+    time, so sampling only touches the pages holding the sampled points.
+    Each hypothesis is scored by converting chunk_size points at a time
+    with model.prepare_points, so at most one chunk of converted points
+    and errors is in memory at once.
+
+    :param points: (N, D) array of data points
+    :param model: type of model to which the data should adhere
+    :param params: parameters for the RANSAC algorithm
+    :param sampler: sampler to draw minimal samples with (defaults to
+        uniform sampling). It is reset with points itself.
+    :param chunk_size: number of points to score at once
+    :param stats: optional statistics to fill in about the run
+    :return: sorted array of the positions of the inliers in points
+    """
+    if stats is not None:
+        stats.reset()
+
+    inliers = np.empty(0, dtype=np.intp)
+    max_support = 0
+    best_sample = None
+    iterations = params.iterations
+    i = 0
+
+    if _too_few_points(points, params, stats):
+        return inliers
+
+    rng = params.make_rng()
+    deadline = params.make_deadline()
+    sampler = UniformSampler() if sampler is None else sampler
+    sampler.reset(points, params.samples, rng)
+    work = np.empty(min(chunk_size, len(points)))
+    if stats is not None:
+        stats.lap('setup')
+
+    while i < iterations:
+        if _out_of_time(deadline, stats):
+            break
+
+        sample_points = _make_hypothesis(sampler, _SamplePoints(points, model), model, stats)
+        if sample_points is None:
+            i += 1
+            continue
+
+        support = 0
+        for start in range(0, len(points), chunk_size):
+            errors = _chunk_errors(model, points, start, chunk_size, work)
+            support += np.count_nonzero(errors <= params.threshold)
+        if stats is not None:
+            stats.hypotheses_scored += 1
+            stats.lap('scoring')
+
+        if support > max_support:
+            max_support = support
+            best_sample = sample_points
+            iterations = _iteration_bound(support, len(points), params)
+            if stats is not None:
+                stats.best_support.append((i, support))
+
+            # Only find the supporters again if the sampler uses them
+            if iterations and type(sampler).max_iterations is not Sampler.max_iterations:
+                supporters = _supporters(model, points, params.threshold, chunk_size, work)
+                iterations = min(iterations, sampler.max_iterations(supporters, params.confidence))
+
+        i += 1
+
+    if best_sample is not None:
+        model.make_model(best_sample)
+        inliers = _supporters(model, points, params.threshold, chunk_size, work)
+
+    _finish_run(stats, len(points), params, i)
+
+    return inliers
+
+
+class _SamplePoints:
+    """Data points of an array, read and converted one at a time.
+
+    Lets find_inliers_mapped draw samples with ransac._make_hypothesis without
+    converting the whole array with model.prepare_points.
+    """
+    def __init__(self, points: np.ndarray, model: Model):
+        """
+        :param points: (N, D) array of data points
+        :param model: model whose prepare_points converts the points
+        """
+        self._points = points
+        self._model = model
+
+    def __len__(self) -> int:
+        """Gets the number of data points.
+
+        :return: number of data points
+        """
+        return len(self._points)
+
+    def __getitem__(self, index: int):
+        """Reads and converts one data point.
+
+        :param index: position of the data point
+        :return: data point in the form accepted by the model
+        """
+        return self._model.prepare_points(np.asarray(self._points[index:index + 1]))[0]
+
+
+def _chunk_errors(model: Model, points: np.ndarray, start: int, chunk_size: int,
+                  work: np.ndarray) -> np.ndarray:
+    """Calculate the errors of one chunk of points.
+
+    :param model: model to calculate the errors of
+    :param points: (N, D) array of data points
+    :param start: position of the first point of the chunk
+    :param chunk_size: number of points per chunk
+    :param work: array of at least chunk_size elements to store errors in
+    :return: view of work holding the errors of the chunk
+    """
+    chunk = model.prepare_points(np.asarray(points[start:start + chunk_size]))
+    return model.calc_errors(chunk, out=work[:len(chunk)])
+
+
+def _supporters(model: Model, points: np.ndarray, threshold: float, chunk_size: int,
+                work: np.ndarray) -> np.ndarray:
+    """Find the positions of the points supporting a model, chunk by chunk.
+
+    :param model: model to find the supporters of
+    :param points: (N, D) array of data points
+    :param threshold: error threshold to consider data point an inlier
+    :param chunk_size: number of points per chunk
+    :param work: array of at least chunk_size elements to store errors in
+    :return: sorted array of the positions of the supporters
+    """
+    supporters = [np.empty(0, dtype=np.intp)]
+    for start in range(0, len(points), chunk_size):
+        errors = _chunk_errors(model, points, start, chunk_size, work)
+        supporters.append(np.flatnonzero(errors <= threshold) + start)
+
+    return np.concatenate(supporters)
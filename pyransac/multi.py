@@ -0,0 +1,333 @@
+"""Multiple model random sample consensus (RANSAC) module.
+
+This module contains versions of RANSAC that find several 2D lines in
+one data set, either one line at a time or all at once by clustering
+points with similar hypothesis preferences.
+"""
+
+# Standard library imports
+from math import ceil
+from time import monotonic
+from typing import List, Optional, Tuple, Union
+
+# Third party imports
+import numpy as np
+
+# Local application imports
+from pyransac.line2d import Line2D, Point2D, PointCloud2D
+from pyransac.ransac import BATCH_MEMORY_BUDGET, RansacParams
+from pyransac.ransac import _count_support_batch, _iteration_bound
+from pyransac.sampling import _draw_samples
+
+# Number of set bits in each byte value, for NumPy without bitwise_count
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def find_multiple_lines(points: Union[List[Point2D], PointCloud2D], params: RansacParams,
+                        max_models: int, min_support: int, batch_size: int = 64,
+                        memory_budget: int = BATCH_MEMORY_BUDGET
+                        ) -> List[Tuple[Line2D, np.ndarray]]:
+    """Find several lines in a data set by sequential RANSAC.
+
+    Lines are found one at a time, and the inliers of each line are
+    removed before looking for the next one. Removed points are marked in
+    a mask over the original points rather than copied out of them.
+
+    Hypotheses are made and scored batch_size at a time, as in
+    find_inliers_batched, with params.iterations and params.confidence
+    bounding the iterations for each line. The batch_size best
+    hypotheses are kept between lines, and their support is updated by
+    scoring only the removed points against them, so they can be chosen
+    without being rescored against the whole data set.
+
+    The search stops once max_models lines are found, fewer than
+    min_support points remain or no line has min_support supporters.
+    params.time_budget and params.deadline are checked between batches.
+    Once the time is up, the best kept hypothesis becomes the last line
+    if it has min_support supporters.
+
+    :param points: data points to evaluate
+    :param params: parameters for the RANSAC algorithm (params.samples must be 2)
+    :param max_models: maximum number of lines to find
+    :param min_support: minimum number of supporters of a line
+    :param batch_size: number of hypotheses to make and score at once
+    :param memory_budget: maximum size in bytes of each error matrix chunk
+    :return: list of (line, inlier indexes) tuples in the order the lines
+        were found. Inlier indexes are the points' index values if every
+        point has one, or positions in points otherwise.
+    """
+    if params.samples != 2:
+        raise ValueError(f'Need 2 points per sample to make a line, not {params.samples}')
+
+    line = Line2D()
+    cloud = line.prepare_points(points)
+    index = np.arange(len(cloud)) if cloud.index is None else cloud.index
+    alive = np.ones(len(cloud), dtype=bool)
+    remaining = len(cloud)
+    rng = params.make_rng()
+    deadline = params.make_deadline()
+    timed_out = False
+
+    pool_models = np.empty((0, 3))
+    pool_samples = np.empty((0, 2), dtype=np.intp)
+    pool_support = np.empty(0, dtype=np.intp)
+
+    lines = []
+    minimum = max(min_support, params.samples)
+    while len(lines) < max_models and remaining >= minimum and not timed_out:
+        positions = np.flatnonzero(alive)
+        iterations = params.iterations
+        if len(pool_support):
+            iterations = min(iterations, _iteration_bound(pool_support.max(), remaining, params))
+
+        i = 0
+        while i < iterations:
+            if deadline is not None and monotonic() >= deadline:
+                timed_out = True
+                break
+
+            count = min(batch_size, ceil(iterations - i))
+            samples = positions[_draw_samples(rng, remaining, count, params.samples)]
+            models = line.make_models(cloud, samples)
+            support = _count_support_batch(line, models, cloud, params.threshold, memory_budget,
+                                           alive)
+
+            kept = np.argsort(-np.concatenate((pool_support, support)), kind='stable')[:batch_size]
+            pool_models = np.concatenate((pool_models, models))[kept]
+            pool_samples = np.concatenate((pool_samples, samples))[kept]
+            pool_support = np.concatenate((pool_support, support))[kept]
+
+            iterations = min(iterations, _iteration_bound(pool_support.max(), remaining, params))
+            i += count
+
+        best = int(np.argmax(pool_support)) if len(pool_support) else None
+        if best is None or pool_support[best] < min_support:
+            break
+
+        errors = line.calc_errors_batch(pool_models[best:best + 1], cloud)[0]
+        inliers = np.flatnonzero((errors <= params.threshold) & alive)
+
+        model = Line2D()
+        model.make_model([cloud[int(j)] for j in pool_samples[best]])
+        lines.append((model, index[inliers]))
+
+        alive[inliers] = False
+        remaining -= len(inliers)
+
+        # Update the support of the kept hypotheses from the removed points only
+        removed = line.calc_errors_batch(pool_models, cloud[inliers]) <= params.threshold
+        pool_support = pool_support - np.count_nonzero(removed, axis=1)
+
+        kept = pool_support >= min_support
+        pool_models = pool_models[kept]
+        pool_samples = pool_samples[kept]
+        pool_support = pool_support[kept]
+
+    return lines
+
+
+def find_lines_jlinkage(points: Union[List[Point2D], PointCloud2D], params: RansacParams,
+                        min_support: int,
+                        memory_budget: int = BATCH_MEMORY_BUDGET
+                        ) -> List[Tuple[Line2D, np.ndarray]]:
+    """Find several lines in a data set at once by J-linkage clustering.
+
+    A pool of params.iterations hypotheses is made in one batch. Each
+    point's preference set, the hypotheses it supports, is stored as a
+    row of a bit-packed points x hypotheses matrix. Clusters of points
+    are then merged agglomeratively, closest first, where the distance
+    between two clusters is the Jaccard distance of their preference
+    sets and a merged cluster prefers the hypotheses both clusters
+    prefer. Merging stops when no two clusters share a hypothesis, as
+    described by Toldo and Fusiello in "Robust multiple structures
+    estimation with J-linkage". Points that support no hypothesis are
+    left out, and a line is fitted to each cluster of at least
+    min_support points with Line2D.fit.
+
+    params.time_budget and params.deadline are checked between merges.
+    Once the time is up, merging stops and lines are fitted to the
+    clusters merged so far.
+
+    Unlike find_multiple_lines, no line is found before the others, so
+    lines do not take points from their neighbours. Clustering only
+    keeps the nearest cluster of each point's cluster, so its memory use
+    grows linearly with the number of points, but each merge recalculates
+    the distances of the clusters whose nearest cluster was merged.
+
+    :param points: data points to evaluate
+    :param params: parameters for the RANSAC algorithm (params.samples
+        must be 2, and params.iterations is the number of hypotheses)
+    :param min_support: minimum number of points in a line's cluster
+    :param memory_budget: maximum size in bytes of each temporary chunk
+    :return: list of (line, inlier indexes) tuples, largest cluster
+        first. Inlier indexes are the points' index values if every point
+        has one, or positions in points otherwise.
+    """
+    if params.samples != 2:
+        raise ValueError(f'Need 2 points per sample to make a line, not {params.samples}')
+
+    line = Line2D()
+    cloud = line.prepare_points(points)
+    index = np.arange(len(cloud)) if cloud.index is None else cloud.index
+    if len(cloud) < params.samples or params.iterations < 1:
+        return []
+
+    rng = params.make_rng()
+    deadline = params.make_deadline()
+    samples = _draw_samples(rng, len(cloud), params.iterations, params.samples)
+    models = line.make_models(cloud, samples)
+
+    preferences = _preference_matrix(line, models, cloud, params.threshold, memory_budget)
+    members = np.flatnonzero(preferences.any(axis=1))
+    clusters = _jlinkage(preferences[members], memory_budget, deadline)
+
+    lines = []
+    for cluster in sorted(clusters, key=len, reverse=True):
+        if len(cluster) < min_support:
+            break
+
+        inliers = np.sort(members[cluster])
+        model = Line2D()
+        model.fit(cloud[inliers])
+        lines.append((model, index[inliers]))
+
+    return lines
+
+
+def _preference_matrix(line: Line2D, models: np.ndarray, cloud: PointCloud2D,
+                       threshold: float, memory_budget: int) -> np.ndarray:
+    """Make the bit-packed preference matrix of points x hypotheses.
+
+    :param line: line model used to calculate errors
+    :param models: hypotheses as returned by Line2D.make_models
+    :param cloud: data points
+    :param threshold: error threshold to consider data point an inlier
+    :param memory_budget: maximum size in bytes of each error matrix chunk
+    :return: (N, ceil(K / 8)) uint8 array of packed preferences
+    """
+    preferences = np.empty((len(cloud), (len(models) + 7) // 8), dtype=np.uint8)
+    chunk = max(1, memory_budget // (8 * len(models)))
+
+    for start in range(0, len(cloud), chunk):
+        errors = line.calc_errors_batch(models, cloud[start:start + chunk])
+        preferences[start:start + chunk] = np.packbits(errors.T <= threshold, axis=1)
+
+    return preferences
+
+
+def _count_bits(packed: np.ndarray, axis: int) -> np.ndarray:
+    """Count the set bits of packed preference sets.
+
+    :param packed: uint8 array of packed preference sets
+    :param axis: axis along which the sets are packed
+    :return: array of the number of set bits in each set
+    """
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(packed).sum(axis=axis, dtype=np.intp)
+
+    return _POPCOUNT[packed].sum(axis=axis, dtype=np.intp)
+
+
+def _jaccard_distances(preferences: np.ndarray, sizes: np.ndarray, others: np.ndarray,
+                       other_sizes: np.ndarray, memory_budget: int) -> np.ndarray:
+    """Calculate the Jaccard distances between packed preference sets.
+
+    :param preferences: (M, B) packed preference sets
+    :param sizes: number of hypotheses in each of preferences
+    :param others: (N, B) packed preference sets
+    :param other_sizes: number of hypotheses in each of others
+    :param memory_budget: maximum size in bytes of each temporary chunk
+    :return: (M, N) float32 array of distances (1 if both sets are empty)
+    """
+    distances = np.empty((len(preferences), len(others)), dtype=np.float32)
+    chunk = max(1, memory_budget // max(1, others.size))
+
+    for start in range(0, len(preferences), chunk):
+        common = _count_bits(preferences[start:start + chunk, np.newaxis] & others, axis=2)
+        union = sizes[start:start + chunk, np.newaxis] + other_sizes - common
+        with np.errstate(invalid='ignore', divide='ignore'):
+            distances[start:start + chunk] = np.where(union > 0, 1 - common / union, 1)
+
+    return distances
+
+
+def _jlinkage(preferences: np.ndarray, memory_budget: int,
+              deadline: Optional[float] = None) -> List[np.ndarray]:
+    """Cluster points by J-linkage of their packed preference sets.
+
+    Only the nearest cluster of every cluster and its distance are kept.
+    They are recalculated, a chunk of rows at a time, for clusters whose
+    nearest cluster was merged, so memory use grows linearly with the
+    number of points.
+
+    :param preferences: (N, B) packed preference sets of the points
+    :param memory_budget: maximum size in bytes of each temporary chunk
+    :param deadline: optional time.monotonic() value at which to stop merging
+    :return: list of arrays of the row numbers in each cluster
+    """
+    preferences = preferences.copy()
+    sizes = _count_bits(preferences, axis=1)
+    clusters = {i: [i] for i in range(len(preferences))}
+    alive = np.arange(len(preferences))
+    nearest, nearest_distance = _nearest_clusters(preferences, sizes, alive, alive, memory_budget)
+
+    while clusters:
+        if deadline is not None and monotonic() >= deadline:
+            break
+
+        a = int(np.argmin(nearest_distance))
+        if nearest_distance[a] >= 1:
+            break
+
+        b = int(nearest[a])
+        clusters[a].extend(clusters.pop(b))
+        preferences[a] &= preferences[b]
+        sizes[a] = _count_bits(preferences[a], axis=0)
+        nearest_distance[b] = np.inf
+
+        alive = np.fromiter(clusters, dtype=np.intp)
+        row = _jaccard_distances(preferences[a:a + 1], sizes[a:a + 1], preferences[alive],
+                                 sizes[alive], memory_budget)[0]
+        row[alive == a] = np.inf
+        nearest[a] = alive[np.argmin(row)]
+        nearest_distance[a] = row.min()
+
+        stale = alive[((nearest[alive] == a) | (nearest[alive] == b)) & (alive != a)]
+        nearest[stale], nearest_distance[stale] = _nearest_clusters(preferences, sizes, stale,
+                                                                    alive, memory_budget)
+
+        closer = row < nearest_distance[alive]
+        nearest[alive[closer]] = a
+        nearest_distance[alive[closer]] = row[closer]
+
+    return [np.array(cluster, dtype=np.intp) for cluster in clusters.values()]
+
+
+def _nearest_clusters(preferences: np.ndarray, sizes: np.ndarray, rows: np.ndarray,
+                      alive: np.ndarray, memory_budget: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Find the nearest other cluster of some clusters.
+
+    :param preferences: (N, B) packed preference sets of the clusters
+    :param sizes: number of hypotheses in each preference set
+    :param rows: row numbers of the clusters to find the nearest cluster of
+    :param alive: sorted row numbers of the clusters to search
+    :param memory_budget: maximum size in bytes of each temporary chunk
+    :return: row numbers of the nearest clusters and float32 distances to
+        them (inf if there is no other cluster)
+    """
+    nearest = np.zeros(len(rows), dtype=np.intp)
+    nearest_distance = np.full(len(rows), np.inf, dtype=np.float32)
+    if len(alive) < 2:
+        return nearest, nearest_distance
+
+    chunk = max(1, memory_budget // max(1, len(alive) * (preferences.shape[1] + 4)))
+    for start in range(0, len(rows), chunk):
+        block = rows[start:start + chunk]
+        distances = _jaccard_distances(preferences[block], sizes[block], preferences[alive],
+                                       sizes[alive], memory_budget)
+        distances[block[:, np.newaxis] == alive] = np.inf
+        columns = np.argmin(distances, axis=1)
+        nearest[start:start + chunk] = alive[columns]
+        nearest_distance[start:start + chunk] = distances[np.arange(len(block)), columns]
+
+    return nearest, nearest_distance
@@ -0,0 +1,218 @@
+"""Local optimisation module.
+
+This module contains local optimisation (LO-RANSAC) stages that refine
+promising hypotheses on their supporters, as described by Chum, Matas
+and Kittler in "Locally optimized RANSAC".
+"""
+
+# Standard library imports
+import abc
+
+# Third party imports
+import numpy as np
+from scipy import sparse, spatial
+from scipy.sparse import csgraph
+
+# Local application imports
+from pyransac.base import Model, _take
+from pyransac.line2d import _coordinates
+
+# Scale of the integer edge capacities used for minimum cuts
+CUT_SCALE = 1000
+
+
+class LocalOptimizer(abc.ABC):
+    """ABC class for local optimisation stages.
+
+    Derivative classes should extend this class and implement its
+    interface. An optimiser is reset at the start of every RANSAC run and
+    then applied to each new best hypothesis. Optimisers refine the model
+    with a fit(points) method, which fits it to many data points, e.g. by
+    least squares.
+    """
+    def __init__(self):
+        self._data = None
+        self._threshold = 0.
+        self._rng = None
+
+    def reset(self, model: Model, data, threshold: float, rng: np.random.Generator) -> None:
+        """Prepares the optimiser for a RANSAC run.
+
+        :param model: type of model that will be refined
+        :param data: data points as returned by the model's prepare_points
+        :param threshold: error threshold to consider data point an inlier
+        :param rng: random number generator to draw from
+        :raises TypeError: if the model has no fit method
+        """
+        if not callable(getattr(model, 'fit', None)):
+            raise TypeError(f'{type(model).__name__} must implement fit(points) '
+                            'to be used with local optimisation')
+
+        self._data = data
+        self._threshold = threshold
+        self._rng = rng
+
+    @abc.abstractmethod
+    def optimize(self, model: Model, supporters: np.ndarray) -> np.ndarray:
+        """Refines a hypothesis on its supporters.
+
+        The model may be changed in place.
+
+        :param model: hypothesis to refine
+        :param supporters: indexes of the hypothesis' supporters
+        :return: indexes of the inliers of the best refinement found,
+            which are never fewer than the supporters given
+        """
+
+    def select_inliers(self, model: Model, supporters: np.ndarray) -> np.ndarray:
+        """Selects the final inliers among the supporters of the refined model.
+
+        The default implementation keeps every supporter.
+
+        :param model: refined hypothesis
+        :param supporters: indexes of the hypothesis' supporters
+        :return: indexes of the inliers
+        """
+        return supporters
+
+
+class LeastSquaresOptimizer(LocalOptimizer):
+    """Iterated least squares local optimisation.
+
+    Repeatedly fits the model to the current inliers with model.fit and
+    rescores it against every data point, for as long as the number of
+    inliers keeps growing.
+    """
+    def __init__(self, iterations: int = 4):
+        """
+        :param iterations: maximum number of refits per hypothesis
+        """
+        super().__init__()
+        self.iterations = iterations
+
+    def optimize(self, model: Model, supporters: np.ndarray) -> np.ndarray:
+        for _ in range(self.iterations):
+            model.fit(_take(self._data, supporters))
+            inliers = np.flatnonzero(model.calc_errors(self._data) <= self._threshold)
+            if len(inliers) <= len(supporters):
+                break
+
+            supporters = inliers
+
+        return supporters
+
+
+class GraphCutOptimizer(LocalOptimizer):
+    """Graph-cut (GC-RANSAC) local optimisation for 2D data points.
+
+    Labels the data points as inliers or outliers of a hypothesis with a
+    minimum cut, as described by Barath and Matas in "Graph-Cut RANSAC".
+    Each point's cost of being an inlier falls with its error, and
+    neighbouring points with different labels cost spatial_weight /
+    neighbours. The model is then fitted to the points labelled inliers,
+    for as long as its support keeps growing. Spatially isolated
+    supporters are left out of the final inliers.
+
+    The neighbourhood graph of each point's nearest neighbours is built
+    with a k-d tree once per run. Only points within three thresholds of
+    a hypothesis are included in its cut; the rest are fixed as outliers.
+    """
+    def __init__(self, neighbours: int = 8, radius: float = np.inf,
+                 spatial_weight: float = 0.5, iterations: int = 4):
+        """
+        :param neighbours: number of nearest neighbours of each point
+        :param radius: maximum distance between neighbours
+        :param spatial_weight: total cost of a point having a different
+            label from all of its neighbours
+        :param iterations: maximum number of refits per hypothesis
+        """
+        super().__init__()
+        self.neighbours = neighbours
+        self.radius = radius
+        self.spatial_weight = spatial_weight
+        self.iterations = iterations
+
+        self._graph = None
+        self._degree = None
+
+    def reset(self, model: Model, data, threshold: float, rng: np.random.Generator) -> None:
+        super().reset(model, data, threshold, rng)
+
+        points = np.column_stack(_coordinates(data))
+        count = len(points)
+        k = min(self.neighbours + 1, count)
+        _, neighbours = spatial.cKDTree(points).query(points, k=k, distance_upper_bound=self.radius)
+        neighbours = neighbours.reshape(count, k)
+
+        rows = np.repeat(np.arange(count), k)
+        columns = neighbours.ravel()
+        edges = (columns < count) & (columns != rows)
+        graph = sparse.coo_matrix((np.ones(np.count_nonzero(edges), dtype=np.int32),
+                                   (rows[edges], columns[edges])), shape=(count, count)).tocsr()
+
+        # Make the graph symmetric with one edge per pair of neighbours
+        graph = graph.maximum(graph.T).tocsr()
+        self._graph = graph
+        self._degree = np.diff(graph.indptr)
+
+    def optimize(self, model: Model, supporters: np.ndarray) -> np.ndarray:
+        for _ in range(self.iterations):
+            labelled = self._label(model)
+            if len(labelled) < 2:
+                break
+
+            model.fit(_take(self._data, labelled))
+            inliers = np.flatnonzero(model.calc_errors(self._data) <= self._threshold)
+            if len(inliers) <= len(supporters):
+                break
+
+            supporters = inliers
+
+        return supporters
+
+    def select_inliers(self, model: Model, supporters: np.ndarray) -> np.ndarray:
+        return np.intersect1d(supporters, self._label(model), assume_unique=True)
+
+    def _label(self, model: Model) -> np.ndarray:
+        """Labels the data points by a minimum cut of the neighbourhood graph.
+
+        :param model: hypothesis to label the data points of
+        :return: sorted indexes of the points labelled inliers
+        """
+        errors = model.calc_errors(self._data)
+        active = np.flatnonzero(errors < 3 * self._threshold)
+        if len(active) == 0:
+            return active
+
+        similarity = np.exp(-np.square(errors[active]) / (2 * self._threshold ** 2))
+        edge_cost = self.spatial_weight / self.neighbours
+
+        # Inactive neighbours are outliers, so being an inlier cuts their edges
+        subgraph = self._graph[active][:, active].tocsr()
+        fixed = self._degree[active] - np.diff(subgraph.indptr)
+        subgraph = subgraph.tocoo()
+        inlier_cost = 1 - similarity + edge_cost * fixed
+        outlier_cost = similarity
+
+        count = len(active)
+        source, sink = count, count + 1
+        nodes = np.arange(count)
+        rows = np.concatenate((subgraph.row, np.full(count, source), nodes))
+        columns = np.concatenate((subgraph.col, nodes, np.full(count, sink)))
+        capacities = np.concatenate((np.full(subgraph.nnz, edge_cost),
+                                     np.maximum(outlier_cost - inlier_cost, 0),
+                                     np.maximum(inlier_cost - outlier_cost, 0)))
+        capacities = np.round(capacities * CUT_SCALE).astype(np.int32)
+
+        keep = capacities > 0
+        graph = sparse.csr_matrix((capacities[keep], (rows[keep], columns[keep])),
+                                  shape=(count + 2, count + 2))
+        flow = csgraph.maximum_flow(graph, source, sink).flow
+
+        # Inliers are the points still reachable from the source
+        residual = (graph - flow).tocsr()
+        residual.data[residual.data < 0] = 0
+        residual.eliminate_zeros()
+        reachable = csgraph.breadth_first_order(residual, source, directed=True,
+                                                return_predecessors=False)
+        return np.sort(active[reachable[reachable < count]])
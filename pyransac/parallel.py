@@ -0,0 +1,254 @@
+"""Parallel random sample consensus (RANSAC) module.
+
+This module contains a process-pool version of the batched RANSAC
+algorithm. The data points are shared with the worker processes through
+shared memory rather than being pickled for every task.
+"""
+
+# Standard library imports
+from concurrent import futures
+from math import ceil
+from multiprocessing import shared_memory
+import os
+from time import monotonic
+from typing import List, Optional
+
+# Third party imports
+import numpy as np
+
+# Local application imports
+from pyransac.base import Model, _take
+from pyransac.line2d import PointCloud2D
+from pyransac.ransac import BATCH_MEMORY_BUDGET, RansacParams
+from pyransac.ransac import _count_support_batch, _finish_run, _iteration_bound, _sample_source
+from pyransac.ransac import _too_few_points
+from pyransac.sampling import _draw_samples
+from pyransac.stats import RansacStats
+
+_worker_state = {}
+
+
+def find_inliers_parallel(points: List, model: Model, params: RansacParams,
+                          n_workers: Optional[int] = None,
+                          batch_size: int = 64, memory_budget: int = BATCH_MEMORY_BUDGET,
+                          stats: Optional[RansacStats] = None):
+    """Find the inliers from a data set using a pool of worker processes.
+
+    The iteration budget is split into blocks of batch_size hypotheses.
+    Each block draws its samples from its own random stream derived from
+    params.seed and the block number, and blocks are merged in order. The
+    adaptive iteration bound is applied after each merged block, so the
+    result for a given seed does not depend on n_workers. Blocks that
+    finish after the bound has been reached are discarded.
+
+    params.time_budget and params.deadline are only checked between
+    blocks, so a block that has started is never interrupted. Once the
+    time is up, blocks that have not started are cancelled and the
+    inliers of the best hypothesis merged so far are returned. With a
+    time limit, the pool is shut down without waiting for the blocks
+    still running in it, which finish in the background. With a single
+    worker, blocks run in this process and the last one can overrun the
+    time limit by the time taken to score batch_size hypotheses.
+
+    The model's prepare_points must return a PointCloud2D or a NumPy
+    array, which is placed in shared memory for the workers.
+
+    :param points: data points to evaluate
+    :param model: type of model to which the data should adhere
+    :param params: parameters for the RANSAC algorithm
+    :param n_workers: number of worker processes (defaults to the CPU count)
+    :param batch_size: number of hypotheses per block
+    :param memory_budget: maximum size in bytes of each error matrix chunk
+    :param stats: optional statistics to fill in about the run, counting
+        each merged hypothesis as one iteration. Blocks are timed as a
+        whole, under scoring.
+    :return: inliers, as a list for list input or in the input's own
+        array-backed type (e.g. PointCloud2D) otherwise
+    """
+    if stats is not None:
+        stats.reset()
+
+    data = model.prepare_points(points)
+
+    if _too_few_points(points, params, stats):
+        return _take(points, np.empty(0, dtype=np.intp))
+
+    deadline = params.make_deadline()
+    seed = params.seed
+    if isinstance(seed, np.random.Generator):
+        seed = int(seed.integers(2 ** 63))
+
+    entropy = np.random.SeedSequence(seed).entropy
+    blocks = ceil(params.iterations / batch_size)
+    n_workers = n_workers or os.cpu_count() or 1
+
+    state = dict(model=model, data=data, entropy=entropy, samples=params.samples,
+                 threshold=params.threshold, batch_size=batch_size,
+                 iterations=params.iterations, memory_budget=memory_budget)
+
+    if n_workers == 1:
+        results = (_run_block(block, state) for block in range(blocks))
+        best_support, best_sample = _merge_blocks(results, len(points), params, deadline, stats)
+    else:
+        best_support, best_sample = _run_pool(state, blocks, n_workers, len(points), params,
+                                              deadline, stats)
+
+    inliers = np.empty(0, dtype=np.intp)
+    if best_support:
+        source = _sample_source(points, data)
+        model.make_model([source[j] for j in best_sample])
+        errors = model.calc_errors_batch(model.make_models(data, best_sample[np.newaxis]), data)[0]
+        inliers = np.flatnonzero(errors <= params.threshold)
+
+    inliers = _take(points, inliers)
+    if stats is not None:
+        _finish_run(stats, len(points), params, stats.hypotheses_scored)
+
+    return inliers
+
+
+def _run_pool(state: dict, blocks: int, n_workers: int, population: int, params: RansacParams,
+              deadline: Optional[float] = None, stats: Optional[RansacStats] = None):
+    """Evaluate blocks in a process pool and merge them in order.
+
+    At most two blocks per worker are queued ahead of the block being
+    merged, so that little work is wasted once the iteration bound is met
+    or the time is up. If there is a deadline, the pool is shut down
+    without waiting for the blocks still running.
+
+    :param state: worker state shared by every block
+    :param blocks: total number of blocks in the iteration budget
+    :param n_workers: number of worker processes
+    :param population: number of data points
+    :param params: parameters for the RANSAC algorithm
+    :param deadline: optional time.monotonic() value at which to stop
+    :param stats: optional statistics to fill in about the merged blocks
+    :return: best support and the sample that produced it
+    """
+    data = state.pop('data')
+    if isinstance(data, PointCloud2D):
+        array = np.stack((data.x, data.y))
+    else:
+        array = np.asarray(data)
+
+    memory = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+    try:
+        np.ndarray(array.shape, dtype=array.dtype, buffer=memory.buf)[...] = array
+        shape = dict(name=memory.name, shape=array.shape, dtype=array.dtype.str,
+                     cloud=isinstance(data, PointCloud2D))
+
+        executor = futures.ProcessPoolExecutor(n_workers, initializer=_init_worker,
+                                               initargs=(state, shape))
+        pending = [executor.submit(_run_block, block)
+                   for block in range(min(blocks, 2 * n_workers))]
+        submitted = len(pending)
+
+        def results():
+            nonlocal submitted
+            while pending:
+                try:
+                    result = pending[0].result(None if deadline is None
+                                               else max(0., deadline - monotonic()))
+                except futures.TimeoutError:
+                    return
+
+                pending.pop(0)
+                if submitted < blocks:
+                    pending.append(executor.submit(_run_block, submitted))
+                    submitted += 1
+                yield result
+
+        try:
+            return _merge_blocks(results(), population, params, deadline, stats)
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=deadline is None)
+    finally:
+        memory.close()
+        memory.unlink()
+
+
+def _merge_blocks(results, population: int, params: RansacParams, deadline: Optional[float] = None,
+                  stats: Optional[RansacStats] = None):
+    """Merge block results in order until the iteration bound is met
+    or the time is up.
+
+    :param results: iterable of (hypotheses, support, sample) block results
+    :param population: number of data points
+    :param params: parameters for the RANSAC algorithm
+    :param deadline: optional time.monotonic() value at which to stop
+    :param stats: optional statistics to fill in about the merged blocks
+    :return: best support and the sample that produced it
+    """
+    best_support = 0
+    best_sample = None
+    iterations = params.iterations
+    done = 0
+    if stats is not None:
+        stats.lap('setup')
+
+    for count, support, sample in results:
+        if support > best_support:
+            best_support = support
+            best_sample = sample
+            iterations = _iteration_bound(best_support, population, params)
+            if stats is not None:
+                stats.best_support.append((done, support))
+
+        done += count
+        if stats is not None:
+            stats.hypotheses_generated += count
+            stats.hypotheses_scored += count
+            stats.lap('scoring')
+
+        if done >= iterations:
+            break
+
+        if deadline is not None and monotonic() >= deadline:
+            break
+
+    if stats is not None:
+        stats.timed_out = done < iterations and deadline is not None and monotonic() >= deadline
+
+    return best_support, best_sample
+
+
+def _init_worker(state: dict, shape: dict) -> None:
+    """Attach a worker process to the shared data points.
+
+    :param state: worker state shared by every block
+    :param shape: name, shape and type of the shared memory block
+    :return: None
+    """
+    memory = shared_memory.SharedMemory(name=shape['name'])
+    array = np.ndarray(shape['shape'], dtype=np.dtype(shape['dtype']), buffer=memory.buf)
+    array.flags.writeable = False
+
+    _worker_state.update(state)
+    _worker_state['memory'] = memory
+    if shape['cloud']:
+        array = PointCloud2D(array[0], array[1], dtype=array.dtype)
+    _worker_state['data'] = array
+
+
+def _run_block(block: int, state: Optional[dict] = None):
+    """Make and score one block of hypotheses.
+
+    :param block: block number, which selects the block's random stream
+    :param state: state shared by every block (defaults to the state of
+        this worker process)
+    :return: number of hypotheses, best support and its sample
+    """
+    state = _worker_state if state is None else state
+    count = min(state['batch_size'], state['iterations'] - block * state['batch_size'])
+    rng = np.random.default_rng(np.random.SeedSequence(state['entropy'], spawn_key=(block,)))
+
+    data = state['data']
+    samples = _draw_samples(rng, len(data), count, state['samples'])
+    models = state['model'].make_models(data, samples)
+    support = _count_support_batch(state['model'], models, data,
+                                   state['threshold'], state['memory_budget'])
+
+    best = int(np.argmax(support))
+    return count, int(support[best]), samples[best]
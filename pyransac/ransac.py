@@ -4,15 +4,29 @@ This module contains the core code for the RANSAC algorithm.
 """
 
 # Standard library imports
+import copy
 from dataclasses import dataclass
-from math import log
-import random
-from typing import List, Optional
+import heapq
+from math import ceil, inf, log, log1p
+import threading
+from time import monotonic
+from typing import List, Optional, Union
+
+# Third party imports
+import numpy as np
 
 # Local application imports
-from pyransac.base import Model
+from pyransac.base import Model, _take
+from pyransac.grid import GridIndex
+from pyransac.optimization import LocalOptimizer
+from pyransac.sampling import AngularSampler, Sampler, UniformSampler, _draw_samples
+from pyransac.scoring import Scorer
+from pyransac.stats import RansacStats
+from pyransac.verification import Verifier
 
 MODEL_SLOPE_TOLERANCE = 10
+BATCH_MEMORY_BUDGET = 64 * 2 ** 20
+MAX_SAMPLE_ATTEMPTS = 100
 
 
 @dataclass
@@ -34,100 +48,687 @@ class RansacParams:
     """The error threshold to consider a point an inlier"""
 
     expected_angle: Optional[float] = None
+    """The expected angle in degrees of models found by find_inliers_custom."""
+
+    angle_tolerance: float = MODEL_SLOPE_TOLERANCE
+    """The maximum difference in degrees between a model's angle and
+    expected_angle for find_inliers_custom to accept it."""
+
+    seed: Optional[Union[int, np.random.Generator]] = None
+    """Seed for the random number generator, or a NumPy Generator to draw
+    samples from. Runs with the same integer seed are reproducible, and
+    separate Generators give independent streams (e.g. one per thread).
+    None draws a fresh seed from the operating system."""
+
+    top_k: int = 10
+    """The number of best models returned by find_inliers_custom."""
+
+    duplicate_threshold: Optional[float] = None
+    """If set, find_inliers_custom keeps only the better of two models that
+    are equal within this threshold (see Line2D.is_duplicate)."""
+
+    time_budget: Optional[float] = None
+    """If set, the maximum time in seconds a run may take. Once it is used
+    up, the best result found so far is returned."""
+
+    deadline: Optional[float] = None
+    """If set, the time.monotonic() value at which runs must stop and
+    return the best result found so far."""
+
+    def make_rng(self) -> np.random.Generator:
+        """Make the random number generator used to draw samples.
 
+        :return: Generator seeded from seed, or seed itself if it is a Generator
+        """
+        return np.random.default_rng(self.seed)
 
-def find_inliers(points: List, model: Model, params: RansacParams):
+    def make_deadline(self) -> Optional[float]:
+        """Make the deadline of a run starting now from time_budget and deadline.
+
+        :return: time.monotonic() value at which to stop (None if there is no
+            time limit)
+        """
+        if self.time_budget is None:
+            return self.deadline
+
+        deadline = monotonic() + self.time_budget
+        return deadline if self.deadline is None else min(deadline, self.deadline)
+
+
+def find_inliers(points: List, model: Model, params: RansacParams,
+                 sampler: Optional[Sampler] = None, verifier: Optional[Verifier] = None,
+                 local_optimizer: Optional[LocalOptimizer] = None,
+                 index: Optional[GridIndex] = None,
+                 scorer: Optional[Scorer] = None, stats: Optional[RansacStats] = None,
+                 stop: Optional[threading.Event] = None):
     """Find the inliers from a data set.
 
     Finds the inliers from a given data set given a model and
     an error function.
 
+    Hypotheses are ranked by their number of supporters, or by the score
+    of their errors if a scorer is given. The iteration bound always
+    uses the support of the best hypothesis.
+
+    If a local optimiser is given, it refines every new best hypothesis
+    before the iteration bound is updated (LO-RANSAC). The model is then
+    fitted to the final inliers with model.fit, left in that state, and
+    rescored, and the optimiser's select_inliers gives the returned
+    inliers.
+
     :param points: data points to evaluate
     :param model: type of model to which the data should adhere
     :param params: parameters for the RANSAC algorithm
-    :return: inliers
+    :param sampler: sampler to draw minimal samples with (defaults to
+        uniform sampling)
+    :param verifier: optional pre-verification test that a hypothesis
+        must pass before it is scored against every data point
+    :param local_optimizer: optional local optimisation stage
+    :param index: optional spatial index to find the supporters of 2D
+        lines with, built once per call (not used if a scorer is given,
+        as scoring needs the errors of every data point)
+    :param scorer: optional scoring function to rank hypotheses with
+    :param stats: optional statistics to fill in about the run
+    :param stop: optional event that, once set, stops the search before the
+        next hypothesis and returns the best result found so far
+    :return: inliers, as a list for list input or in the input's own
+        array-backed type (e.g. PointCloud2D) otherwise
     """
-    inliers = []
-    max_support = 0
+    if stats is not None:
+        stats.reset()
+    deadline = params.make_deadline()
+
+    inliers = np.empty(0, dtype=np.intp)
+    best_score = -inf
     iterations = params.iterations
     i = 0
+    data = model.prepare_points(points)
+
+    if _too_few_points(points, params, stats):
+        return _take(points, inliers)
+
+    rng = params.make_rng()
+    sampler = UniformSampler() if sampler is None else sampler
+    sampler.reset(data, params.samples, rng)
+    if verifier is not None:
+        verifier.reset(data, params.threshold, rng)
+    if local_optimizer is not None:
+        local_optimizer.reset(model, data, params.threshold, rng)
+    if index is not None:
+        index.reset(data)
+    if scorer is not None:
+        scorer.reset(data, params.threshold)
+
+    # Error and supporter arrays reused by every hypothesis
+    dtype = np.result_type(getattr(data, 'dtype', np.float64), np.float32)
+    work = (np.empty(len(data), dtype=dtype), np.empty(len(data), dtype=bool))
+    if stats is not None:
+        stats.lap('setup')
 
     while i < iterations:
-        sample_points = random.choices(points, k=params.samples)
-        while len(set(sample_points)) < 2:
-            sample_points = random.choices(points, k=params.samples)
+        if stop is not None and stop.is_set():
+            break
+        if _out_of_time(deadline, stats):
+            break
+
+        sample_points = _make_hypothesis(sampler, _sample_source(points, data), model, stats)
+        if sample_points is None:
+            i += 1
+            continue
+
+        if verifier is not None:
+            promising = verifier.is_promising(model)
+            if stats is not None:
+                stats.lap('verification')
+            if not promising:
+                i += 1
+                continue
+
+        # Verifiers that evaluated every point already know the support
+        support = None if verifier is None or scorer is not None else verifier.verified_support()
+        if support is None:
+            support, score, supporters = _score(model, params.threshold, data, work, index, scorer)
+            in_work = supporters is None
+        else:
+            score, supporters, in_work = support, None, False
+        if verifier is not None:
+            verifier.update(support)
+        if stats is not None:
+            stats.hypotheses_scored += 1
+            stats.lap('scoring')
+
+        if score > best_score and support:
+            if supporters is None:
+                supporters = np.flatnonzero(work[1]) if in_work else \
+                    _support_indices(model, params.threshold, data, index)
+            if local_optimizer is not None:
+                supporters = local_optimizer.optimize(model, supporters)
+                if stats is not None:
+                    stats.lap('optimization')
+
+            best_score = len(supporters) if scorer is None else score
+            inliers = supporters
+            if stats is not None:
+                stats.best_support.append((i, len(supporters)))
 
-        model.make_model(sample_points)
-        supporters = _find_supporters(points, model, params.threshold)
+            iterations = min(_iteration_bound(len(supporters), len(points), params),
+                             sampler.max_iterations(supporters, params.confidence))
 
-        if len(supporters) > max_support:
-            max_support = len(supporters)
-            inliers = supporters
+        i += 1
+
+    if local_optimizer is not None and len(inliers):
+        model.fit(_take(data, inliers))
+        inliers = _support_indices(model, params.threshold, data, index)
+        inliers = local_optimizer.select_inliers(model, inliers)
 
-            confidence = 1 - params.confidence
-            ratio = len(supporters) / len(points)
+    inliers = _take(points, inliers)
+    _finish_run(stats, len(points), params, i)
 
-            # We cannot get more support than all data points
-            if ratio == 1:
-                break
+    return inliers
 
-            iterations = log(confidence) / log(1 - ratio ** params.samples)
 
-        i += 1
+def find_inliers_batched(points: List, model: Model, params: RansacParams,
+                         batch_size: int = 64, memory_budget: int = BATCH_MEMORY_BUDGET,
+                         scorer: Optional[Scorer] = None, stats: Optional[RansacStats] = None):
+    """Find the inliers from a data set, evaluating hypotheses in batches.
+
+    Draws batch_size minimal samples at once, makes all of their models
+    with model.make_models and scores them together as a
+    (batch_size, N) error matrix. The matrix is computed in chunks of
+    points so that each chunk stays within memory_budget bytes. The
+    adaptive iteration bound used by find_inliers is updated between
+    batches. If a scorer is given, it ranks the hypotheses from the same
+    error matrix chunks.
+
+    :param points: data points to evaluate
+    :param model: type of model to which the data should adhere
+    :param params: parameters for the RANSAC algorithm
+    :param batch_size: number of hypotheses to make and score at once
+    :param memory_budget: maximum size in bytes of each error matrix chunk
+    :param scorer: optional scoring function to rank hypotheses with
+    :param stats: optional statistics to fill in about the run, counting
+        each hypothesis of a batch as one iteration
+    :return: inliers, as a list for list input or in the input's own
+        array-backed type (e.g. PointCloud2D) otherwise
+    """
+    if stats is not None:
+        stats.reset()
+
+    data = model.prepare_points(points)
+    best_model = None
+    best_sample = None
+    best_score = -inf
+    iterations = params.iterations
+    i = 0
+
+    if _too_few_points(points, params, stats):
+        return _take(points, np.empty(0, dtype=np.intp))
+
+    rng = params.make_rng()
+    deadline = params.make_deadline()
+    if scorer is not None:
+        scorer.reset(data, params.threshold)
+    if stats is not None:
+        stats.lap('setup')
+
+    while i < iterations:
+        if _out_of_time(deadline, stats):
+            break
+
+        count = min(batch_size, ceil(iterations - i))
+        samples = _draw_samples(rng, len(points), count, params.samples)
+        if stats is not None:
+            stats.lap('sampling')
+
+        models = model.make_models(data, samples)
+        if stats is not None:
+            stats.hypotheses_generated += count
+            stats.lap('model')
+
+        if scorer is None:
+            support = _count_support_batch(model, models, data, params.threshold, memory_budget)
+            scores = support
+        else:
+            support, scores = _score_batch(model, models, data, params.threshold, memory_budget,
+                                           scorer)
+        if stats is not None:
+            stats.hypotheses_scored += count
+            stats.lap('scoring')
+
+        best = int(np.argmax(scores))
+        if scores[best] > best_score and support[best]:
+            best_score = scores[best]
+            max_support = int(support[best])
+            best_model = models[best:best + 1]
+            best_sample = samples[best]
+            iterations = _iteration_bound(max_support, len(points), params)
+            if stats is not None:
+                stats.best_support.append((i + best, max_support))
+
+        i += count
+
+    inliers = np.empty(0, dtype=np.intp)
+    if best_model is not None:
+        source = _sample_source(points, data)
+        model.make_model([source[j] for j in best_sample])
+        errors = model.calc_errors_batch(best_model, data)[0]
+        inliers = np.flatnonzero(errors <= params.threshold)
+
+    inliers = _take(points, inliers)
+    _finish_run(stats, len(points), params, i)
 
     return inliers
 
 
-def find_inliers_custom(points: List, model: Model, params: RansacParams):
+def find_inliers_custom(points: List, model: Model, params: RansacParams,
+                        sampler: Optional[Sampler] = None, verifier: Optional[Verifier] = None,
+                        index: Optional[GridIndex] = None, stats: Optional[RansacStats] = None,
+                        stop: Optional[threading.Event] = None):
     """Find the inliers from a data set.
 
     Finds the inliers from a given data set given a model and
     an error function.
 
-    Returns the top 10 models based on their performance
+    Returns the top params.top_k models based on their performance. Only
+    the best models found so far are kept while searching, with their
+    supporters stored as index arrays until the end.
 
     :param points: data points to evaluate
     :param model: type of model to which the data should adhere
     :param params: parameters for the RANSAC algorithm
-    :return: inliers
+    :param sampler: sampler to draw minimal samples with (defaults to
+        an AngularSampler for params.expected_angle and
+        params.angle_tolerance)
+    :param verifier: optional pre-verification test that a hypothesis
+        must pass before it is scored against every data point
+    :param index: optional spatial index to find the supporters of 2D
+        lines with, built once per call
+    :param stats: optional statistics to fill in about the run
+    :param stop: optional event that, once set, stops the search before the
+        next hypothesis and returns the best result found so far
+    :return: list of (performance, sample points, supporters) tuples,
+        best first
     """
-    inliers = []
+    if stats is not None:
+        stats.reset()
+    deadline = params.make_deadline()
+
     max_support = 0
     iterations = params.iterations
     i = 0
 
     results = []
+    data = model.prepare_points(points)
+
+    if _too_few_points(points, params, stats):
+        return results
+
+    rng = params.make_rng()
+    if sampler is None:
+        sampler = AngularSampler(params.expected_angle, params.angle_tolerance)
+    sampler.reset(data, params.samples, rng)
+    if verifier is not None:
+        verifier.reset(data, params.threshold, rng)
+    if index is not None:
+        index.reset(data)
+    if stats is not None:
+        stats.lap('setup')
 
     while i < iterations:
-        try:
-            if len(points) < 2:
-                return results
-            sample_points = random.choices(points, k=params.samples)
-            while len(set(sample_points)) < 2:
-                sample_points = random.choices(points, k=params.samples)
-        except IndexError:
-            return results
-
-        model.make_model(sample_points)
+        if stop is not None and stop.is_set():
+            break
+        if _out_of_time(deadline, stats):
+            break
+
+        sample_points = _make_hypothesis(sampler, _sample_source(points, data), model, stats)
+        if sample_points is None:
+            i += 1
+            continue
+
+        promising = abs(model.angle - params.expected_angle) < params.angle_tolerance and \
+            (verifier is None or verifier.is_promising(model))
+        if stats is not None:
+            stats.lap('verification')
+
+        if promising:
+            # Verifiers that evaluated every point already know the support
+            support = None if verifier is None else verifier.verified_support()
+            supporters = None
+            if support is None:
+                supporters = _support_indices(model, params.threshold, data, index)
+                support = len(supporters)
+            if verifier is not None:
+                verifier.update(support)
+
+            performance = support / len(points)
+
+            # Ties are broken in favour of earlier models, and the supporters
+            # are only found for models that can enter the top k
+            if len(results) < params.top_k or (results and (performance, -i) > results[0][:2]):
+                if supporters is None:
+                    supporters = _support_indices(model, params.threshold, data, index)
+                hypothesis = None if params.duplicate_threshold is None else copy.copy(model)
+                _push_top_k(results, (performance, -i, sample_points, supporters, hypothesis),
+                            params.top_k, params.duplicate_threshold)
+
+            if stats is not None:
+                stats.hypotheses_scored += 1
+                if support > max_support:
+                    max_support = support
+                    stats.best_support.append((i, max_support))
+                stats.lap('scoring')
 
-        if abs(model.angle - params.expected_angle) < MODEL_SLOPE_TOLERANCE:
-            supporters = _find_supporters(points, model, params.threshold)
+        i += 1
 
-            performance = len(supporters) / len(points)
+    results = [(performance, sample_points, _take(points, supporters))
+               for performance, _, sample_points, supporters, _ in sorted(results, reverse=True)]
+    _finish_run(stats, len(points), params, i)
 
-            results.append((performance, sample_points, supporters))
+    return results
 
-        i += 1
 
-    return sorted(results, key=lambda x: x[0], reverse=True)[:10]
+def _push_top_k(heap: List, result: tuple, size: int, duplicate_threshold: Optional[float]) -> None:
+    """Add a result to a bounded min-heap of the best results.
 
+    Results are ordered by their first two items. If duplicate_threshold
+    is set, a result whose model (the last item) equals models already in
+    the heap within the threshold replaces them all only if it is better
+    than each of them.
 
-def _find_supporters(points: List, model: Model, threshold: float) -> List:
+    :param heap: heap of the best results so far
+    :param result: result to add
+    :param size: maximum number of results to keep
+    :param duplicate_threshold: threshold for models to be duplicates
+    :return: None
+    """
+    if duplicate_threshold is not None:
+        duplicates = [other for other in heap
+                      if result[-1].is_duplicate(other[-1], duplicate_threshold)]
+        if duplicates:
+            if all(result[:2] > other[:2] for other in duplicates):
+                heap[:] = [other for other in heap
+                           if not any(other is d for d in duplicates)] + [result]
+                heapq.heapify(heap)
+            return
+
+    if len(heap) < size:
+        heapq.heappush(heap, result)
+    elif size and result[:2] > heap[0][:2]:
+        heapq.heapreplace(heap, result)
+
+
+def _find_supporters(points: List, model: Model, threshold: float, data=None,
+                     index: Optional[GridIndex] = None) -> List:
     """Find data points (supporters) that support the given hypothesis.
 
+    Errors are computed in a single call to the model's calc_errors, or
+    only for the points near the hypothesis if a spatial index is given.
+
     :param points: data points to test against the hypothesis
     :param model: type of model to which the data should adhere
     :param threshold: error threshold to consider data point an inlier
+    :param data: points already converted by model.prepare_points
+    :param index: optional spatial index built over data
     :return: data points that support the hypothesis
     """
-    return [point for point in points if model.calc_error(point) <= threshold]
+    if data is None:
+        data = model.prepare_points(points)
+
+    return _take(points, _support_indices(model, threshold, data, index))
+
+
+def _support_indices(model: Model, threshold: float, data,
+                     index: Optional[GridIndex] = None) -> np.ndarray:
+    """Find the indexes of the data points that support the given hypothesis.
+
+    :param model: type of model to which the data should adhere
+    :param threshold: error threshold to consider data point an inlier
+    :param data: points already converted by model.prepare_points
+    :param index: optional spatial index built over data
+    :return: array of indexes of the supporting data points
+    """
+    if index is not None:
+        return index.support_indices(model, threshold)
+
+    return np.flatnonzero(model.calc_errors(data) <= threshold)
+
+
+def _score(model: Model, threshold: float, data, work: tuple, index: Optional[GridIndex] = None,
+           scorer: Optional[Scorer] = None):
+    """Count the supporters of the given hypothesis and score it.
+
+    Without a spatial index, the errors and supporters are calculated in
+    the preallocated work arrays, so no arrays are allocated unless a
+    scorer is given. The indexes of the supporters are then left for the
+    caller to find from the supporter array if they are needed.
+
+    :param model: type of model to which the data should adhere
+    :param threshold: error threshold to consider data point an inlier
+    :param data: points already converted by model.prepare_points
+    :param work: error and boolean supporter arrays of length N
+    :param index: optional spatial index built over data, used only
+        without a scorer
+    :param scorer: optional scoring function (defaults to the number of
+        supporters)
+    :return: number of supporters, score and array of indexes of the
+        supporters (None if they are only in the supporter array)
+    """
+    if index is not None and scorer is None:
+        supporters = index.support_indices(model, threshold)
+        return len(supporters), len(supporters), supporters
+
+    errors, is_supporter = work
+    model.calc_errors(data, out=errors)
+    np.less_equal(errors, threshold, out=is_supporter)
+    support = np.count_nonzero(is_supporter)
+
+    return support, support if scorer is None else scorer.score(errors), None
+
+
+def _sample_source(points, data):
+    """Get the data points to make models from.
+
+    Models are made from the points as given, so that samples keep their
+    type, except for NumPy arrays, whose rows are only coordinates. Their
+    samples are taken from the points converted by model.prepare_points.
+
+    :param points: data points as given
+    :param data: points already converted by model.prepare_points
+    :return: data points to draw minimal samples from
+    """
+    return data if isinstance(points, np.ndarray) else points
+
+
+def _too_few_points(points, params: RansacParams, stats: Optional[RansacStats] = None) -> bool:
+    """Check whether there are too few data points to draw one sample.
+
+    If so, the run is over and its statistics are finished.
+
+    :param points: data points to evaluate
+    :param params: parameters for the RANSAC algorithm
+    :param stats: optional statistics of the run
+    :return: True if there are fewer data points than params.samples
+    """
+    if len(points) >= params.samples:
+        return False
+
+    if stats is not None:
+        stats.finish(0, False)
+    return True
+
+
+def _out_of_time(deadline: Optional[float], stats: Optional[RansacStats] = None) -> bool:
+    """Check whether a run has reached its deadline, recording it if so.
+
+    :param deadline: time.monotonic() value at which to stop (None if
+        there is no time limit)
+    :param stats: optional statistics of the run
+    :return: True if the deadline has passed
+    """
+    if deadline is None or monotonic() < deadline:
+        return False
+
+    if stats is not None:
+        stats.timed_out = True
+    return True
+
+
+def _make_hypothesis(sampler: Sampler, points, model: Model,
+                     stats: Optional[RansacStats] = None) -> Optional[List]:
+    """Draw the next minimal sample and make the model from it.
+
+    :param sampler: sampler to draw index samples from
+    :param points: data points to draw from
+    :param model: model to make from the sample
+    :param stats: optional statistics to time sampling and model making in
+    :return: list of sampled data points (None if every attempt was
+        degenerate, in which case no model is made)
+    """
+    sample_points = _next_sample(sampler, points, model, stats)
+    if stats is not None:
+        stats.lap('sampling')
+    if sample_points is None:
+        return None
+
+    model.make_model(sample_points)
+    if stats is not None:
+        stats.hypotheses_generated += 1
+        stats.lap('model')
+
+    return sample_points
+
+
+def _finish_run(stats: Optional[RansacStats], population: int, params: RansacParams,
+                iterations: int) -> None:
+    """Record the end of a run in its statistics, if there are any.
+
+    :param stats: optional statistics of the run
+    :param population: number of data points
+    :param params: parameters for the RANSAC algorithm
+    :param iterations: number of iterations run
+    :return: None
+    """
+    if stats is None:
+        return
+
+    stats.lap('finalization')
+    stats.confidence = _reached_confidence(stats, population, params.samples, iterations)
+    stats.finish(iterations, iterations < params.iterations)
+
+
+def _next_sample(sampler: Sampler, points, model: Model,
+                 stats: Optional[RansacStats] = None) -> Optional[List]:
+    """Draw the next minimal sample that the model does not reject.
+
+    Samples rejected by model.is_degenerate are redrawn, up to
+    MAX_SAMPLE_ATTEMPTS times, so that data with many duplicate points
+    cannot stall the search.
+
+    :param sampler: sampler to draw index samples from
+    :param points: data points to draw from
+    :param model: type of model to which the data should adhere
+    :param stats: optional statistics to count degenerate samples in
+    :return: list of sampled data points (None if every attempt was degenerate)
+    """
+    for _ in range(MAX_SAMPLE_ATTEMPTS):
+        sample_points = [points[j] for j in sampler.draw()]
+        if not model.is_degenerate(sample_points):
+            return sample_points
+        if stats is not None:
+            stats.degenerate_retries += 1
+
+    return None
+
+
+def _iteration_bound(support: int, population: int, params: RansacParams) -> float:
+    """Calculate the adaptive RANSAC iteration bound.
+
+    The bound is capped at params.iterations. It is calculated with log1p
+    because, for data sets of billions of points, the probability of
+    drawing a sample of inliers is too small to change 1 - probability.
+
+    :param support: support of the best hypothesis
+    :param population: number of data points it was drawn from
+    :param params: parameters for the RANSAC algorithm
+    :return: number of iterations needed to reach params.confidence
+    """
+    ratio = support / population
+    if ratio >= 1:
+        return 0
+
+    probability = ratio ** params.samples
+    if probability == 0:
+        return params.iterations
+
+    return min(params.iterations, log(1 - params.confidence) / log1p(-probability))
+
+
+def _reached_confidence(stats: RansacStats, population: int, samples: int,
+                        iterations: int) -> float:
+    """Calculate the confidence that a run found the best model.
+
+    This is the probability that at least one of the iterations drew a
+    sample of inliers, if the inlier ratio is that of the best model.
+
+    :param stats: statistics of the run, holding its best support
+    :param population: number of data points
+    :param samples: number of data points per sample
+    :param iterations: number of iterations run
+    :return: confidence between 0 and 1
+    """
+    if not stats.best_support:
+        return 0.
+
+    ratio = stats.best_support[-1][1] / population
+    return 1 - (1 - ratio ** samples) ** iterations
+
+
+def _count_support_batch(model: Model, models, data, threshold: float, memory_budget: int,
+                         mask: Optional[np.ndarray] = None) -> np.ndarray:
+    """Count the supporters of many hypotheses at once.
+
+    :param model: type of model to which the data should adhere
+    :param models: hypotheses as returned by model.make_models
+    :param data: points already converted by model.prepare_points
+    :param threshold: error threshold to consider data point an inlier
+    :param memory_budget: maximum size in bytes of each error matrix chunk
+    :param mask: optional boolean array of the data points to count
+    :return: array with the number of supporters of each hypothesis
+    """
+    chunk = max(1, memory_budget // (8 * len(models)))
+    support = np.zeros(len(models), dtype=np.intp)
+
+    for start in range(0, len(data), chunk):
+        is_supporter = model.calc_errors_batch(models, data[start:start + chunk]) <= threshold
+        if mask is not None:
+            is_supporter &= mask[start:start + chunk]
+        support += np.count_nonzero(is_supporter, axis=1)
+
+    return support
+
+
+def _score_batch(model: Model, models, data, threshold: float, memory_budget: int, scorer: Scorer):
+    """Count the supporters of many hypotheses at once and score them.
+
+    :param model: type of model to which the data should adhere
+    :param models: hypotheses as returned by model.make_models
+    :param data: points already converted by model.prepare_points
+    :param threshold: error threshold to consider data point an inlier
+    :param memory_budget: maximum size in bytes of each error matrix chunk
+    :param scorer: scoring function to rank the hypotheses with
+    :return: arrays with the number of supporters and score of each
+        hypothesis (-inf for hypotheses without supporters, e.g. those made
+        from coincident points, whose errors are NaN)
+    """
+    chunk = max(1, memory_budget // (8 * len(models)))
+    support = np.zeros(len(models), dtype=np.intp)
+    scores = np.zeros(len(models))
+
+    for start in range(0, len(data), chunk):
+        errors = model.calc_errors_batch(models, data[start:start + chunk])
+        support += np.count_nonzero(errors <= threshold, axis=1)
+        with np.errstate(invalid='ignore'):
+            scores += scorer.score(errors)
+
+    scores[support == 0] = -inf
+    return support, scores
@@ -0,0 +1,391 @@
+"""Sampling module.
+
+This module contains the samplers that draw minimal samples for the
+RANSAC algorithm.
+"""
+
+# Standard library imports
+import abc
+from math import inf, log
+
+# Third party imports
+import numpy as np
+from scipy import spatial, special
+
+# Local application imports
+from pyransac.line2d import _coordinates
+
+SAMPLE_BATCH = 256
+ANGULAR_SAMPLE_ATTEMPTS = 16
+
+
+class Sampler(abc.ABC):
+    """ABC class for minimal sample generators.
+
+    Derivative classes should extend this class and implement its
+    interface. A sampler is reset at the start of every RANSAC run and
+    then asked for one minimal sample per iteration.
+    """
+    @abc.abstractmethod
+    def reset(self, data, size: int, rng: np.random.Generator) -> None:
+        """Prepares the sampler for a RANSAC run.
+
+        :param data: data points as returned by the model's prepare_points
+        :param size: number of data points per minimal sample
+        :param rng: random number generator to draw from
+        """
+
+    @abc.abstractmethod
+    def draw(self) -> np.ndarray:
+        """Draws a minimal sample.
+
+        :return: array of distinct indexes into the data points
+        """
+
+    def max_iterations(self, supporters: np.ndarray, confidence: float) -> float:
+        """Calculates a sampler-specific bound on the number of iterations.
+
+        Called whenever a new best hypothesis is found. RANSAC stops once
+        either this bound or the standard confidence bound is reached. The
+        default implementation imposes no extra bound.
+
+        :param supporters: indexes of the best hypothesis' supporters
+        :param confidence: the RANSAC confidence value
+        :return: maximum number of iterations
+        """
+        return inf
+
+
+class UniformSampler(Sampler):
+    """Uniform sampler.
+
+    Draws every minimal sample uniformly from all data points.
+    """
+    def __init__(self):
+        self._samples = None
+
+    def reset(self, data, size: int, rng: np.random.Generator) -> None:
+        self._samples = _iter_samples(rng, len(data), size)
+
+    def draw(self) -> np.ndarray:
+        return next(self._samples)
+
+
+class ProsacSampler(Sampler):
+    """Progressive sample consensus (PROSAC) sampler.
+
+    Draws minimal samples from progressively larger sets of the data
+    points with the highest quality, as described by Chum and Matas in
+    "Matching with PROSAC - progressive sample consensus". Its
+    max_iterations applies the PROSAC non-randomness and maximality
+    termination criteria.
+    """
+    def __init__(self, quality, max_samples: int = 200000, beta: float = 0.01, psi: float = 0.05,
+                 min_size: int = 20):
+        """
+        :param quality: quality score of each data point (higher is better)
+        :param max_samples: number of samples after which PROSAC draws
+            uniformly from all data points
+        :param beta: probability that an outlier supports an incorrect model
+        :param psi: probability that a random model passes the
+            non-randomness test
+        :param min_size: smallest number of top points whose support can
+            stop the search (a few top points support any hypothesis
+            drawn from them, however rough)
+        """
+        self.quality = np.asarray(quality, dtype=np.float64)
+        self.max_samples = max_samples
+        self.beta = beta
+        self.psi = psi
+        self.min_size = min_size
+
+        self._order = None
+        self._size = 0
+        self._rng = None
+        self._min_inliers = None
+        self._n = 0
+        self._t = 0
+        self._t_n = 0.
+        self._t_n_prime = 1
+        self._drawn = None
+
+    def reset(self, data, size: int, rng: np.random.Generator) -> None:
+        population = len(data)
+        if len(self.quality) != population:
+            raise ValueError(f'Need one quality score per point, not {len(self.quality)} '
+                             f'for {population} points')
+
+        self._order = np.argsort(-self.quality, kind='stable')
+        self._size = size
+        self._rng = rng
+
+        # Smallest inlier count among the top n points that is unlikely to
+        # occur for a random model (non-randomness)
+        top = np.arange(size, population + 1)
+        random_inliers = np.nan_to_num(np.ceil(special.bdtrik(1 - self.psi, top - size, self.beta)))
+        self._min_inliers = np.full(population + 1, np.inf)
+        self._min_inliers[top] = size + random_inliers + 1
+
+        self._n = size
+        self._t = 0
+        self._t_n = float(self.max_samples)
+        for i in range(size):
+            self._t_n *= (size - i) / (population - i)
+        self._t_n_prime = 1
+
+        # Number of samples drawn while the sampling size was at most n
+        self._drawn = np.zeros(population + 1, dtype=np.intp)
+
+    def draw(self) -> np.ndarray:
+        self._t += 1
+
+        if self._t > self._t_n_prime and self._n < len(self._order):
+            t_n = self._t_n * (self._n + 1) / (self._n + 1 - self._size)
+            self._t_n_prime += int(np.ceil(t_n - self._t_n))
+            self._t_n = t_n
+            self._drawn[self._n] = self._t - 1
+            self._n += 1
+
+        if self._t_n_prime < self._t:
+            sample = _draw_samples(self._rng, self._n, 1, self._size)[0]
+        else:
+            sample = np.append(_draw_samples(self._rng, self._n - 1, 1, self._size - 1)[0],
+                               self._n - 1)
+
+        return self._order[sample]
+
+    def max_iterations(self, supporters: np.ndarray, confidence: float) -> float:
+        """Calculates the PROSAC termination bound.
+
+        Only the sets of the top n points that have already been sampled
+        from, and have at least min_size points, are checked. For each of
+        them, the number of samples needed to find an all-inlier sample
+        with the given confidence is compared with the number of samples
+        drawn from that set so far.
+
+        :param supporters: indexes of the best hypothesis' supporters
+        :param confidence: the RANSAC confidence value
+        :return: number of samples after which to stop
+        """
+        is_supporter = np.zeros(len(self._order), dtype=bool)
+        is_supporter[supporters] = True
+
+        top = np.arange(max(self._size, self.min_size), self._n + 1)
+        if len(top) == 0:
+            return inf
+
+        inliers = np.cumsum(is_supporter[self._order[:self._n]])[top - 1]
+        random = inliers < self._min_inliers[top]
+
+        probability = np.ones(len(top))
+        for j in range(self._size):
+            probability *= np.clip(inliers - j, 0, None) / (top - j)
+        probability[random] = 0
+
+        needed = np.full(len(top), inf)
+        needed[probability >= 1] = 0
+        possible = (probability > 0) & (probability < 1)
+        needed[possible] = log(1 - confidence) / np.log1p(-probability[possible])
+
+        drawn = self._drawn[top]
+        drawn[-1] = self._t
+        return float(self._t + max(0., (needed - drawn).min()))
+
+
+class AngularSampler(Sampler):
+    """Angle-constrained sampler for 2D lines.
+
+    Draws only pairs of points whose line angle, as calculated by
+    Line2D, is within tolerance degrees of expected_angle. Points are
+    indexed once per run by their offset across the expected direction.
+    The partner of each randomly chosen point is drawn from the strip of
+    points whose offset could give an angle within tolerance. Candidate
+    pairs are generated and checked in vectorised batches, so rejected
+    pairs never reach make_model. If a search finds no such pair, the
+    rest of the run draws uniform samples instead of searching again.
+    """
+    def __init__(self, expected_angle: float, tolerance: float, batch: int = 4096):
+        """
+        :param expected_angle: expected angle of the line in degrees
+        :param tolerance: maximum difference in degrees from expected_angle
+        :param batch: number of candidate pairs checked at once
+        """
+        self.expected_angle = expected_angle
+        self.tolerance = tolerance
+        self.batch = batch
+
+        self._x = None
+        self._y = None
+        self._offset = None
+        self._order = None
+        self._width = 0.
+        self._rng = None
+        self._samples = iter(())
+        self._exhausted = False
+
+    def reset(self, data, size: int, rng: np.random.Generator) -> None:
+        if size != 2:
+            raise ValueError(f'Need 2 points per sample to constrain line angles, not {size}')
+
+        self._x, self._y = _coordinates(data)
+        self._rng = rng
+        self._samples = iter(())
+        self._exhausted = False
+
+        radians = np.radians(self.expected_angle)
+        along = self._x * np.cos(radians) + self._y * np.sin(radians)
+        across = self._y * np.cos(radians) - self._x * np.sin(radians)
+
+        self._order = np.argsort(across, kind='stable')
+        self._offset = across[self._order]
+        if self.tolerance >= 90:
+            self._width = np.inf
+        else:
+            self._width = (along.max() - along.min()) * np.tan(np.radians(self.tolerance))
+
+    def draw(self) -> np.ndarray:
+        sample = next(self._samples, None)
+        if sample is None:
+            self._samples = self._draw_batch()
+            sample = next(self._samples)
+
+        return sample
+
+    def _draw_batch(self):
+        """Draw a batch of pairs within the tolerance of the expected angle.
+
+        If no such pair is found after ANGULAR_SAMPLE_ATTEMPTS batches,
+        uniform samples are returned and left for the caller to reject,
+        and every later batch of the run is drawn uniformly, so that data
+        with few or no such pairs costs one search per run rather than
+        one per sample.
+
+        :return: iterator of pairs of indexes
+        """
+        population = len(self._order)
+        for _ in range(0 if self._exhausted else ANGULAR_SAMPLE_ATTEMPTS):
+            first = self._rng.integers(population, size=self.batch)
+            low = np.searchsorted(self._offset, self._offset[first] - self._width, side='left')
+            high = np.searchsorted(self._offset, self._offset[first] + self._width, side='right')
+            offsets = (self._rng.random(self.batch) * (high - low)).astype(np.intp)
+            second = self._order[low + offsets]
+            first = self._order[first]
+
+            dx = self._x[first] - self._x[second]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                angle = np.degrees(np.arctan((self._y[first] - self._y[second]) / dx))
+            valid = (dx != 0) & (np.abs(angle - self.expected_angle) < self.tolerance)
+
+            if valid.any():
+                return iter(np.column_stack((first[valid], second[valid])))
+
+        self._exhausted = True
+        return iter(_draw_samples(self._rng, population, self.batch, 2))
+
+
+class NapsacSampler(Sampler):
+    """N adjacent points sample consensus (NAPSAC) sampler.
+
+    Draws the first point of every sample uniformly and the rest from
+    its nearest neighbours, as described by Myatt et al. in "NAPSAC:
+    High noise, high dimensional robust estimation - it's in the bag".
+    Samples of points close together are much more likely to come from
+    the same local structure. A k-d tree of the data points is built once
+    per run and queried for a batch of first points at a time. If a
+    first point has too few neighbours within radius, a uniform sample
+    is drawn instead.
+    """
+    def __init__(self, neighbours: int = 10, radius: float = np.inf, batch: int = SAMPLE_BATCH):
+        """
+        :param neighbours: number of nearest neighbours to draw from
+        :param radius: maximum distance of a neighbour from the first point
+        :param batch: number of samples drawn at once
+        """
+        self.neighbours = neighbours
+        self.radius = radius
+        self.batch = batch
+
+        self._points = None
+        self._tree = None
+        self._size = 0
+        self._rng = None
+        self._samples = iter(())
+
+    def reset(self, data, size: int, rng: np.random.Generator) -> None:
+        if len(data) < size:
+            raise ValueError(f'Need at least {size} points to draw a sample, not {len(data)}')
+
+        self._points = np.column_stack(_coordinates(data))
+        self._tree = spatial.cKDTree(self._points)
+        self._size = size
+        self._rng = rng
+        self._samples = iter(())
+
+    def draw(self) -> np.ndarray:
+        sample = next(self._samples, None)
+        if sample is None:
+            self._samples = iter(self._draw_batch())
+            sample = next(self._samples)
+
+        return sample
+
+    def _draw_batch(self) -> np.ndarray:
+        """Draw a batch of samples from neighbourhoods of random points.
+
+        :return: (batch, size) array of indexes
+        """
+        population = len(self._points)
+        first = self._rng.integers(population, size=self.batch)
+        k = min(self.neighbours + 1, population)
+        _, neighbours = self._tree.query(self._points[first], k=k, distance_upper_bound=self.radius)
+        neighbours = neighbours.reshape(self.batch, k)
+
+        # Missing neighbours are returned as the population size
+        valid = (neighbours < population) & (neighbours != first[:, np.newaxis])
+        keys = np.where(valid, self._rng.random(neighbours.shape), np.inf)
+        chosen = np.argsort(keys, axis=1)[:, :self._size - 1]
+
+        samples = np.column_stack((first, np.take_along_axis(neighbours, chosen, axis=1)))
+        isolated = np.flatnonzero(np.count_nonzero(valid, axis=1) < self._size - 1)
+        samples[isolated] = _draw_samples(self._rng, population, len(isolated), self._size)
+
+        return samples
+
+
+def _iter_samples(rng: np.random.Generator, population: int, size: int):
+    """Iterate over minimal samples of distinct indexes.
+
+    Samples are drawn SAMPLE_BATCH at a time with _draw_samples.
+
+    :param rng: random number generator to draw from
+    :param population: number of data points to draw indexes from
+    :param size: number of indexes per sample
+    :return: iterator of arrays of size indexes
+    """
+    while True:
+        yield from _draw_samples(rng, population, SAMPLE_BATCH, size)
+
+
+def _draw_samples(rng: np.random.Generator, population: int, count: int, size: int) -> np.ndarray:
+    """Draw minimal samples of distinct indexes.
+
+    Rows containing a repeated index are redrawn until every row holds
+    size distinct indexes.
+
+    :param rng: random number generator to draw from
+    :param population: number of data points to draw indexes from
+    :param count: number of samples to draw
+    :param size: number of indexes per sample
+    :return: (count, size) array of indexes
+    """
+    if population < size:
+        raise ValueError(f'Need at least {size} points to draw a sample, not {population}')
+
+    samples = rng.integers(population, size=(count, size))
+    while True:
+        ordered = np.sort(samples, axis=1)
+        repeated = np.flatnonzero((ordered[:, 1:] == ordered[:, :-1]).any(axis=1))
+        if len(repeated) == 0:
+            return samples
+
+        samples[repeated] = rng.integers(population, size=(len(repeated), size))
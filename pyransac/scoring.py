@@ -0,0 +1,173 @@
+"""Scoring module.
+
+This module contains the scoring functions that rank hypotheses by their
+residuals instead of by the number of supporters.
+"""
+
+# Standard library imports
+import abc
+from math import log, pi, sqrt
+from typing import Optional, Union
+
+# Third party imports
+import numpy as np
+from scipy import special
+
+# Local application imports
+from pyransac.line2d import _coordinates
+
+
+class Scorer(abc.ABC):
+    """ABC class for hypothesis scoring functions.
+
+    Derivative classes should extend this class and implement its
+    interface. A scorer is reset at the start of every RANSAC run. The
+    score of a hypothesis is the negated sum of a loss per data point, so
+    higher scores are better and the scores of chunks of data points add
+    up to the score of all of them.
+    """
+    def __init__(self):
+        self._threshold = 0.
+
+    def reset(self, data, threshold: float) -> None:
+        """Prepares the scorer for a RANSAC run.
+
+        :param data: data points as returned by the model's prepare_points
+        :param threshold: error threshold to consider data point an inlier
+        """
+        self._threshold = threshold
+
+    @abc.abstractmethod
+    def loss(self, errors: np.ndarray) -> np.ndarray:
+        """Calculates the loss of each data point from its error.
+
+        :param errors: array of errors of one or more hypotheses
+        :return: array of losses with the same shape as errors
+        """
+
+    def score(self, errors: np.ndarray) -> Union[float, np.ndarray]:
+        """Scores hypotheses from the errors of the data points.
+
+        :param errors: (N,) errors of one hypothesis or (K, N) errors of K
+            hypotheses
+        :return: score, or array of K scores (higher is better)
+        """
+        return -self.loss(errors).sum(axis=-1)
+
+
+class MsacScorer(Scorer):
+    """M-estimator sample consensus (MSAC) scoring.
+
+    Each data point costs its squared error, truncated at the squared
+    threshold, as described by Torr and Zisserman in "MLESAC: A new
+    robust estimator with application to estimating image geometry".
+    Unlike counting supporters, this ranks hypotheses with the same
+    support by how well they fit it.
+    """
+    def loss(self, errors: np.ndarray) -> np.ndarray:
+        return np.minimum(np.square(errors), self._threshold ** 2)
+
+
+class MlesacScorer(Scorer):
+    """Maximum likelihood estimation sample consensus (MLESAC) scoring.
+
+    Each data point costs its negative log-likelihood under a mixture of
+    half-normal inlier errors and uniform outlier errors, following Torr
+    and Zisserman in "MLESAC: A new robust estimator with application to
+    estimating image geometry". The mixing ratio is fixed rather than
+    re-estimated for every hypothesis, so each hypothesis is scored in a
+    single pass over its errors.
+    """
+    def __init__(self, sigma: Optional[float] = None, inlier_ratio: float = 0.5,
+                 outlier_range: Optional[float] = None):
+        """
+        :param sigma: standard deviation of inlier errors (defaults to the
+            threshold divided by 1.96)
+        :param inlier_ratio: expected ratio of inliers among the data points
+        :param outlier_range: largest possible outlier error (defaults to
+            the diagonal of the bounding box of the data points)
+        """
+        super().__init__()
+        self.sigma = sigma
+        self.inlier_ratio = inlier_ratio
+        self.outlier_range = outlier_range
+
+        self._scale = 1.
+        self._inlier_log = 0.
+        self._outlier_log = 0.
+
+    def reset(self, data, threshold: float) -> None:
+        super().reset(data, threshold)
+
+        sigma = threshold / 1.96 if self.sigma is None else self.sigma
+        outlier_range = self.outlier_range
+        if outlier_range is None:
+            x, y = _coordinates(data)
+            outlier_range = float(np.hypot(np.ptp(x), np.ptp(y))) if len(x) else 0.
+        outlier_range = outlier_range or threshold
+
+        self._scale = 1 / (2 * sigma ** 2)
+        self._inlier_log = log(self.inlier_ratio) + log(2 / (sqrt(2 * pi) * sigma))
+        self._outlier_log = log(1 - self.inlier_ratio) - log(outlier_range)
+
+    def loss(self, errors: np.ndarray) -> np.ndarray:
+        return -np.logaddexp(self._inlier_log - self._scale * np.square(errors), self._outlier_log)
+
+
+class MagsacScorer(Scorer):
+    """MAGSAC++ scoring.
+
+    Rather than relying on a single threshold, each data point's loss is
+    marginalised over noise levels sigma up to the threshold divided by
+    the chi quantile k, as described by Barath et al. in "MAGSAC++, a
+    fast, reliable and accurate robust estimator". The loss is
+
+    sigma_max ** 2 / 2 * lower_gamma(dof / 2, x) +
+    e ** 2 / 4 * (upper_gamma(dof / 2 - 1, x) - upper_gamma(dof / 2 - 1, k ** 2 / 2))
+
+    with x = e ** 2 / (2 * sigma_max ** 2) for errors e below the
+    threshold, and constant above it.
+    """
+    def __init__(self, dof: int = 2, quantile: float = 0.99):
+        """
+        :param dof: degrees of freedom of the error distribution (at least 2)
+        :param quantile: chi-squared quantile of the threshold
+        """
+        if dof < 2:
+            raise ValueError(f'Need at least 2 degrees of freedom, not {dof}')
+
+        super().__init__()
+        self.dof = dof
+        self.quantile = quantile
+
+        self._sigma_max = 1.
+        self._upper_k = 0.
+
+    def reset(self, data, threshold: float) -> None:
+        super().reset(data, threshold)
+
+        k_squared = special.chdtri(self.dof, 1 - self.quantile)
+        self._sigma_max = threshold / sqrt(k_squared)
+        self._upper_k = self._upper_gamma(np.float64(k_squared / 2))
+
+    def loss(self, errors: np.ndarray) -> np.ndarray:
+        squared = np.square(np.minimum(errors, self._threshold))
+        x = squared / (2 * self._sigma_max ** 2)
+
+        lower = special.gammainc(self.dof / 2, x) * special.gamma(self.dof / 2)
+        with np.errstate(invalid='ignore'):
+            marginal = squared / 4 * (self._upper_gamma(x) - self._upper_k)
+
+        return self._sigma_max ** 2 / 2 * lower + np.where(squared > 0, marginal, 0)
+
+    def _upper_gamma(self, x: np.ndarray) -> np.ndarray:
+        """Calculate the upper incomplete gamma function of dof / 2 - 1.
+
+        :param x: array of lower limits of integration
+        :return: array of function values
+        """
+        a = self.dof / 2 - 1
+        if a == 0:
+            return special.exp1(x)
+
+        return special.gammaincc(a, x) * special.gamma(a)
@@ -0,0 +1,96 @@
+"""Run statistics module.
+
+This module contains the optional statistics that RANSAC functions
+collect about where the time of a run went.
+"""
+
+# Standard library imports
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+@dataclass
+class RansacStats:
+    """Random sample consensus (RANSAC) run statistics.
+
+    Pass an instance to find_inliers, find_inliers_custom,
+    find_inliers_batched, find_inliers_parallel or find_inliers_mapped to
+    have it filled in. It is reset at the start of every run, and its callback
+    is then called with it at the end of the run, e.g. to export it.
+    Without a statistics object, the functions only pay for checking
+    that none was given.
+    """
+    callback: Optional[Callable[['RansacStats'], None]] = None
+    """Function called with the statistics at the end of every run."""
+
+    timings: Dict[str, float] = field(default_factory=dict)
+    """Cumulative time in seconds spent in each phase of the run: setup,
+    sampling, model, verification, scoring, optimization and
+    finalization."""
+
+    hypotheses_generated: int = 0
+    """The number of hypotheses made from samples."""
+
+    hypotheses_scored: int = 0
+    """The number of hypotheses scored against every data point."""
+
+    degenerate_retries: int = 0
+    """The number of degenerate samples that were redrawn."""
+
+    iterations: int = 0
+    """The number of iterations run."""
+
+    termination_iteration: Optional[int] = None
+    """The iteration at which the adaptive bound or a stop event stopped
+    the run (None if the run used all params.iterations)."""
+
+    best_support: List[Tuple[int, int]] = field(default_factory=list)
+    """The iteration and support of each new best hypothesis."""
+
+    confidence: float = 0.
+    """The confidence reached that the best hypothesis was found, given
+    the inlier ratio of the best hypothesis and the iterations run."""
+
+    timed_out: bool = False
+    """Whether the run was stopped by params.time_budget or params.deadline."""
+
+    _last: float = field(default=0., init=False, repr=False, compare=False)
+
+    def reset(self) -> None:
+        """Clears the statistics and starts timing a run.
+
+        :return: None
+        """
+        self.timings = {}
+        self.hypotheses_generated = 0
+        self.hypotheses_scored = 0
+        self.degenerate_retries = 0
+        self.iterations = 0
+        self.termination_iteration = None
+        self.best_support = []
+        self.confidence = 0.
+        self.timed_out = False
+        self._last = perf_counter()
+
+    def lap(self, phase: str) -> None:
+        """Adds the time since the previous lap to a phase.
+
+        :param phase: name of the phase that just ended
+        :return: None
+        """
+        now = perf_counter()
+        self.timings[phase] = self.timings.get(phase, 0.) + now - self._last
+        self._last = now
+
+    def finish(self, iterations: int, stopped_early: bool) -> None:
+        """Records the end of a run and calls the callback.
+
+        :param iterations: number of iterations run
+        :param stopped_early: whether the run stopped before params.iterations
+        :return: None
+        """
+        self.iterations = iterations
+        self.termination_iteration = iterations if stopped_early else None
+        if self.callback is not None:
+            self.callback(self)
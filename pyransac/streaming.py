@@ -0,0 +1,260 @@
+"""Streaming random sample consensus (RANSAC) module.
+
+This module contains an online version of RANSAC for 2D lines that is
+updated as points are added to and removed from a window.
+"""
+
+# Standard library imports
+from collections import Counter
+from typing import List, Optional, Union
+
+# Third party imports
+import numpy as np
+
+# Local application imports
+from pyransac.line2d import Line2D, Point2D, PointCloud2D
+from pyransac.sampling import _draw_samples
+
+
+class StreamingRansac:
+    """Online RANSAC for 2D lines over a changing window of points.
+
+    A pool of line hypotheses is kept with the number of window points
+    supporting each one. Adding or removing a batch of points only scores
+    that batch against the pool. New hypotheses, which must be scored
+    against the whole window, replace the weakest ones at a rate of
+    refresh_rate hypotheses per window's worth of added points, so the
+    amortised cost of an update is proportional to the batch size.
+    """
+
+    def __init__(self, threshold: float, pool_size: int = 64, refresh_rate: float = 4.,
+                 seed: Optional[Union[int, np.random.Generator]] = None):
+        """
+        :param threshold: error threshold to consider a point an inlier
+        :param pool_size: number of hypotheses kept in the pool
+        :param refresh_rate: number of new hypotheses per window's worth of
+            added points
+        :param seed: seed for the random number generator, or a NumPy Generator
+        """
+        self.threshold = threshold
+        self.pool_size = pool_size
+        self.refresh_rate = refresh_rate
+
+        self._rng = np.random.default_rng(seed)
+        self._line = Line2D()
+
+        self._x = np.empty(0)
+        self._y = np.empty(0)
+        self._index = np.empty(0, dtype=np.intp)
+        self._alive = np.empty(0, dtype=bool)
+        self._free = []
+        self._slots = {}
+        self._size = 0
+
+        self._models = np.empty((0, 3))
+        self._samples = np.empty((0, 4))
+        self._support = np.empty(0, dtype=np.intp)
+        self._budget = 0.
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def best_model(self) -> Optional[Line2D]:
+        """
+            Gets the hypothesis with the most supporters in the window.
+
+            :return: best line (None if no hypothesis has any supporters)
+        """
+        if len(self._support) == 0 or self._support.max() == 0:
+            return None
+
+        x_1, y_1, x_2, y_2 = self._samples[int(np.argmax(self._support))]
+        model = Line2D()
+        model.make_model([Point2D(x_1, y_1), Point2D(x_2, y_2)])
+        return model
+
+    @property
+    def support(self) -> int:
+        """
+            Gets the number of window points supporting the best hypothesis.
+
+            :return: number of supporters
+        """
+        return int(self._support.max()) if len(self._support) else 0
+
+    def inliers(self) -> PointCloud2D:
+        """
+            Gets the window points supporting the best hypothesis.
+
+            This scans the whole window.
+
+            :return: point cloud of supporters, with their indexes
+        """
+        slots = np.flatnonzero(self._alive)
+        if len(self._support) == 0:
+            slots = slots[:0]
+        else:
+            best = self._models[int(np.argmax(self._support))][np.newaxis]
+            errors = self._line.calc_errors_batch(best, self._window(slots))[0]
+            slots = slots[errors <= self.threshold]
+
+        index = self._index[slots]
+        return PointCloud2D(self._x[slots], self._y[slots], None if (index < 0).any() else index)
+
+    def add(self, points: Union[List[Point2D], PointCloud2D]) -> None:
+        """
+            Adds a batch of points to the window.
+
+            :param points: data points to add
+            :return: None
+        """
+        cloud = self._line.prepare_points(points)
+        if len(cloud) == 0:
+            return
+
+        if len(self._models):
+            self._support += self._count(cloud)
+
+        for point in _points(points, cloud):
+            self._insert(point)
+
+        self._budget += self.refresh_rate * len(cloud)
+        self._refresh()
+
+    def remove(self, points: Union[List[Point2D], PointCloud2D]) -> None:
+        """
+            Removes a batch of points from the window.
+
+            :param points: data points to remove, which must be in the window
+            :return: None
+        """
+        cloud = self._line.prepare_points(points)
+        if len(cloud) == 0:
+            return
+
+        # Check the whole batch before changing the window
+        batch = list(_points(points, cloud))
+        for key, count in Counter(_key(point) for point in batch).items():
+            if len(self._slots.get(key, ())) < count:
+                raise ValueError(f'{Point2D(*key)} is not in the window')
+
+        for point in batch:
+            slots = self._slots[_key(point)]
+            slot = slots.pop()
+            if not slots:
+                del self._slots[_key(point)]
+
+            self._alive[slot] = False
+            self._free.append(slot)
+            self._size -= 1
+
+        if len(self._models):
+            self._support -= self._count(cloud)
+
+    def _count(self, cloud: PointCloud2D) -> np.ndarray:
+        """
+            Counts the points of a batch supporting each hypothesis.
+
+            :param cloud: batch of points
+            :return: number of supporters per hypothesis
+        """
+        errors = self._line.calc_errors_batch(self._models, cloud)
+        return np.count_nonzero(errors <= self.threshold, axis=1)
+
+    def _insert(self, point: Point2D) -> None:
+        """
+            Stores a point in a free slot, growing the slot arrays if needed.
+
+            :param point: data point to store
+            :return: None
+        """
+        if not self._free:
+            capacity = len(self._x)
+            grown = max(16, 2 * capacity)
+            self._x = np.resize(self._x, grown)
+            self._y = np.resize(self._y, grown)
+            self._index = np.resize(self._index, grown)
+            self._alive = np.concatenate((self._alive, np.zeros(grown - capacity, dtype=bool)))
+            self._free = list(range(grown - 1, capacity - 1, -1))
+
+        slot = self._free.pop()
+        self._x[slot] = point.x
+        self._y[slot] = point.y
+        self._index[slot] = -1 if point.index is None else point.index
+        self._alive[slot] = True
+        self._slots.setdefault(_key(point), []).append(slot)
+        self._size += 1
+
+    def _window(self, slots: np.ndarray) -> PointCloud2D:
+        """
+            Gets the points in the given slots.
+
+            :param slots: array of slots
+            :return: point cloud of the points
+        """
+        return PointCloud2D(self._x[slots], self._y[slots])
+
+    def _refresh(self) -> None:
+        """
+            Fills the hypothesis pool, then replaces its weakest hypotheses
+            while the refresh budget allows.
+
+            :return: None
+        """
+        if self._size < 2:
+            return
+
+        missing = self.pool_size - len(self._models)
+        if missing > 0:
+            count = missing
+        else:
+            count = min(int(self._budget // self._size), self.pool_size - 1)
+            self._budget = min(self._budget - count * self._size, self._size)
+
+        if count <= 0:
+            return
+
+        slots = np.flatnonzero(self._alive)
+        window = self._window(slots)
+        samples = _draw_samples(self._rng, len(slots), count, 2)
+        models = self._line.make_models(window, samples)
+        support = np.count_nonzero(self._line.calc_errors_batch(models, window) <= self.threshold,
+                                   axis=1)
+        coordinates = np.column_stack((window.x[samples[:, 0]], window.y[samples[:, 0]],
+                                       window.x[samples[:, 1]], window.y[samples[:, 1]]))
+
+        if missing > 0:
+            self._models = np.concatenate((self._models, models))
+            self._samples = np.concatenate((self._samples, coordinates))
+            self._support = np.concatenate((self._support, support))
+            return
+
+        weakest = np.argsort(self._support, kind='stable')[:count]
+        self._models[weakest] = models
+        self._samples[weakest] = coordinates
+        self._support[weakest] = support
+
+
+def _points(points: Union[List[Point2D], PointCloud2D], cloud: PointCloud2D):
+    """
+        Gets the data points of a batch with their own indexes.
+
+        PointCloud2D.from_points drops the index column unless every point
+        has an index, so lists of points are read directly.
+
+        :param points: batch of data points as given by the caller
+        :param cloud: the same points as a point cloud
+        :return: iterable of data points
+    """
+    return points if isinstance(points, (list, tuple)) else cloud
+
+
+def _key(point: Point2D) -> tuple:
+    """
+        Gets the key used to look up the slots of a point in the window.
+
+        :param point: data point
+        :return: tuple of the point's coordinates and index
+    """
+    return point.x, point.y, point.index
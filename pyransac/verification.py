@@ -0,0 +1,209 @@
+"""Pre-verification module.
+
+This module contains randomised pre-verification tests that reject bad
+hypotheses after evaluating only a few data points, so that only
+promising hypotheses are scored against every data point.
+"""
+
+# Standard library imports
+import abc
+from math import log
+from typing import Optional
+
+# Third party imports
+import numpy as np
+
+# Local application imports
+from pyransac.base import Model, _take
+
+
+class Verifier(abc.ABC):
+    """ABC class for hypothesis pre-verification tests.
+
+    Derivative classes should extend this class and implement its
+    interface. A verifier is reset at the start of every RANSAC run and
+    then asked whether each hypothesis deserves to be scored.
+    """
+    @abc.abstractmethod
+    def reset(self, data, threshold: float, rng: np.random.Generator) -> None:
+        """Prepares the verifier for a RANSAC run.
+
+        :param data: data points as returned by the model's prepare_points
+        :param threshold: error threshold to consider data point an inlier
+        :param rng: random number generator to draw from
+        """
+
+    @abc.abstractmethod
+    def is_promising(self, model: Model) -> bool:
+        """Checks whether a hypothesis should be scored against all points.
+
+        :param model: hypothesis to test
+        :return: True if the hypothesis passed the test, False if not
+        """
+
+    def update(self, support: int) -> None:
+        """Records the support of a hypothesis that was fully scored.
+
+        The default implementation does nothing.
+
+        :param support: number of supporters of the hypothesis
+        """
+
+    def verified_support(self) -> Optional[int]:
+        """Gets the support of the last hypothesis that passed, if known.
+
+        Verifiers that evaluate every data point before passing a
+        hypothesis return its number of supporters, so that it need not
+        be scored again. The default implementation returns None.
+
+        :return: number of supporters (None if not every point was evaluated)
+        """
+        return None
+
+
+class TddVerifier(Verifier):
+    """T(d,d) pre-verification test.
+
+    A hypothesis passes only if d randomly selected data points are all
+    inliers, as described by Matas and Chum in "Randomized RANSAC with
+    T(d,d) test".
+    """
+    def __init__(self, d: int = 1):
+        """
+        :param d: number of data points to test
+        """
+        self.d = d
+
+        self._data = None
+        self._threshold = 0.
+        self._rng = None
+
+    def reset(self, data, threshold: float, rng: np.random.Generator) -> None:
+        self._data = data
+        self._threshold = threshold
+        self._rng = rng
+
+    def is_promising(self, model: Model) -> bool:
+        indices = self._rng.choice(len(self._data), size=min(self.d, len(self._data)),
+                                   replace=False)
+        errors = model.calc_errors(_take(self._data, indices))
+        return bool((errors <= self._threshold).all())
+
+
+class SprtVerifier(Verifier):
+    """Sequential probability ratio test (SPRT) pre-verification.
+
+    Evaluates data points in a random order and rejects a hypothesis as
+    soon as the likelihood ratio of it being bad rather than good exceeds
+    a threshold, following Chum and Matas in "Optimal randomized RANSAC".
+    The inlier ratio of good hypotheses (epsilon) and of bad hypotheses
+    (delta) are re-estimated during the run. Points are evaluated in
+    chunks that double in size, so a hypothesis may be rejected a few
+    points after the ratio crosses the threshold. A hypothesis only passes
+    once every point has been evaluated, so its support is known without
+    scoring it again.
+    """
+    def __init__(self, epsilon: float = 0.1, delta: float = 0.01,
+                 model_time: float = 200., chunk: int = 32):
+        """
+        :param epsilon: initial inlier ratio of a good hypothesis
+        :param delta: initial inlier ratio of a bad hypothesis
+        :param model_time: time to make a model, in units of the time to
+            calculate the error of one data point
+        :param chunk: number of data points in the first chunk evaluated
+        """
+        self.epsilon = epsilon
+        self.delta = delta
+        self.model_time = model_time
+        self.chunk = chunk
+
+        self._data = None
+        self._threshold = 0.
+        self._order = None
+        self._epsilon = epsilon
+        self._delta = delta
+        self._log_a = 0.
+        self._rejected_inliers = 0
+        self._rejected_tested = 0
+        self._support = None
+
+    def reset(self, data, threshold: float, rng: np.random.Generator) -> None:
+        self._data = data
+        self._threshold = threshold
+        self._order = rng.permutation(len(data))
+        self._epsilon = self.epsilon
+        self._delta = self.delta
+        self._rejected_inliers = 0
+        self._rejected_tested = 0
+        self._support = None
+        self._update_decision_threshold()
+
+    def is_promising(self, model: Model) -> bool:
+        inlier_step = log(self._delta / self._epsilon)
+        outlier_step = log((1 - self._delta) / (1 - self._epsilon))
+
+        ratio = 0.
+        inliers = 0
+        start = 0
+        size = self.chunk
+        self._support = None
+        while start < len(self._order):
+            indices = self._order[start:start + size]
+            is_inlier = model.calc_errors(_take(self._data, indices)) <= self._threshold
+            ratios = ratio + np.cumsum(np.where(is_inlier, inlier_step, outlier_step))
+
+            rejected = np.flatnonzero(ratios > self._log_a)
+            if len(rejected):
+                stop = rejected[0] + 1
+                self._record_rejection(inliers + np.count_nonzero(is_inlier[:stop]), start + stop)
+                return False
+
+            ratio = ratios[-1]
+            inliers += np.count_nonzero(is_inlier)
+            start += size
+            size *= 2
+
+        self._support = int(inliers)
+        return True
+
+    def verified_support(self) -> Optional[int]:
+        return self._support
+
+    def update(self, support: int) -> None:
+        epsilon = support / len(self._order)
+        if self._delta < epsilon < 1 and epsilon > self._epsilon:
+            self._epsilon = epsilon
+            self._update_decision_threshold()
+
+    def _record_rejection(self, inliers: int, tested: int) -> None:
+        """Re-estimate delta from the inlier ratio of rejected hypotheses.
+
+        :param inliers: number of inliers among the tested points
+        :param tested: number of points tested before rejection
+        """
+        self._rejected_inliers += inliers
+        self._rejected_tested += tested
+
+        delta = max(self._rejected_inliers / self._rejected_tested, 1e-6)
+        if delta < self._epsilon and abs(delta - self._delta) > 0.05 * self._delta:
+            self._delta = delta
+            self._update_decision_threshold()
+
+    def _update_decision_threshold(self) -> None:
+        """Calculate the SPRT decision threshold A from epsilon and delta.
+
+        A is the fixed point of A = model_time * C + 1 + log(A), where C
+        is the Kullback-Leibler divergence between the bad and good
+        hypothesis distributions.
+        """
+        epsilon = self._epsilon
+        delta = self._delta
+        divergence = ((1 - delta) * log((1 - delta) / (1 - epsilon)) +
+                      delta * log(delta / epsilon))
+
+        k = self.model_time * divergence + 1
+        decision = k
+        for _ in range(10):
+            decision = k + log(decision)
+
+        self._log_a = log(decision)
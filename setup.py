@@ -26,6 +26,7 @@ setuptools.setup(
     ],
     python_requires='>=3.7',
     install_requires=[
+        "numpy",
         "scipy >=1.10.1",
     ]
 )
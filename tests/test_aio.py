@@ -0,0 +1,106 @@
+"""Test cases for the aio module.
+
+This module contains tests for the asynchronous RANSAC coroutines.
+"""
+
+# Standard library imports
+import asyncio
+import threading
+import time
+import unittest
+
+# Third party imports
+import numpy as np
+
+# Local application imports
+from pyransac import aio
+from pyransac import line2d
+from pyransac import ransac
+from pyransac import stats
+
+
+class TestAio(unittest.TestCase):
+    """Test the aio module.
+
+    """
+    def setUp(self) -> None:
+        """Make a line among many outliers, and parameters that would take
+        millions of iterations to reach their confidence.
+
+        :return: None
+        """
+        rng = np.random.default_rng(0)
+        x = rng.uniform(0, 100, 1000)
+        y = rng.uniform(0, 100, 1000)
+        y[:20] = x[:20] + 1
+        self.cloud = line2d.PointCloud2D(x, y)
+        self.slow_params = ransac.RansacParams(samples=2, iterations=10 ** 9, confidence=1 - 1e-12,
+                                               threshold=0.01, expected_angle=45, seed=0)
+
+    def test_find_inliers_async(self) -> None:
+        """Test that find_inliers_async gives the result of find_inliers.
+
+        :return: None
+        """
+        params = ransac.RansacParams(samples=2, iterations=200, confidence=0.99, threshold=0.01,
+                                     seed=0)
+
+        inliers = asyncio.run(aio.find_inliers_async(self.cloud, line2d.Line2D(), params))
+        expected = ransac.find_inliers(self.cloud, line2d.Line2D(), params)
+
+        np.testing.assert_array_equal(inliers.x, expected.x)
+
+    def test_timeout(self) -> None:
+        """Test that a timeout returns the best inliers found so far.
+
+        :return: None
+        """
+        run_stats = stats.RansacStats()
+
+        async def fit_and_tick():
+            ticks = 0
+
+            async def tick():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            ticker = asyncio.ensure_future(tick())
+            inliers = await aio.find_inliers_async(self.cloud, line2d.Line2D(), self.slow_params,
+                                                   timeout=0.2, stats=run_stats)
+            ticker.cancel()
+            return inliers, ticks
+
+        start = time.perf_counter()
+        inliers, ticks = asyncio.run(fit_and_tick())
+
+        self.assertLess(time.perf_counter() - start, 5)
+        self.assertGreater(ticks, 0)
+        self.assertGreater(len(inliers), 0)
+        self.assertLess(run_stats.iterations, self.slow_params.iterations)
+
+    def test_cancel(self) -> None:
+        """Test that cancelling the coroutine stops the search.
+
+        :return: None
+        """
+        finished = threading.Event()
+        run_stats = stats.RansacStats(callback=lambda _: finished.set())
+
+        async def cancel():
+            task = asyncio.ensure_future(aio.find_inliers_custom_async(
+                self.cloud, line2d.Line2D(), self.slow_params, stats=run_stats))
+            await asyncio.sleep(0.1)
+            task.cancel()
+            await asyncio.wait({task})
+            return task
+
+        task = asyncio.run(cancel())
+
+        self.assertTrue(task.cancelled())
+        self.assertTrue(finished.wait(5))
+
+
+if __name__ == '__main__':
+    unittest.main()
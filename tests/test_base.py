@@ -6,10 +6,27 @@ This module contains tests for the base module definitions.
 # Standard library imports
 import unittest
 
+# Third party imports
+import numpy as np
+
 # Local application imports
 from pyransac import base
 
 
+class _AbsoluteModel(base.Model):
+    """Scalar-only model used to exercise the Model defaults.
+
+    """
+    def __init__(self):
+        self.centre = 0
+
+    def make_model(self, points) -> None:
+        self.centre = points[0]
+
+    def calc_error(self, point) -> float:
+        return abs(point - self.centre)
+
+
 class TestRansac(unittest.TestCase):
     """Tests the Model base class.
 
@@ -20,6 +37,58 @@ class TestRansac(unittest.TestCase):
         """
         self.assertRaises(TypeError, base.Model)
 
+    def test_is_degenerate_default(self):
+        """Test that the default is_degenerate accepts every sample.
+
+        """
+        self.assertFalse(_AbsoluteModel().is_degenerate([1, 1]))
+
+    def test_prepare_points_default(self):
+        """Test that the default prepare_points returns its input.
+
+        """
+        points = [1, -2, 3]
+
+        self.assertIs(_AbsoluteModel().prepare_points(points), points)
+
+    def test_calc_errors_fallback(self):
+        """Test that the default calc_errors falls back to calc_error.
+
+        """
+        errors = _AbsoluteModel().calc_errors([1, -2, 3])
+
+        self.assertEqual(errors.tolist(), [1, 2, 3])
+
+    def test_calc_errors_out(self):
+        """Test that the default calc_errors stores the errors in a given array.
+
+        """
+        out = np.zeros(3)
+
+        self.assertIs(_AbsoluteModel().calc_errors([1, -2, 3], out=out), out)
+        self.assertEqual(out.tolist(), [1, 2, 3])
+
+    def test_make_models_fallback(self):
+        """Test that the default make_models copies the model per sample.
+
+        """
+        model = _AbsoluteModel()
+        models = model.make_models([5, 7, 9], np.array([[1], [2]]))
+
+        self.assertEqual([m.centre for m in models], [7, 9])
+        self.assertEqual(model.centre, 0)
+
+    def test_calc_errors_batch_fallback(self):
+        """Test that the default calc_errors_batch stacks calc_errors.
+
+        """
+        model = _AbsoluteModel()
+        models = model.make_models([5, 7], np.array([[0], [1]]))
+
+        errors = model.calc_errors_batch(models, [5, 7, 9])
+
+        self.assertEqual(errors.tolist(), [[0, 2, 4], [2, 0, 2]])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,130 @@
+"""Test cases for the grid module.
+
+This module contains tests for the spatial grid index.
+"""
+
+# Standard library imports
+import unittest
+
+# Third party imports
+import numpy as np
+
+# Local application imports
+from pyransac import grid
+from pyransac import line2d
+from pyransac import ransac
+
+
+class TestGridIndex(unittest.TestCase):
+    """Test the uniform grid index.
+
+    """
+    def _assert_same_support(self, index: grid.GridIndex, cloud: line2d.PointCloud2D,
+                             model: line2d.Line2D, threshold: float) -> None:
+        """Assert that the index finds the same supporters as a full scan.
+
+        :param index: grid index built over cloud
+        :param cloud: point cloud
+        :param model: line to find the supporters of
+        :param threshold: error threshold to consider a point an inlier
+        :return: None
+        """
+        expected = np.flatnonzero(model.calc_errors(cloud) <= threshold)
+        self.assertEqual(index.support_indices(model, threshold).tolist(), expected.tolist())
+
+    def test_support_indices(self) -> None:
+        """Test that supporters match a full scan for random lines.
+
+        :return: None
+        """
+        rng = np.random.default_rng(0)
+        cloud = line2d.PointCloud2D(rng.uniform(0, 100, 5000), rng.uniform(-20, 30, 5000))
+        index = grid.GridIndex()
+        index.reset(cloud)
+
+        for _ in range(0, 200):
+            model = line2d.Line2D()
+            model.make_model([cloud[int(j)] for j in rng.choice(len(cloud), 2, replace=False)])
+            self._assert_same_support(index, cloud, model, 0.5)
+
+    def test_thin_cloud(self) -> None:
+        """Test that a thin, axis-aligned cloud gets no more cells than points.
+
+        :return: None
+        """
+        rng = np.random.default_rng(0)
+        cloud = line2d.PointCloud2D(rng.uniform(0, 1000, 10000), rng.normal(0, 1e-5, 10000))
+        index = grid.GridIndex()
+        index.reset(cloud)
+
+        columns, rows = index.shape
+        self.assertLessEqual(columns * rows, 2 * len(cloud) + 2)
+
+        model = line2d.Line2D()
+        model.make_model([line2d.Point2D(0, 0), line2d.Point2D(1000, 0)])
+        self._assert_same_support(index, cloud, model, 1e-6)
+
+    def test_axis_aligned_lines(self) -> None:
+        """Test that supporters match a full scan for vertical and horizontal lines.
+
+        :return: None
+        """
+        cloud = line2d.PointCloud2D(np.repeat(np.arange(0., 10), 10),
+                                    np.tile(np.arange(0., 10), 10))
+        index = grid.GridIndex(cell_size=3)
+        index.reset(cloud)
+
+        vertical = line2d.Line2D()
+        vertical.make_model([line2d.Point2D(4, 0), line2d.Point2D(4, 1)])
+        horizontal = line2d.Line2D()
+        horizontal.make_model([line2d.Point2D(0, 9), line2d.Point2D(1, 9)])
+
+        self._assert_same_support(index, cloud, vertical, 0)
+        self._assert_same_support(index, cloud, horizontal, 1)
+
+    def test_line_outside_grid(self) -> None:
+        """Test that a line that misses the grid has no supporters.
+
+        :return: None
+        """
+        index = grid.GridIndex()
+        index.reset([line2d.Point2D(x, x) for x in range(0, 10)])
+
+        model = line2d.Line2D()
+        model.make_model([line2d.Point2D(0, 100), line2d.Point2D(1, 100)])
+
+        self.assertEqual(len(index.support_indices(model, 1)), 0)
+
+    def test_identical_points(self) -> None:
+        """Test an index over points at a single position.
+
+        :return: None
+        """
+        index = grid.GridIndex()
+        index.reset([line2d.Point2D(1, 1)] * 3)
+
+        model = line2d.Line2D()
+        model.make_model([line2d.Point2D(0, 0), line2d.Point2D(2, 2)])
+
+        self.assertEqual(index.support_indices(model, 0.1).tolist(), [0, 1, 2])
+
+    def test_find_inliers_index(self) -> None:
+        """Test that find_inliers gives the same inliers with an index.
+
+        :return: None
+        """
+        rng = np.random.default_rng(0)
+        x = rng.uniform(0, 100, 300)
+        cloud = line2d.PointCloud2D(np.concatenate((x, rng.uniform(0, 100, 300))),
+                                    np.concatenate((0.5 * x + 10, rng.uniform(0, 100, 300))))
+        params = ransac.RansacParams(samples=2, iterations=100, confidence=0.999, threshold=0.5,
+                                     seed=0)
+
+        inliers = ransac.find_inliers(cloud, line2d.Line2D(), params)
+        indexed = ransac.find_inliers(cloud, line2d.Line2D(), params, index=grid.GridIndex())
+
+        self.assertEqual(indexed.to_array().tolist(), inliers.to_array().tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
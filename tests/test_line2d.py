@@ -10,6 +10,9 @@ import unittest
 
 from unittest.mock import MagicMock
 
+# Third party imports
+import numpy as np
+
 # Local application imports
 from pyransac import line2d
 
@@ -201,6 +204,77 @@ class TestPoint2D(unittest.TestCase):
         self.assertNotEqual(hash(test_point_1), hash(test_point_2))
 
 
+class TestPointCloud2D(unittest.TestCase):
+    """
+        Test the array-backed 2D point cloud.
+    """
+    def test_from_points(self) -> None:
+        """
+            Test conversion from Point2D objects without indexes.
+        """
+        cloud = line2d.PointCloud2D.from_points([line2d.Point2D(1, 2), line2d.Point2D(3, 4)])
+
+        self.assertEqual(len(cloud), 2)
+        self.assertEqual(cloud.x.dtype, np.float64)
+        self.assertEqual(cloud.x.tolist(), [1, 3])
+        self.assertEqual(cloud.y.tolist(), [2, 4])
+        self.assertIsNone(cloud.index)
+
+    def test_from_points_with_index(self) -> None:
+        """
+            Test that indexes survive conversion to and from a point cloud.
+        """
+        points = [line2d.Point2D(1, 2, 7), line2d.Point2D(3, 4, 9)]
+        cloud = line2d.PointCloud2D.from_points(points)
+
+        self.assertEqual(cloud.index.tolist(), [7, 9])
+        self.assertEqual(cloud.to_points(), points)
+
+    def test_float32(self) -> None:
+        """
+            Test that float32 clouds keep their coordinate type when sliced and converted.
+        """
+        cloud = line2d.PointCloud2D.from_array([[0, 1], [2, 3], [4, 5]], dtype=np.float32)
+
+        self.assertEqual(cloud.dtype, np.float32)
+        self.assertEqual(cloud[1:].dtype, np.float32)
+        self.assertEqual(cloud[[0, 2]].y.dtype, np.float32)
+        self.assertEqual(cloud.astype(np.float64).dtype, np.float64)
+        self.assertEqual(cloud.astype(np.float64).x.tolist(), [0, 2, 4])
+
+    def test_invalid_dtype(self) -> None:
+        """
+            Test that only float32 and float64 coordinates are accepted.
+        """
+        with self.assertRaises(ValueError):
+            line2d.PointCloud2D([0], [1], dtype=np.int64)
+
+    def test_getitem(self) -> None:
+        """
+            Test integer, slice and index array access.
+        """
+        cloud = line2d.PointCloud2D.from_array([[0, 1], [2, 3], [4, 5]], index=[10, 11, 12])
+
+        self.assertEqual(cloud[1], line2d.Point2D(2, 3, 11))
+        self.assertTrue(np.shares_memory(cloud[1:].x, cloud.x))
+        self.assertEqual(cloud[np.array([2, 0])].index.tolist(), [12, 10])
+
+    def test_mismatched_lengths(self) -> None:
+        """
+            Test that mismatched coordinate arrays are rejected.
+        """
+        self.assertRaises(ValueError, line2d.PointCloud2D, [1, 2], [1])
+        self.assertRaises(ValueError, line2d.PointCloud2D, [1, 2], [1, 2], [0])
+
+    def test_from_array_columns(self) -> None:
+        """
+            Test that arrays without exactly two coordinates per point are rejected.
+        """
+        self.assertRaises(ValueError, line2d.PointCloud2D.from_array, np.zeros((4, 3)))
+        self.assertRaises(ValueError, line2d.Line2D().calc_errors, np.zeros((4, 3)))
+        self.assertEqual(len(line2d.PointCloud2D.from_array(np.empty((0, 2)))), 0)
+
+
 class TestLine2D(unittest.TestCase):
     """
 		Test the 2D line module.
@@ -244,6 +318,16 @@ class TestLine2D(unittest.TestCase):
         self.assertRaises(ValueError, test_model.make_model, [(1, 1)])
         self.assertRaises(ValueError, test_model.make_model, [(1, 1) * 3])
 
+    def test_is_degenerate(self) -> None:
+        """
+            Test degenerate sample detection, ignoring point indexes.
+        """
+        test_model = line2d.Line2D()
+
+        self.assertTrue(test_model.is_degenerate([line2d.Point2D(1, 2, 0),
+                                                  line2d.Point2D(1, 2, 1)]))
+        self.assertFalse(test_model.is_degenerate([line2d.Point2D(1, 2), line2d.Point2D(1, 3)]))
+
     def test_make_model_vertical(self) -> None:
         """
 			Test 2D line model against vertical line.
@@ -299,6 +383,79 @@ class TestLine2D(unittest.TestCase):
         """
                 ************** Line2D Get Error **************    
         """
+    def test_fit_sloped(self) -> None:
+        """
+            Test total least squares fitting of a noisy sloped line.
+        """
+        test_model = line2d.Line2D()
+        x = np.linspace(0, 10, 50)
+        y = 2 * x + 1 + np.tile([0.1, -0.1], 25)
+
+        test_model.fit(line2d.PointCloud2D(x, y))
+
+        self.assertAlmostEqual(test_model.slope, 2, places=2)
+        self.assertAlmostEqual(test_model.y_int, 1, places=1)
+        self.assertAlmostEqual(test_model.angle, test_model.get_angle(test_model.slope))
+
+    def test_fit_vertical(self) -> None:
+        """
+            Test total least squares fitting of a vertical line.
+        """
+        test_model = line2d.Line2D()
+
+        test_model.fit([line2d.Point2D(x=3, y=y) for y in range(0, 5)])
+
+        self.assertTrue(math.isnan(test_model.slope))
+        self.assertTrue(math.isnan(test_model.y_int))
+        self.assertEqual(test_model.x_int, 3)
+
+    def test_fit_horizontal(self) -> None:
+        """
+            Test total least squares fitting of a horizontal line.
+        """
+        test_model = line2d.Line2D()
+
+        test_model.fit([line2d.Point2D(x=x, y=4) for x in range(0, 5)])
+
+        self.assertEqual(test_model.slope, 0)
+        self.assertEqual(test_model.y_int, 4)
+        self.assertTrue(math.isnan(test_model.x_int))
+
+    def test_fit_too_few_points(self) -> None:
+        """
+            Test that fitting needs at least two points.
+        """
+        self.assertRaises(ValueError, line2d.Line2D().fit, [line2d.Point2D(1, 1)])
+
+    def test_is_duplicate_horizontal(self) -> None:
+        """
+            Test that nearly horizontal lines are compared by angle and offset.
+        """
+        line = line2d.Line2D()
+        line.make_model([line2d.Point2D(0, 5), line2d.Point2D(10, 5)])
+        tilted = line2d.Line2D()
+        tilted.make_model([line2d.Point2D(0, 5), line2d.Point2D(10, 5.01)])
+        shifted = line2d.Line2D()
+        shifted.make_model([line2d.Point2D(0, 7), line2d.Point2D(10, 7)])
+
+        self.assertTrue(line.is_duplicate(tilted, 0.1))
+        self.assertFalse(line.is_duplicate(shifted, 0.1))
+
+    def test_is_duplicate_vertical(self) -> None:
+        """
+            Test that vertical lines match nearly vertical lines of either sign of slope.
+        """
+        line = line2d.Line2D()
+        line.make_model([line2d.Point2D(5, 0), line2d.Point2D(5, 10)])
+        leaning = line2d.Line2D()
+        leaning.make_model([line2d.Point2D(5, 0), line2d.Point2D(5.01, 10)])
+        other_way = line2d.Line2D()
+        other_way.make_model([line2d.Point2D(5, 0), line2d.Point2D(4.99, 10)])
+
+        self.assertTrue(line.is_duplicate(leaning, 0.1))
+        self.assertTrue(leaning.is_duplicate(other_way, 0.1))
+        self.assertFalse(line.is_duplicate(line2d.Line2D(), 0.1))
+
     def test_get_angle_positive_slope(self):
         """
             Test that get_angle returns the correct angle for a positive slope.
@@ -387,6 +544,98 @@ class TestLine2D(unittest.TestCase):
 
         self.assertAlmostEqual(error, 8 * math.sqrt(10) / 5)
 
+    """
+        ************** Line2D Get Errors **************    
+    """
+
+    def test_prepare_points(self) -> None:
+        """
+            Test conversion of Point2D objects to a point cloud.
+        """
+        test_model = line2d.Line2D()
+
+        data = test_model.prepare_points([line2d.Point2D(1, 2), line2d.Point2D(3, 4)])
+
+        self.assertIsInstance(data, line2d.PointCloud2D)
+        self.assertEqual(data.to_array().tolist(), [[1, 2], [3, 4]])
+        self.assertEqual(len(test_model.prepare_points([])), 0)
+        self.assertIs(test_model.prepare_points(data), data)
+
+    def test_calc_errors_matches_calc_error(self) -> None:
+        """
+            Test that the vectorised errors match the per-point errors for
+            vertical, horizontal and sloped lines.
+        """
+        points = [line2d.Point2D(x, y) for x, y in [(1, 2), (2, 1), (5, 1), (6, 1), (-3, 4)]]
+        models = [line2d.Line2D(slope=math.nan, y_int=math.nan, x_int=3),
+                  line2d.Line2D(slope=0, y_int=5, x_int=math.nan),
+                  line2d.Line2D(slope=2, y_int=2, x_int=-1),
+                  line2d.Line2D(slope=-3, y_int=3, x_int=1)]
+
+        for test_model in models:
+            errors = test_model.calc_errors(test_model.prepare_points(points))
+            for point, error in zip(points, errors):
+                self.assertAlmostEqual(test_model.calc_error(point), error)
+
+    def test_calc_errors_out(self) -> None:
+        """
+            Test that calc_errors stores the errors in a given array, in the
+            coordinates' type.
+        """
+        points = line2d.PointCloud2D([1, 2, 5, -3], [2, 1, 1, 4])
+        models = [line2d.Line2D(slope=math.nan, y_int=math.nan, x_int=3),
+                  line2d.Line2D(slope=0, y_int=5, x_int=math.nan),
+                  line2d.Line2D(slope=-3, y_int=3, x_int=1)]
+        out = np.empty(4)
+
+        for test_model in models:
+            errors = test_model.calc_errors(points, out=out)
+            self.assertIs(errors, out)
+            np.testing.assert_allclose(errors, [test_model.calc_error(point) for point in points])
+
+            errors = test_model.calc_errors(points.astype(np.float32))
+            self.assertEqual(errors.dtype, np.float32)
+            np.testing.assert_allclose(errors, out, rtol=1e-6)
+
+    def test_calc_errors_array_input(self) -> None:
+        """
+            Test that calc_errors accepts a plain (N, 2) array.
+        """
+        test_model = line2d.Line2D(slope=0, y_int=5, x_int=math.nan)
+
+        errors = test_model.calc_errors([[2, 1], [0, 7]])
+
+        self.assertEqual(errors.tolist(), [4, 2])
+
+    def test_calc_errors_batch_matches_make_model(self) -> None:
+        """
+            Test that vectorised line fitting and scoring agree with
+            make_model and calc_errors, including vertical lines.
+        """
+        points = [line2d.Point2D(x, y) for x, y in [(0, 1), (1, 2), (1, 10), (5, 1), (-3, 4)]]
+        samples = np.array([[0, 1], [1, 2], [3, 4]])
+        test_model = line2d.Line2D()
+        data = test_model.prepare_points(points)
+
+        errors = test_model.calc_errors_batch(test_model.make_models(data, samples), data)
+
+        self.assertEqual(errors.shape, (3, 5))
+        for sample, row in zip(samples, errors):
+            test_model.make_model([points[i] for i in sample])
+            np.testing.assert_allclose(row, test_model.calc_errors(data), atol=1e-12)
+
+    def test_make_models_coincident_points(self) -> None:
+        """
+            Test that a sample of two coincident points supports no points.
+        """
+        test_model = line2d.Line2D()
+        data = test_model.prepare_points([line2d.Point2D(1, 1), line2d.Point2D(1, 1)])
+
+        errors = test_model.calc_errors_batch(test_model.make_models(data, np.array([[0, 1]])),
+                                              data)
+
+        self.assertFalse((errors <= 1).any())
+
     """
         ************** Line2D Find Furthest Points **************    
     """
@@ -489,6 +738,50 @@ class TestLine2D(unittest.TestCase):
         self.assertIn(points[0], furthest_points)
         self.assertIn(points[1], furthest_points)
 
+    def test_find_furthest_apart_points_keeps_index(self) -> None:
+        """
+            Test that the furthest points are returned with their original indexes.
+        """
+        test_model = line2d.Line2D()
+
+        points = [line2d.Point2D(0, 0, 7), line2d.Point2D(1, 3, 8), line2d.Point2D(4, 1, 9),
+                  line2d.Point2D(2, 2, 10)]
+        furthest_points = test_model.find_furthest_apart_points(points)
+
+        self.assertIn(points[0], furthest_points)
+        self.assertIn(points[2], furthest_points)
+
+    def test_find_furthest_apart_points_point_cloud(self) -> None:
+        """
+            Test furthest point calculation on a point cloud.
+        """
+        test_model = line2d.Line2D()
+
+        cloud = line2d.PointCloud2D.from_array([[0, 0], [5, 5], [1, 2], [3, 1]], index=[4, 5, 6, 7])
+        furthest_points = test_model.find_furthest_apart_points(cloud)
+
+        self.assertEqual(sorted(point.index for point in furthest_points), [4, 5])
+
+    def test_find_furthest_apart_points_matches_all_pairs(self) -> None:
+        """
+            Test that the hull diameter matches a search over every pair of points.
+        """
+        test_model = line2d.Line2D()
+        rng = np.random.default_rng(0)
+
+        for _ in range(0, 50):
+            coordinates = rng.integers(0, 5, size=(12, 2)).astype(float)
+            points = [line2d.Point2D(x, y) for x, y in coordinates]
+            if len({(point.x, point.y) for point in points}) < 3:
+                continue
+
+            furthest_points = test_model.find_furthest_apart_points(points)
+
+            expected = max(math.dist(a, b) for a in coordinates for b in coordinates)
+            self.assertAlmostEqual(math.dist((furthest_points[0].x, furthest_points[0].y),
+                                             (furthest_points[1].x, furthest_points[1].y)),
+                                   expected)
+
     """
         ************** Line2D Calculate Slope **************    
     """
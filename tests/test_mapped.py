@@ -0,0 +1,151 @@
+"""Test cases for the mapped module.
+
+This module contains tests for the memory-mapped loaders and RANSAC.
+"""
+
+# Standard library imports
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+# Third party imports
+import numpy as np
+
+# Local application imports
+from pyransac import line2d
+from pyransac import mapped
+from pyransac import ransac
+from pyransac import stats
+
+
+class TestMapped(unittest.TestCase):
+    """Test the mapped module.
+
+    """
+    def setUp(self) -> None:
+        """Make a line with outliers and a directory to write it to.
+
+        :return: None
+        """
+        rng = np.random.default_rng(0)
+        x = rng.uniform(0, 100, 300)
+        y = 0.5 * x + 3
+        y[::3] = rng.uniform(0, 100, 100)
+        self.array = np.column_stack((x, y))
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_map_raw(self) -> None:
+        """Test that raw files are mapped as read-only arrays.
+
+        :return: None
+        """
+        path = os.path.join(self.directory.name, 'points.bin')
+        self.array.astype(np.float32).tofile(path)
+
+        points = mapped.map_raw(path)
+
+        self.assertIsInstance(points, np.memmap)
+        self.assertEqual(points.shape, (300, 2))
+        self.assertEqual(points.dtype, np.float32)
+        self.assertFalse(points.flags.writeable)
+        np.testing.assert_array_equal(points, self.array.astype(np.float32))
+
+    def test_map_raw_partial_point(self) -> None:
+        """Test that raw files must hold whole points.
+
+        :return: None
+        """
+        path = os.path.join(self.directory.name, 'points.bin')
+        self.array.ravel()[:5].tofile(path)
+
+        self.assertRaises(ValueError, mapped.map_raw, path, np.float64)
+        self.assertRaises(ValueError, mapped.map_raw, path, np.int32)
+
+    def test_map_npy(self) -> None:
+        """Test that .npy files are mapped as read-only arrays.
+
+        :return: None
+        """
+        path = os.path.join(self.directory.name, 'points.npy')
+        np.save(path, self.array)
+
+        points = mapped.map_npy(path)
+
+        self.assertFalse(points.flags.writeable)
+        np.testing.assert_array_equal(points, self.array)
+
+        np.save(path, self.array.ravel())
+        self.assertRaises(ValueError, mapped.map_npy, path)
+
+    def test_find_inliers_mapped(self) -> None:
+        """Test that chunked scoring finds the same inliers as find_inliers.
+
+        :return: None
+        """
+        path = os.path.join(self.directory.name, 'points.bin')
+        self.array.tofile(path)
+        params = ransac.RansacParams(samples=2, iterations=100, confidence=0.999, threshold=0.01,
+                                     seed=3)
+
+        inliers = mapped.find_inliers_mapped(mapped.map_raw(path, np.float64), line2d.Line2D(),
+                                             params, chunk_size=64)
+        expected = ransac.find_inliers(line2d.PointCloud2D.from_array(self.array), line2d.Line2D(),
+                                       params)
+
+        self.assertEqual(len(inliers), 200)
+        np.testing.assert_array_equal(self.array[inliers, 0], expected.x)
+
+    def test_find_inliers_mapped_supporters_once(self) -> None:
+        """Test that the supporters are only found for the final model
+        when the sampler imposes no bound of its own.
+
+        :return: None
+        """
+        params = ransac.RansacParams(samples=2, iterations=100, confidence=0.999, threshold=0.01,
+                                     seed=3)
+
+        with mock.patch.object(mapped, '_supporters', wraps=mapped._supporters) as supporters:
+            inliers = mapped.find_inliers_mapped(self.array, line2d.Line2D(), params, chunk_size=64)
+
+        self.assertEqual(len(inliers), 200)
+        self.assertEqual(supporters.call_count, 1)
+
+    def test_find_inliers_mapped_stats(self) -> None:
+        """Test that the confidence reached and time-outs are reported.
+
+        :return: None
+        """
+        run_stats = stats.RansacStats()
+        params = ransac.RansacParams(samples=2, iterations=100, confidence=0.999, threshold=0.01,
+                                     seed=3)
+
+        inliers = mapped.find_inliers_mapped(self.array, line2d.Line2D(), params, chunk_size=64,
+                                             stats=run_stats)
+
+        self.assertEqual(run_stats.best_support[-1][1], len(inliers))
+        self.assertFalse(run_stats.timed_out)
+        self.assertGreaterEqual(run_stats.confidence, params.confidence)
+
+        params.time_budget = 0
+        inliers = mapped.find_inliers_mapped(self.array, line2d.Line2D(), params, stats=run_stats)
+
+        self.assertEqual(len(inliers), 0)
+        self.assertTrue(run_stats.timed_out)
+        self.assertEqual(run_stats.confidence, 0)
+
+    def test_find_inliers_mapped_too_few_points(self) -> None:
+        """Test that too few points give no inliers.
+
+        :return: None
+        """
+        params = ransac.RansacParams(samples=2, iterations=10, confidence=0.9, threshold=1)
+
+        self.assertEqual(len(mapped.find_inliers_mapped(self.array[:1], line2d.Line2D(), params)),
+                         0)
+
+
+if __name__ == '__main__':
+    unittest.main()
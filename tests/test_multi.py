@@ -0,0 +1,205 @@
+"""Test cases for the multi module.
+
+This module contains tests for finding several lines in one data set.
+"""
+
+# Standard library imports
+import time
+import unittest
+
+# Third party imports
+import numpy as np
+
+# Local application imports
+from pyransac import line2d
+from pyransac import multi
+from pyransac import ransac
+
+
+class TestFindMultipleLines(unittest.TestCase):
+    """Test sequential multiple line extraction.
+
+    """
+    def test_find_lines(self) -> None:
+        """Test that every line is found with all of its points.
+
+        :return: None
+        """
+        points = ([line2d.Point2D(x, x, x) for x in range(0, 20)] +
+                  [line2d.Point2D(x, 50 - x, 100 + x) for x in range(0, 15)] +
+                  [line2d.Point2D(x, 200, 200 + x) for x in range(0, 10)])
+        params = ransac.RansacParams(samples=2, iterations=200, confidence=0.999, threshold=0.5,
+                                     seed=0)
+
+        lines = multi.find_multiple_lines(points, params, max_models=5, min_support=5)
+
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(lines[0][1].tolist(), list(range(0, 20)))
+        self.assertEqual(lines[1][1].tolist(), list(range(100, 115)))
+        self.assertEqual(lines[2][1].tolist(), list(range(200, 210)))
+        self.assertAlmostEqual(lines[0][0].slope, 1)
+        self.assertAlmostEqual(lines[1][0].slope, -1)
+        self.assertAlmostEqual(lines[2][0].slope, 0)
+
+    def test_positions_without_index(self) -> None:
+        """Test that inlier positions are returned for points without indexes.
+
+        :return: None
+        """
+        x = np.arange(0, 10, dtype=float)
+        cloud = line2d.PointCloud2D(np.concatenate((x, x)), np.concatenate((2 * x, 2 * x + 30)))
+        params = ransac.RansacParams(samples=2, iterations=100, confidence=0.999, threshold=0.5,
+                                     seed=1)
+
+        lines = multi.find_multiple_lines(cloud, params, max_models=5, min_support=5)
+
+        self.assertEqual(sorted(tuple(inliers.tolist()) for _, inliers in lines),
+                         [tuple(range(0, 10)), tuple(range(10, 20))])
+
+    def test_max_models(self) -> None:
+        """Test that no more than max_models lines are found.
+
+        :return: None
+        """
+        points = [line2d.Point2D(x, y) for y in range(0, 4) for x in range(0, 10)]
+        params = ransac.RansacParams(samples=2, iterations=100, confidence=0.999, threshold=0.1,
+                                     seed=0)
+
+        self.assertEqual(len(multi.find_multiple_lines(points, params, max_models=2,
+                                                       min_support=5)), 2)
+
+    def test_min_support(self) -> None:
+        """Test that lines with too few supporters are not returned.
+
+        :return: None
+        """
+        points = [line2d.Point2D(x, x) for x in range(0, 10)]
+        points += [line2d.Point2D(0, 5), line2d.Point2D(5, 0)]
+        params = ransac.RansacParams(samples=2, iterations=100, confidence=0.999, threshold=0.1,
+                                     seed=0)
+
+        lines = multi.find_multiple_lines(points, params, max_models=5, min_support=3)
+
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(lines[0][1].tolist(), list(range(0, 10)))
+
+    def test_samples(self) -> None:
+        """Test that samples other than pairs are rejected.
+
+        :return: None
+        """
+        params = ransac.RansacParams(samples=3, iterations=10, confidence=0.99, threshold=1)
+        with self.assertRaises(ValueError):
+            multi.find_multiple_lines([line2d.Point2D(0, 0)] * 3, params, max_models=1,
+                                      min_support=1)
+
+    def test_deadline(self) -> None:
+        """Test that no batch is run once the deadline has passed.
+
+        :return: None
+        """
+        points = [line2d.Point2D(x, x) for x in range(0, 20)]
+        points += [line2d.Point2D(x, 200) for x in range(0, 10)]
+        params = ransac.RansacParams(samples=2, iterations=200, confidence=0.999, threshold=0.5,
+                                     seed=0, deadline=time.monotonic() - 1)
+
+        self.assertEqual(multi.find_multiple_lines(points, params, max_models=5, min_support=5), [])
+
+        params.deadline = None
+        params.time_budget = 60
+        self.assertEqual(len(multi.find_multiple_lines(points, params, max_models=5,
+                                                       min_support=5)), 2)
+
+
+class TestFindLinesJlinkage(unittest.TestCase):
+    """Test J-linkage multiple line fitting.
+
+    """
+    def test_find_crossing_lines(self) -> None:
+        """Test that two crossing lines are found with their points.
+
+        :return: None
+        """
+        x = np.arange(-10, 11, dtype=float)
+        cloud = line2d.PointCloud2D(np.concatenate((x, x + 0.5, [3, -7])),
+                                    np.concatenate((x, 0.5 - 2 * x, [20, 15])))
+        params = ransac.RansacParams(samples=2, iterations=300, confidence=0.99, threshold=0.1,
+                                     seed=0)
+
+        lines = multi.find_lines_jlinkage(cloud, params, min_support=5)
+
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(sorted(tuple(inliers.tolist()) for _, inliers in lines),
+                         [tuple(range(0, 21)), tuple(range(21, 42))])
+        self.assertEqual(sorted(round(line.slope, 6) for line, _ in lines), [-2, 1])
+
+    def test_small_memory_budget(self) -> None:
+        """Test that clustering a chunk of rows at a time finds the same lines.
+
+        :return: None
+        """
+        x = np.arange(-10, 11, dtype=float)
+        cloud = line2d.PointCloud2D(np.concatenate((x, x + 0.5, [3, -7])),
+                                    np.concatenate((x, 0.5 - 2 * x, [20, 15])))
+        params = ransac.RansacParams(samples=2, iterations=300, confidence=0.99, threshold=0.1,
+                                     seed=0)
+
+        expected = multi.find_lines_jlinkage(cloud, params, min_support=5)
+        lines = multi.find_lines_jlinkage(cloud, params, min_support=5, memory_budget=64)
+
+        self.assertEqual([inliers.tolist() for _, inliers in lines],
+                         [inliers.tolist() for _, inliers in expected])
+
+    def test_index(self) -> None:
+        """Test that the points' indexes are returned.
+
+        :return: None
+        """
+        points = [line2d.Point2D(x, 3 * x, 10 + x) for x in range(0, 10)]
+        params = ransac.RansacParams(samples=2, iterations=50, confidence=0.99, threshold=0.1,
+                                     seed=0)
+
+        lines = multi.find_lines_jlinkage(points, params, min_support=5)
+
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(lines[0][1].tolist(), list(range(10, 20)))
+
+    def test_min_support(self) -> None:
+        """Test that clusters with too few points are not returned.
+
+        :return: None
+        """
+        points = [line2d.Point2D(x, x) for x in range(0, 4)]
+        params = ransac.RansacParams(samples=2, iterations=50, confidence=0.99, threshold=0.1,
+                                     seed=0)
+
+        self.assertEqual(multi.find_lines_jlinkage(points, params, min_support=5), [])
+
+    def test_too_few_points(self) -> None:
+        """Test that no lines are found in fewer points than a sample.
+
+        :return: None
+        """
+        params = ransac.RansacParams(samples=2, iterations=50, confidence=0.99, threshold=0.1)
+
+        self.assertEqual(multi.find_lines_jlinkage([line2d.Point2D(0, 0)], params, min_support=1),
+                         [])
+
+    def test_deadline(self) -> None:
+        """Test that no clusters are merged once the deadline has passed.
+
+        :return: None
+        """
+        points = [line2d.Point2D(x, 3 * x) for x in range(0, 10)]
+        params = ransac.RansacParams(samples=2, iterations=50, confidence=0.99, threshold=0.1,
+                                     seed=0, deadline=time.monotonic() - 1)
+
+        self.assertEqual(multi.find_lines_jlinkage(points, params, min_support=2), [])
+
+        params.deadline = None
+        params.time_budget = 60
+        self.assertEqual(len(multi.find_lines_jlinkage(points, params, min_support=2)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
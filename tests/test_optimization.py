@@ -0,0 +1,181 @@
+"""Test cases for the optimization module.
+
+This module contains tests for the local optimisation stages.
+"""
+
+# Standard library imports
+import unittest
+
+# Third party imports
+import numpy as np
+
+# Local application imports
+from pyransac import base
+from pyransac import line2d
+from pyransac import optimization
+from pyransac import ransac
+
+
+class _AbsoluteModel(base.Model):
+    """Scalar model without a fit method.
+
+    """
+    def __init__(self):
+        self.centre = 0
+
+    def make_model(self, points) -> None:
+        self.centre = points[0]
+
+    def calc_error(self, point) -> float:
+        return abs(point - self.centre)
+
+
+class TestLeastSquaresOptimizer(unittest.TestCase):
+    """Test the iterated least squares optimiser.
+
+    """
+    def setUp(self) -> None:
+        """Make 500 points on y = 2x + 1 with noise of 0.2, close to the
+        0.5 threshold so that lines through two of them miss many others,
+        and 500 outliers.
+
+        :return: None
+        """
+        rng = np.random.default_rng(0)
+        x = np.concatenate((rng.uniform(0, 100, 500), rng.uniform(0, 100, 500)))
+        y = np.concatenate((2 * x[:500] + 1 + rng.normal(0, 0.2, 500), rng.uniform(0, 200, 500)))
+
+        self.cloud = line2d.PointCloud2D(x, y)
+        self.outliers = np.arange(1000) >= 500
+
+    def test_optimize_grows_support(self) -> None:
+        """Test that refining a rough hypothesis gains supporters.
+
+        :return: None
+        """
+        test_model = line2d.Line2D(slope=2.02, y_int=0, x_int=0)
+        supporters = np.flatnonzero(test_model.calc_errors(self.cloud) <= 0.5)
+        optimizer = optimization.LeastSquaresOptimizer()
+        optimizer.reset(test_model, self.cloud, 0.5, np.random.default_rng(0))
+
+        inliers = optimizer.optimize(test_model, supporters)
+
+        self.assertGreater(len(inliers), len(supporters))
+        self.assertAlmostEqual(test_model.slope, 2, places=2)
+
+    def test_optimize_never_loses_support(self) -> None:
+        """Test that the supporters are kept when refits do not help.
+
+        :return: None
+        """
+        test_model = line2d.Line2D(slope=2, y_int=1, x_int=-0.5)
+        supporters = np.arange(0, len(self.cloud))
+        optimizer = optimization.LeastSquaresOptimizer()
+        optimizer.reset(test_model, self.cloud, 0.5, np.random.default_rng(0))
+
+        self.assertIs(optimizer.optimize(test_model, supporters), supporters)
+
+    def test_reset_requires_fit(self) -> None:
+        """Test that models without a fit method are rejected up front.
+
+        :return: None
+        """
+        params = ransac.RansacParams(samples=1, iterations=10, confidence=0.99, threshold=0.5)
+
+        with self.assertRaisesRegex(TypeError, '_AbsoluteModel must implement fit'):
+            ransac.find_inliers([1, 2, 3], _AbsoluteModel(), params,
+                                local_optimizer=optimization.LeastSquaresOptimizer())
+
+    def test_find_inliers_local_optimization(self) -> None:
+        """Test that find_inliers leaves the model fitted to the inliers.
+
+        :return: None
+        """
+        test_model = line2d.Line2D()
+        ransac_params = ransac.RansacParams(samples=2,
+                                            iterations=1000,
+                                            confidence=0.999,
+                                            threshold=0.5,
+                                            seed=0)
+
+        inliers = ransac.find_inliers(points=self.cloud,
+                                      model=test_model,
+                                      params=ransac_params,
+                                      local_optimizer=optimization.LeastSquaresOptimizer())
+
+        self.assertAlmostEqual(test_model.slope, 2, places=2)
+        self.assertAlmostEqual(test_model.y_int, 1, places=0)
+        np.testing.assert_array_equal(test_model.calc_errors(inliers) <= 0.5, True)
+        self.assertGreater(len(inliers), (~self.outliers).sum() * 0.95)
+
+
+class TestGraphCutOptimizer(unittest.TestCase):
+    """Test the graph-cut optimiser.
+
+    """
+    def setUp(self) -> None:
+        rng = np.random.default_rng(0)
+        x = rng.uniform(0, 50, 500)
+        outliers_x = rng.uniform(60, 100, 100)
+
+        # An isolated point within the threshold of the line, far from its other points
+        self.isolated = line2d.Point2D(90, 181 + 0.45 * np.sqrt(5))
+        self.cloud = line2d.PointCloud2D(
+            np.concatenate((x, outliers_x, [self.isolated.x])),
+            np.concatenate((2 * x + 1 + rng.normal(0, 0.1, 500), rng.uniform(100, 200, 100),
+                            [self.isolated.y])))
+
+    def test_label_drops_isolated_points(self) -> None:
+        """Test that the minimum cut labels the isolated supporter an outlier.
+
+        :return: None
+        """
+        test_model = line2d.Line2D(slope=2, y_int=1, x_int=-0.5)
+        supporters = np.flatnonzero(test_model.calc_errors(self.cloud) <= 0.5)
+        optimizer = optimization.GraphCutOptimizer()
+        optimizer.reset(test_model, self.cloud, 0.5, np.random.default_rng(0))
+
+        inliers = optimizer.select_inliers(test_model, supporters)
+
+        self.assertIn(len(self.cloud) - 1, supporters)
+        self.assertNotIn(len(self.cloud) - 1, inliers)
+        self.assertGreaterEqual(len(inliers), 495)
+        self.assertTrue(set(inliers.tolist()) <= set(supporters.tolist()))
+
+    def test_optimize_grows_support(self) -> None:
+        """Test that refining a rough hypothesis gains supporters.
+
+        :return: None
+        """
+        test_model = line2d.Line2D(slope=2.01, y_int=1, x_int=0)
+        supporters = np.flatnonzero(test_model.calc_errors(self.cloud) <= 0.3)
+        optimizer = optimization.GraphCutOptimizer()
+        optimizer.reset(test_model, self.cloud, 0.3, np.random.default_rng(0))
+
+        inliers = optimizer.optimize(test_model, supporters)
+
+        self.assertGreater(len(inliers), len(supporters))
+        self.assertAlmostEqual(test_model.slope, 2, places=2)
+
+    def test_find_inliers_graph_cut(self) -> None:
+        """Test that find_inliers leaves out the isolated supporter.
+
+        :return: None
+        """
+        ransac_params = ransac.RansacParams(samples=2,
+                                            iterations=1000,
+                                            confidence=0.999,
+                                            threshold=0.5,
+                                            seed=0)
+
+        inliers = ransac.find_inliers(points=self.cloud,
+                                      model=line2d.Line2D(),
+                                      params=ransac_params,
+                                      local_optimizer=optimization.GraphCutOptimizer())
+
+        self.assertNotIn(self.isolated, inliers.to_points())
+        self.assertGreaterEqual(len(inliers), 495)
+
+
+if __name__ == '__main__':
+    unittest.main()
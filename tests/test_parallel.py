@@ -0,0 +1,162 @@
+"""Test cases for the parallel module.
+
+This module contains tests for the process-pool RANSAC function.
+"""
+
+# Standard library imports
+from concurrent import futures
+from time import monotonic
+import unittest
+
+# Third party imports
+import numpy as np
+
+# Local application imports
+from pyransac import line2d
+from pyransac import parallel
+from pyransac import ransac
+from pyransac import stats
+
+
+class TestParallel(unittest.TestCase):
+    """Test the parallel module.
+
+    """
+    def setUp(self) -> None:
+        """Make an indexed cloud of 250 points on y = 2x + 1 followed by 250
+        outliers, so that the inliers of different runs compare by index.
+
+        :return: None
+        """
+        rng = np.random.default_rng(0)
+        x = np.concatenate((np.linspace(0, 100, 250), rng.uniform(0, 100, 250)))
+        y = np.concatenate((2 * x[:250] + 1 + rng.normal(0, 0.1, 250), rng.uniform(0, 200, 250)))
+
+        self.cloud = line2d.PointCloud2D(x, y, np.arange(500))
+        self.params = ransac.RansacParams(samples=2,
+                                          iterations=200,
+                                          confidence=0.999,
+                                          threshold=0.5,
+                                          seed=7)
+
+    def test_find_inliers_parallel(self) -> None:
+        """Test that the parallel function finds the line.
+
+        :return: None
+        """
+        inliers = parallel.find_inliers_parallel(self.cloud, line2d.Line2D(), self.params,
+                                                 n_workers=1, batch_size=16)
+
+        self.assertGreater(len(inliers), 240)
+        np.testing.assert_allclose(inliers.y, 2 * inliers.x + 1, atol=1.5)
+
+    def test_reproducible_across_workers(self) -> None:
+        """Test that results for a seed do not depend on the worker count.
+
+        :return: None
+        """
+        results = [parallel.find_inliers_parallel(self.cloud, line2d.Line2D(), self.params,
+                                                  n_workers=n_workers, batch_size=16)
+                   for n_workers in (1, 2)]
+
+        self.assertEqual(results[0].index.tolist(), results[1].index.tolist())
+
+    def test_stats(self) -> None:
+        """Test that merged blocks are counted in the statistics.
+
+        :return: None
+        """
+        run_stats = stats.RansacStats()
+
+        inliers = parallel.find_inliers_parallel(self.cloud, line2d.Line2D(), self.params,
+                                                 n_workers=1, batch_size=16, stats=run_stats)
+
+        self.assertEqual(run_stats.best_support[-1][1], len(inliers))
+        self.assertEqual(run_stats.hypotheses_scored % 16, 0)
+        self.assertEqual(run_stats.iterations, run_stats.hypotheses_scored)
+        self.assertFalse(run_stats.timed_out)
+        self.assertGreaterEqual(run_stats.confidence, self.params.confidence)
+
+    def test_concurrent_calls(self) -> None:
+        """Test that in-process runs in several threads do not share state.
+
+        :return: None
+        """
+        expected = parallel.find_inliers_parallel(self.cloud, line2d.Line2D(), self.params,
+                                                  n_workers=1, batch_size=16)
+
+        with futures.ThreadPoolExecutor(4) as executor:
+            results = list(executor.map(
+                lambda _: parallel.find_inliers_parallel(self.cloud, line2d.Line2D(), self.params,
+                                                         n_workers=1, batch_size=16), range(8)))
+
+        for inliers in results:
+            self.assertEqual(inliers.index.tolist(), expected.index.tolist())
+
+    def test_merge_blocks_deadline(self) -> None:
+        """Test that no block is merged after the deadline.
+
+        :return: None
+        """
+        merged = []
+
+        def results():
+            for block in range(10):
+                merged.append(block)
+                yield 16, block + 1, np.array([block, block + 1])
+
+        best_support, best_sample = parallel._merge_blocks(results(), 500, self.params,
+                                                           deadline=monotonic() - 1)
+
+        self.assertEqual(merged, [0])
+        self.assertEqual(best_support, 1)
+        self.assertEqual(best_sample.tolist(), [0, 1])
+
+    def test_time_budget(self) -> None:
+        """Test that pending blocks are cancelled once the time budget is spent.
+
+        :return: None
+        """
+        # A tiny threshold keeps the iteration bound from stopping the run
+        params = ransac.RansacParams(samples=2, iterations=200000, confidence=1 - 1e-12,
+                                     threshold=1e-9, seed=7, time_budget=0.2)
+        run_stats = stats.RansacStats()
+
+        start = monotonic()
+        inliers = parallel.find_inliers_parallel(self.cloud, line2d.Line2D(), params,
+                                                 n_workers=2, batch_size=16, stats=run_stats)
+
+        self.assertLess(monotonic() - start, 3)
+        self.assertIsInstance(inliers, line2d.PointCloud2D)
+        self.assertTrue(run_stats.timed_out)
+        self.assertLess(run_stats.confidence, params.confidence)
+
+    def test_time_budget_running_blocks(self) -> None:
+        """Test that the pool does not wait for running blocks once out of time.
+
+        :return: None
+        """
+        rng = np.random.default_rng(0)
+        cloud = line2d.PointCloud2D(rng.uniform(0, 100, 20000), rng.uniform(0, 100, 20000))
+        params = ransac.RansacParams(samples=2, iterations=10 ** 6, confidence=1 - 1e-12,
+                                     threshold=1e-9, seed=7, time_budget=0.1)
+
+        # Each block of 4096 hypotheses takes over a second to score
+        start = monotonic()
+        parallel.find_inliers_parallel(cloud, line2d.Line2D(), params, n_workers=2, batch_size=4096)
+
+        self.assertLess(monotonic() - start, 1)
+
+    def test_too_few_points(self) -> None:
+        """Test that a single point has no inliers.
+
+        :return: None
+        """
+        inliers = parallel.find_inliers_parallel([line2d.Point2D(1, 1)], line2d.Line2D(),
+                                                 self.params, n_workers=1)
+
+        self.assertEqual(inliers, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,11 +4,16 @@ This module contains tests for the ransac module.
 """
 
 # Standard library imports
+import time
 import unittest
 
+# Third party imports
+import numpy as np
+
 # Local application imports
 from pyransac import ransac
 from pyransac import line2d
+from pyransac import stats
 
 
 class TestRansac(unittest.TestCase):
@@ -29,6 +34,38 @@ class TestRansac(unittest.TestCase):
         self.assertEqual(params.iterations, 2)
         self.assertEqual(params.confidence, 3)
         self.assertEqual(params.threshold, 4)
+        self.assertIsNone(params.seed)
+
+    def test_ransac_params_make_rng(self) -> None:
+        """Test that RansacParams makes reproducible generators.
+
+        :return: None
+        """
+        params = ransac.RansacParams(samples=2, iterations=1, confidence=0.9, threshold=1, seed=5)
+        generator = np.random.default_rng(3)
+
+        self.assertEqual(params.make_rng().integers(1000, size=5).tolist(),
+                         params.make_rng().integers(1000, size=5).tolist())
+        self.assertIs(ransac.RansacParams(2, 1, 0.9, 1, seed=generator).make_rng(), generator)
+
+    def test_find_inliers_seed_reproducible(self) -> None:
+        """Test that find_inliers gives the same result for the same seed.
+
+        :return: None
+        """
+        rng = np.random.default_rng(0)
+        test_data = [line2d.Point2D(x, y) for x, y in rng.uniform(0, 10, (50, 2))]
+
+        results = [ransac.find_inliers(points=test_data,
+                                       model=line2d.Line2D(),
+                                       params=ransac.RansacParams(samples=2,
+                                                                  iterations=5,
+                                                                  confidence=0.999,
+                                                                  threshold=0.5,
+                                                                  seed=11))
+                   for _ in range(2)]
+
+        self.assertEqual(results[0], results[1])
 
     def test_find_inliers(self) -> None:
         """Test the ransac find_inliers function.
@@ -54,6 +91,138 @@ class TestRansac(unittest.TestCase):
 
         self.assertEqual(sorted(test_inliers), sorted(inliers))
 
+    def test_find_inliers_point_cloud(self) -> None:
+        """Test that find_inliers accepts and returns point clouds.
+
+        :return: None
+        """
+        test_inliers = [line2d.Point2D(x, x, x) for x in range(0, 10)]
+        test_outliers = [line2d.Point2D(5, 1, 10),
+                         line2d.Point2D(6, 1, 11)]
+        test_data = line2d.PointCloud2D.from_points(test_inliers + test_outliers)
+        ransac_params = ransac.RansacParams(samples=2,
+                                            iterations=10,
+                                            confidence=0.999,
+                                            threshold=1)
+
+        inliers = ransac.find_inliers(points=test_data,
+                                      model=line2d.Line2D(),
+                                      params=ransac_params)
+
+        self.assertIsInstance(inliers, line2d.PointCloud2D)
+        self.assertEqual(sorted(inliers.index.tolist()), list(range(0, 10)))
+
+    def test_find_inliers_array(self) -> None:
+        """Test that (N, 2) arrays of points are accepted and their inlier rows returned.
+
+        :return: None
+        """
+        array = np.column_stack((np.arange(20.), 2 * np.arange(20.) + 1))
+        array[::4, 1] += 10
+        ransac_params = ransac.RansacParams(samples=2, iterations=50, confidence=0.999,
+                                            threshold=0.5, seed=0)
+
+        for find in (ransac.find_inliers, ransac.find_inliers_batched):
+            inliers = find(array, line2d.Line2D(), ransac_params)
+            self.assertIsInstance(inliers, np.ndarray)
+            np.testing.assert_array_equal(inliers, np.delete(array, np.s_[::4], axis=0))
+
+    def test_find_inliers_float32(self) -> None:
+        """Test find_inliers with a float32 point cloud.
+
+        :return: None
+        """
+        rng = np.random.default_rng(0)
+        x = rng.uniform(0, 100, 200)
+        cloud = line2d.PointCloud2D(np.concatenate((x, rng.uniform(0, 100, 100))),
+                                    np.concatenate((0.5 * x + 3, rng.uniform(0, 100, 100))))
+        ransac_params = ransac.RansacParams(samples=2,
+                                            iterations=100,
+                                            confidence=0.999,
+                                            threshold=0.1,
+                                            seed=0)
+
+        inliers = ransac.find_inliers(cloud, line2d.Line2D(), ransac_params)
+        inliers_32 = ransac.find_inliers(cloud.astype(np.float32), line2d.Line2D(), ransac_params)
+
+        self.assertEqual(inliers_32.dtype, np.float32)
+        self.assertGreaterEqual(len(inliers), 200)
+        np.testing.assert_allclose(inliers_32.to_array(), inliers.to_array(), rtol=1e-6)
+
+    def test_find_inliers_batched(self) -> None:
+        """Test the batched find_inliers engine with a small memory budget.
+
+        :return: None
+        """
+        test_inliers = [line2d.Point2D(x, x) for x in range(0, 10)]
+        test_outliers = [line2d.Point2D(5, 1),
+                         line2d.Point2D(5, 2),
+                         line2d.Point2D(6, 1)]
+        ransac_params = ransac.RansacParams(samples=2,
+                                            iterations=100,
+                                            confidence=0.999,
+                                            threshold=1)
+
+        inliers = ransac.find_inliers_batched(points=test_inliers + test_outliers,
+                                              model=line2d.Line2D(),
+                                              params=ransac_params,
+                                              batch_size=16,
+                                              memory_budget=64)
+
+        self.assertEqual(sorted(test_inliers), sorted(inliers))
+
+    def test_find_inliers_batched_too_few_points(self) -> None:
+        """Test that the batched engine returns no inliers for one point.
+
+        :return: None
+        """
+        ransac_params = ransac.RansacParams(samples=2,
+                                            iterations=10,
+                                            confidence=0.999,
+                                            threshold=1)
+
+        inliers = ransac.find_inliers_batched(points=[line2d.Point2D(1, 1)],
+                                              model=line2d.Line2D(),
+                                              params=ransac_params)
+
+        self.assertEqual(inliers, [])
+
+    def test_find_inliers_duplicate_points(self) -> None:
+        """Test that data made of duplicate points does not stall sampling.
+
+        :return: None
+        """
+        test_inliers = [line2d.Point2D(x, x, 2 * x + c) for x in range(0, 2) for c in range(0, 2)]
+        test_data = test_inliers + [line2d.Point2D(5, 1, 10)] * 20
+        ransac_params = ransac.RansacParams(samples=2,
+                                            iterations=50,
+                                            confidence=0.999,
+                                            threshold=1,
+                                            seed=0)
+
+        inliers = ransac.find_inliers(points=test_data,
+                                      model=line2d.Line2D(),
+                                      params=ransac_params)
+
+        self.assertIn(line2d.Point2D(5, 1, 10), inliers)
+
+    def test_find_inliers_identical_points(self) -> None:
+        """Test that data with a single position terminates without inliers.
+
+        :return: None
+        """
+        ransac_params = ransac.RansacParams(samples=2,
+                                            iterations=5,
+                                            confidence=0.999,
+                                            threshold=1,
+                                            seed=0)
+
+        inliers = ransac.find_inliers(points=[line2d.Point2D(1, 1, i) for i in range(0, 5)],
+                                      model=line2d.Line2D(),
+                                      params=ransac_params)
+
+        self.assertEqual(inliers, [])
+
     def test_no_outliers(self) -> None:
         """Test that RANSAC functions given all inliers.
 
@@ -73,6 +242,23 @@ class TestRansac(unittest.TestCase):
 
         self.assertEqual(sorted(test_data), sorted(inliers))
 
+    def test_iteration_bound_large_population(self) -> None:
+        """Test that the iteration bound stays finite for billions of points.
+
+        :return: None
+        """
+        ransac_params = ransac.RansacParams(samples=2,
+                                            iterations=1000,
+                                            confidence=0.999,
+                                            threshold=1)
+        bound = ransac._iteration_bound  # pylint: disable=protected-access
+
+        for support in (2, 18, 10 ** 6):
+            self.assertEqual(bound(support, 2.5e9, ransac_params), 1000)
+        self.assertEqual(bound(0, 2.5e9, ransac_params), 1000)
+        self.assertEqual(bound(2.5e9, 2.5e9, ransac_params), 0)
+        self.assertAlmostEqual(bound(5, 10, ransac_params), 24.01, places=2)
+
     def test_empty_point_list(self):
         """Test case where the point list is empty.
 
@@ -104,6 +290,63 @@ class TestRansac(unittest.TestCase):
         self.assertTrue(all(r[0] >= 0 for r in results))
         self.assertTrue(len(results) <= 10)
 
+    def test_top_k(self):
+        """Test that find_inliers_custom returns params.top_k models, best first.
+
+        The results should match keeping every model and sorting them all.
+        """
+        points = [line2d.Point2D(i, i + (i % 3) * 0.3) for i in range(0, 30)]
+        params = ransac.RansacParams(samples=2, iterations=300, confidence=0.95, threshold=0.5,
+                                     expected_angle=45, top_k=4, seed=3)
+        verbose_params = ransac.RansacParams(samples=2, iterations=300, confidence=0.95,
+                                             threshold=0.5, expected_angle=45, top_k=300, seed=3)
+
+        results = ransac.find_inliers_custom(points, line2d.Line2D(), params)
+        all_results = ransac.find_inliers_custom(points, line2d.Line2D(), verbose_params)
+
+        self.assertEqual(len(results), 4)
+        self.assertEqual(results, all_results[:4])
+        self.assertEqual([r[0] for r in results], sorted([r[0] for r in results], reverse=True))
+
+    def test_duplicate_threshold(self):
+        """Test that near-identical models are returned only once.
+
+        """
+        points = [line2d.Point2D(i, i) for i in range(0, 10)]
+        points += [line2d.Point2D(i, i + 5) for i in range(0, 10)]
+        params = ransac.RansacParams(samples=2, iterations=500, confidence=0.95, threshold=0.5,
+                                     expected_angle=45, top_k=10, seed=0, duplicate_threshold=0.1)
+
+        results = ransac.find_inliers_custom(points, line2d.Line2D(), params)
+
+        lines = []
+        for _, sample_points, _ in results:
+            line = line2d.Line2D()
+            line.make_model(sample_points)
+            self.assertFalse(any(line.equals_within_threshold(other, 0.1) for other in lines))
+            lines.append(line)
+        self.assertEqual(len(results[0][2]), 10)
+        self.assertEqual(len(results[1][2]), 10)
+
+    def test_duplicate_threshold_horizontal(self):
+        """Test that near-identical horizontal models are returned only once.
+
+        """
+        rng = np.random.default_rng(0)
+        points = [line2d.Point2D(x, 5 + rng.normal(0, 0.05)) for x in rng.uniform(0, 50, 50)]
+        params = ransac.RansacParams(samples=2, iterations=200, confidence=0.95, threshold=0.5,
+                                     expected_angle=0, top_k=5, seed=0, duplicate_threshold=1)
+
+        results = ransac.find_inliers_custom(points, line2d.Line2D(), params)
+
+        self.assertEqual([len(supporters) for _, _, supporters in results].count(50), 1)
+        lines = []
+        for _, sample_points, _ in results:
+            line = line2d.Line2D()
+            line.make_model(sample_points)
+            self.assertFalse(any(line.is_duplicate(other, 1) for other in lines))
+            lines.append(line)
+
     def test_tolerance(self):
         """Test case for the model angle tolerance.
 
@@ -116,6 +359,124 @@ class TestRansac(unittest.TestCase):
         ransac.find_inliers_custom(points, model, params)
         self.assertTrue(abs(model.angle - params.expected_angle) < 10)
 
+    def test_angle_tolerance(self):
+        """Test that find_inliers_custom uses the angle tolerance in `RansacParams`.
+
+        Only the steeper of two lines is within a 5 degree tolerance of 60 degrees.
+        """
+        points = [line2d.Point2D(i, 2 * i) for i in range(0, 10)]
+        points += [line2d.Point2D(i, i + 50) for i in range(0, 10)]
+        params = ransac.RansacParams(samples=2, iterations=100, confidence=0.95, threshold=0.5,
+                                     expected_angle=60, angle_tolerance=5, seed=0)
+
+        results = ransac.find_inliers_custom(points, line2d.Line2D(), params)
+
+        self.assertTrue(results)
+        for _, sample_points, _ in results:
+            line = line2d.Line2D()
+            line.make_model(sample_points)
+            self.assertLess(abs(line.angle - 60), 5)
+        self.assertEqual(len(results[0][2]), 10)
+
+
+class TestTimeBudget(unittest.TestCase):
+    """Test the time budget and deadline of RANSAC runs.
+
+    """
+    def setUp(self) -> None:
+        """Make a horizontal line of 1% of the points, and a 0.1 s time
+        budget far too short to reach the confidence on it.
+
+        :return: None
+        """
+        rng = np.random.default_rng(1)
+        x = rng.uniform(0, 100, 1500)
+        y = rng.uniform(0, 100, 1500)
+        y[:15] = 50
+        self.cloud = line2d.PointCloud2D(x, y)
+        self.params = ransac.RansacParams(samples=2, iterations=10 ** 9, confidence=1 - 1e-12,
+                                          threshold=0.01, expected_angle=0, time_budget=0.1, seed=0)
+
+    def test_make_deadline(self) -> None:
+        """Test that the earlier of time_budget and deadline is used.
+
+        :return: None
+        """
+        self.assertIsNone(ransac.RansacParams(2, 1, 0.9, 1).make_deadline())
+        self.assertEqual(ransac.RansacParams(2, 1, 0.9, 1, deadline=5.).make_deadline(), 5.)
+
+        start = time.monotonic()
+        deadline = ransac.RansacParams(2, 1, 0.9, 1, time_budget=10.,
+                                       deadline=start + 100).make_deadline()
+        self.assertGreaterEqual(deadline, start + 10)
+        self.assertLess(deadline, start + 100)
+
+    def test_find_inliers_time_budget(self) -> None:
+        """Test that find_inliers returns the best inliers so far when out of time.
+
+        :return: None
+        """
+        run_stats = stats.RansacStats()
+
+        start = time.monotonic()
+        inliers = ransac.find_inliers(self.cloud, line2d.Line2D(), self.params, stats=run_stats)
+
+        self.assertLess(time.monotonic() - start, 5)
+        self.assertEqual(len(inliers), run_stats.best_support[-1][1])
+        self.assertTrue(run_stats.timed_out)
+        self.assertGreater(run_stats.confidence, 0)
+        self.assertLess(run_stats.confidence, self.params.confidence)
+
+    def test_find_inliers_custom_deadline(self) -> None:
+        """Test that find_inliers_custom stops at a deadline.
+
+        :return: None
+        """
+        run_stats = stats.RansacStats()
+        self.params.time_budget = None
+        self.params.deadline = time.monotonic() + 0.1
+
+        results = ransac.find_inliers_custom(self.cloud, line2d.Line2D(), self.params,
+                                             stats=run_stats)
+
+        self.assertTrue(results)
+        self.assertTrue(run_stats.timed_out)
+        self.assertLess(run_stats.confidence, self.params.confidence)
+
+    def test_find_inliers_batched_time_budget(self) -> None:
+        """Test that find_inliers_batched stops when out of time.
+
+        :return: None
+        """
+        run_stats = stats.RansacStats()
+
+        start = time.monotonic()
+        inliers = ransac.find_inliers_batched(self.cloud, line2d.Line2D(), self.params,
+                                              stats=run_stats)
+
+        self.assertLess(time.monotonic() - start, 5)
+        self.assertEqual(len(inliers), run_stats.best_support[-1][1])
+        self.assertTrue(run_stats.timed_out)
+        self.assertEqual(run_stats.hypotheses_scored, run_stats.iterations)
+        self.assertGreater(run_stats.confidence, 0)
+        self.assertLess(run_stats.confidence, self.params.confidence)
+
+    def test_confidence_reached(self) -> None:
+        """Test that runs stopped by the confidence bound reach the confidence.
+
+        :return: None
+        """
+        run_stats = stats.RansacStats()
+        params = ransac.RansacParams(samples=2, iterations=10 ** 6, confidence=0.99,
+                                     threshold=0.01, seed=0)
+        points = [line2d.Point2D(x, x) for x in range(10)]
+        points += [line2d.Point2D(3, 0), line2d.Point2D(0, 5)]
+
+        ransac.find_inliers(points, line2d.Line2D(), params, stats=run_stats)
+
+        self.assertFalse(run_stats.timed_out)
+        self.assertGreaterEqual(run_stats.confidence, params.confidence)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,276 @@
+"""Test cases for the sampling module.
+
+This module contains tests for the minimal sample generators.
+"""
+
+# Standard library imports
+import math
+import time
+import unittest
+
+# Third party imports
+import numpy as np
+
+# Local application imports
+from pyransac import line2d
+from pyransac import ransac
+from pyransac import sampling
+
+
+class TestUniformSampler(unittest.TestCase):
+    """Test the uniform sampler.
+
+    """
+    def test_draw_distinct(self) -> None:
+        """Test that samples hold distinct indexes within range.
+
+        :return: None
+        """
+        sampler = sampling.UniformSampler()
+        sampler.reset(range(0, 3), 2, np.random.default_rng(0))
+
+        for _ in range(0, 100):
+            sample = sampler.draw()
+            self.assertEqual(len(set(sample.tolist())), 2)
+            self.assertTrue(((sample >= 0) & (sample < 3)).all())
+
+    def test_no_iteration_bound(self) -> None:
+        """Test that the uniform sampler imposes no extra iteration bound.
+
+        :return: None
+        """
+        self.assertEqual(sampling.UniformSampler().max_iterations(np.arange(3), 0.99), math.inf)
+
+
+class TestProsacSampler(unittest.TestCase):
+    """Test the PROSAC sampler.
+
+    """
+    def test_first_samples_use_best_points(self) -> None:
+        """Test that the first sample is made of the highest quality points.
+
+        :return: None
+        """
+        sampler = sampling.ProsacSampler([0.1, 0.9, 0.5, 0.8])
+        sampler.reset(range(0, 4), 2, np.random.default_rng(0))
+
+        self.assertEqual(sorted(sampler.draw().tolist()), [1, 3])
+
+    def test_sampled_set_grows(self) -> None:
+        """Test that later samples are drawn from all points.
+
+        :return: None
+        """
+        sampler = sampling.ProsacSampler(np.arange(20), max_samples=50)
+        sampler.reset(range(0, 20), 2, np.random.default_rng(0))
+
+        drawn = {int(i) for _ in range(0, 500) for i in sampler.draw()}
+
+        self.assertEqual(drawn, set(range(0, 20)))
+
+    def test_quality_length(self) -> None:
+        """Test that a quality score is needed for every point.
+
+        :return: None
+        """
+        sampler = sampling.ProsacSampler([1, 2])
+
+        self.assertRaises(ValueError, sampler.reset, range(0, 3), 2, np.random.default_rng(0))
+
+    def test_max_iterations(self) -> None:
+        """Test the PROSAC termination bound for random and non-random support.
+
+        :return: None
+        """
+        sampler = sampling.ProsacSampler(np.arange(100, 0, -1), max_samples=200)
+        sampler.reset(range(0, 100), 2, np.random.default_rng(0))
+
+        self.assertEqual(sampler.max_iterations(np.arange(0, 50), 0.99), math.inf)
+
+        for _ in range(0, 200):
+            sampler.draw()
+
+        self.assertEqual(sampler.max_iterations(np.arange(0, 50), 0.99), 200)
+        self.assertEqual(sampler.max_iterations(np.array([0, 99]), 0.99), math.inf)
+
+    def test_max_iterations_small_sets(self) -> None:
+        """Test that the few top points cannot stop the search on their own.
+
+        :return: None
+        """
+        sampler = sampling.ProsacSampler(np.arange(100, 0, -1), max_samples=200)
+        sampler.reset(range(0, 100), 2, np.random.default_rng(0))
+
+        for _ in range(0, 10):
+            sampler.draw()
+
+        self.assertEqual(sampler.max_iterations(np.arange(0, 100), 0.99), math.inf)
+
+    def test_find_inliers_prosac_support(self) -> None:
+        """Test that PROSAC finds at least the support of uniform sampling.
+
+        The best quality scores belong to the inliers of a noisy line, so
+        any line through a few of them supports all of the top points.
+
+        :return: None
+        """
+        for seed in range(0, 5):
+            rng = np.random.default_rng(seed)
+            x = rng.uniform(0, 100, 5000)
+            y = rng.uniform(0, 100, 5000)
+            y[:1500] = 0.7 * x[:1500] + 10 + rng.normal(0, 0.3, 1500)
+            quality = np.where(np.arange(0, 5000) < 1500, rng.uniform(0.5, 1, 5000),
+                               rng.uniform(0, 0.6, 5000))
+            cloud = line2d.PointCloud2D(x, y)
+            params = ransac.RansacParams(samples=2, iterations=10000, confidence=0.99, threshold=1,
+                                         seed=seed)
+
+            prosac = ransac.find_inliers(cloud, line2d.Line2D(), params,
+                                         sampler=sampling.ProsacSampler(quality))
+            uniform = ransac.find_inliers(cloud, line2d.Line2D(), params)
+
+            self.assertGreaterEqual(len(prosac), len(uniform))
+
+    def test_find_inliers_prosac(self) -> None:
+        """Test find_inliers with a PROSAC sampler.
+
+        :return: None
+        """
+        test_inliers = [line2d.Point2D(x, x) for x in range(0, 10)]
+        test_outliers = [line2d.Point2D(5, 1),
+                         line2d.Point2D(5, 2),
+                         line2d.Point2D(6, 1)]
+        quality = [1] * len(test_inliers) + [0] * len(test_outliers)
+        ransac_params = ransac.RansacParams(samples=2,
+                                            iterations=10,
+                                            confidence=0.999,
+                                            threshold=1,
+                                            seed=0)
+
+        inliers = ransac.find_inliers(points=test_inliers + test_outliers,
+                                      model=line2d.Line2D(),
+                                      params=ransac_params,
+                                      sampler=sampling.ProsacSampler(quality))
+
+        self.assertEqual(sorted(test_inliers), sorted(inliers))
+
+
+class TestAngularSampler(unittest.TestCase):
+    """Test the angle-constrained sampler.
+
+    """
+    def test_draw_within_tolerance(self) -> None:
+        """Test that every sample makes a line within the angle tolerance.
+
+        :return: None
+        """
+        rng = np.random.default_rng(0)
+        points = [line2d.Point2D(x, y) for x, y in rng.uniform(0, 100, size=(200, 2))]
+        sampler = sampling.AngularSampler(30, 2)
+        sampler.reset(points, 2, np.random.default_rng(1))
+
+        for _ in range(0, 200):
+            sample = sampler.draw()
+            line = line2d.Line2D()
+            line.make_model([points[j] for j in sample])
+            self.assertLess(abs(line.angle - 30), 2)
+
+    def test_sample_size(self) -> None:
+        """Test that samples other than pairs are rejected.
+
+        :return: None
+        """
+        with self.assertRaises(ValueError):
+            sampling.AngularSampler(30, 2).reset([line2d.Point2D(0, 0)] * 3, 3,
+                                                 np.random.default_rng(0))
+
+    def test_no_valid_pairs(self) -> None:
+        """Test that a uniform sample is drawn if no pair is within tolerance.
+
+        :return: None
+        """
+        points = [line2d.Point2D(0, y) for y in range(0, 5)]
+        sampler = sampling.AngularSampler(0, 10, batch=16)
+        sampler.reset(points, 2, np.random.default_rng(0))
+
+        sample = sampler.draw()
+        self.assertEqual(len(set(sample.tolist())), 2)
+
+    def test_no_valid_pairs_searched_once(self) -> None:
+        """Test that a run without pairs within tolerance stops searching for them.
+
+        Every sample of coincident points is redrawn, so searching again
+        for each draw would take minutes.
+
+        :return: None
+        """
+        points = [line2d.Point2D(1, 1)] * 10
+        params = ransac.RansacParams(samples=2, iterations=100, confidence=0.999, threshold=0.5,
+                                     expected_angle=45, seed=0)
+
+        start = time.monotonic()
+        results = ransac.find_inliers_custom(points, line2d.Line2D(), params)
+
+        self.assertEqual(results, [])
+        self.assertLess(time.monotonic() - start, 5)
+
+
+class TestNapsacSampler(unittest.TestCase):
+    """Test the NAPSAC sampler.
+
+    """
+    def test_draw_neighbours(self) -> None:
+        """Test that samples are drawn from the neighbours of their first point.
+
+        :return: None
+        """
+        points = [line2d.Point2D(x, 0) for x in range(0, 100)]
+        sampler = sampling.NapsacSampler(neighbours=4)
+        sampler.reset(points, 3, np.random.default_rng(0))
+
+        for _ in range(0, 300):
+            sample = sampler.draw()
+            self.assertEqual(len(set(sample.tolist())), 3)
+            self.assertLessEqual(np.ptp(sample), 8)
+
+    def test_isolated_points(self) -> None:
+        """Test that a uniform sample is drawn if no neighbour is within radius.
+
+        :return: None
+        """
+        points = [line2d.Point2D(10 * x, 0) for x in range(0, 5)]
+        sampler = sampling.NapsacSampler(radius=1)
+        sampler.reset(points, 2, np.random.default_rng(0))
+
+        distances = set()
+        for _ in range(0, 100):
+            sample = sampler.draw()
+            self.assertEqual(len(set(sample.tolist())), 2)
+            distances.add(abs(int(sample[0]) - int(sample[1])))
+        self.assertGreater(len(distances), 1)
+
+    def test_find_inliers_napsac(self) -> None:
+        """Test find_inliers with a NAPSAC sampler on a short line segment.
+
+        :return: None
+        """
+        rng = np.random.default_rng(0)
+        test_inliers = [line2d.Point2D(50 + x / 10, 20 + x / 10) for x in range(0, 20)]
+        test_outliers = [line2d.Point2D(x, y) for x, y in rng.uniform(0, 100, size=(400, 2))
+                         if abs(x - y - 30) > 1]
+        ransac_params = ransac.RansacParams(samples=2,
+                                            iterations=200,
+                                            confidence=0.999,
+                                            threshold=0.05,
+                                            seed=0)
+
+        inliers = ransac.find_inliers(points=test_inliers + test_outliers,
+                                      model=line2d.Line2D(),
+                                      params=ransac_params,
+                                      sampler=sampling.NapsacSampler())
+
+        self.assertEqual(sorted(test_inliers), sorted(inliers))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+"""Test cases for the scoring module.
+
+This module contains tests for the hypothesis scoring functions.
+"""
+
+# Standard library imports
+import unittest
+
+# Third party imports
+import numpy as np
+
+# Local application imports
+from pyransac import line2d
+from pyransac import ransac
+from pyransac import scoring
+
+
+def _cloud() -> line2d.PointCloud2D:
+    """Make a noisy line with outliers.
+
+    :return: point cloud whose first 100 points are on the line y = 2x + 1
+    """
+    rng = np.random.default_rng(0)
+    x = rng.uniform(0, 10, 100)
+    return line2d.PointCloud2D(np.concatenate((x, rng.uniform(0, 10, 50))),
+                               np.concatenate((2 * x + 1 + rng.normal(0, 0.05, 100),
+                                               rng.uniform(0, 21, 50))))
+
+
+class TestScorers(unittest.TestCase):
+    """Test the scoring functions.
+
+    """
+    def test_msac_loss(self) -> None:
+        """Test that the MSAC loss is the squared error truncated at the threshold.
+
+        :return: None
+        """
+        scorer = scoring.MsacScorer()
+        scorer.reset(None, 2)
+
+        self.assertEqual(scorer.loss(np.array([0, 1, 2, 3])).tolist(), [0, 1, 4, 4])
+
+    def test_losses_increase(self) -> None:
+        """Test that every loss grows with the error.
+
+        :return: None
+        """
+        errors = np.linspace(0, 3, 31)
+        for scorer in (scoring.MsacScorer(), scoring.MlesacScorer(),
+                       scoring.MagsacScorer(), scoring.MagsacScorer(dof=4)):
+            scorer.reset(_cloud(), 1)
+            self.assertTrue((np.diff(scorer.loss(errors)) >= 0).all())
+
+    def test_magsac_outlier_loss(self) -> None:
+        """Test that the MAGSAC++ loss is constant above the threshold.
+
+        :return: None
+        """
+        scorer = scoring.MagsacScorer()
+        scorer.reset(None, 1)
+        losses = scorer.loss(np.array([0, 0.999, 1, 2, 100]))
+
+        self.assertEqual(losses[0], 0)
+        self.assertAlmostEqual(losses[1], losses[2])
+        self.assertEqual(losses[2], losses[3])
+        self.assertEqual(losses[3], losses[4])
+
+    def test_subclass_without_init(self) -> None:
+        """Test that scorers without their own __init__ have a threshold before reset.
+
+        :return: None
+        """
+        class _Truncated(scoring.Scorer):
+            def loss(self, errors: np.ndarray) -> np.ndarray:
+                return np.minimum(errors, self._threshold)
+
+        self.assertEqual(_Truncated().score(np.array([1., 2.])), 0)
+
+    def test_magsac_dof(self) -> None:
+        """Test that fewer than 2 degrees of freedom are rejected.
+
+        :return: None
+        """
+        with self.assertRaises(ValueError):
+            scoring.MagsacScorer(dof=1)
+
+    def test_score_batch(self) -> None:
+        """Test that each row of a batch of errors is scored separately.
+
+        :return: None
+        """
+        scorer = scoring.MsacScorer()
+        scorer.reset(None, 1)
+
+        self.assertEqual(scorer.score(np.array([[0, 0.5, 2], [1, 1, 1]])).tolist(), [-1.25, -3])
+
+    def test_find_inliers_scorers(self) -> None:
+        """Test that find_inliers finds the line with every scorer.
+
+        :return: None
+        """
+        cloud = _cloud()
+        params = ransac.RansacParams(samples=2, iterations=200, confidence=0.999, threshold=0.2,
+                                     seed=0)
+
+        for scorer in (scoring.MsacScorer(), scoring.MlesacScorer(), scoring.MagsacScorer()):
+            inliers = ransac.find_inliers(cloud, line2d.Line2D(), params, scorer=scorer)
+            self.assertGreaterEqual(len(inliers), 95)
+            self.assertTrue((np.abs(inliers.y - 2 * inliers.x - 1) < 0.5).all())
+
+    def test_find_inliers_batched_scorer(self) -> None:
+        """Test that find_inliers_batched ranks hypotheses with a scorer.
+
+        :return: None
+        """
+        cloud = _cloud()
+        params = ransac.RansacParams(samples=2, iterations=200, confidence=0.999, threshold=0.2,
+                                     seed=0)
+
+        inliers = ransac.find_inliers_batched(cloud, line2d.Line2D(), params, memory_budget=1024,
+                                              scorer=scoring.MagsacScorer())
+
+        self.assertGreaterEqual(len(inliers), 95)
+
+    def test_find_inliers_batched_duplicates(self) -> None:
+        """Test that samples of coincident points do not hide a batch's best hypothesis.
+
+        :return: None
+        """
+        x = np.repeat(np.arange(10.), 5)
+        cloud = line2d.PointCloud2D(x, 2 * x + 1)
+
+        for scorer in (scoring.MsacScorer(), scoring.MlesacScorer(), scoring.MagsacScorer()):
+            for seed in range(20):
+                params = ransac.RansacParams(samples=2, iterations=64, confidence=0.999,
+                                             threshold=0.2, seed=seed)
+                with np.errstate(all='raise'):
+                    inliers = ransac.find_inliers_batched(cloud, line2d.Line2D(), params,
+                                                          scorer=scorer)
+                self.assertEqual(len(inliers), 50)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+"""Test cases for the stats module.
+
+This module contains tests for the RANSAC run statistics.
+"""
+
+# Standard library imports
+import unittest
+
+# Third party imports
+import numpy as np
+
+# Local application imports
+from pyransac import line2d
+from pyransac import ransac
+from pyransac import stats
+
+
+class TestRansacStats(unittest.TestCase):
+    """Test the RansacStats class.
+
+    """
+    def setUp(self) -> None:
+        """Make a line with outliers.
+
+        :return: None
+        """
+        rng = np.random.default_rng(0)
+        self.points = [line2d.Point2D(x, 2 * x + 1) for x in range(20)] + \
+            [line2d.Point2D(x, y) for x, y in rng.uniform(0, 40, (10, 2))]
+
+    def test_find_inliers(self) -> None:
+        """Test that find_inliers fills in the statistics and calls the callback.
+
+        :return: None
+        """
+        exported = []
+        run_stats = stats.RansacStats(callback=exported.append)
+        params = ransac.RansacParams(samples=2, iterations=200, confidence=0.99, threshold=0.1,
+                                     seed=1)
+
+        inliers = ransac.find_inliers(self.points, line2d.Line2D(), params, stats=run_stats)
+
+        self.assertEqual(exported, [run_stats])
+        self.assertEqual(len(inliers), 20)
+        self.assertLess(run_stats.iterations, 200)
+        self.assertEqual(run_stats.termination_iteration, run_stats.iterations)
+        self.assertEqual(run_stats.hypotheses_generated, run_stats.iterations)
+        self.assertEqual(run_stats.hypotheses_scored, run_stats.iterations)
+        self.assertEqual(run_stats.best_support[-1][1], 20)
+        supports = [support for _, support in run_stats.best_support]
+        self.assertEqual(supports, sorted(supports))
+        phases = {'setup', 'sampling', 'model', 'scoring', 'finalization'}
+        self.assertTrue(phases <= set(run_stats.timings))
+        self.assertTrue(all(t >= 0 for t in run_stats.timings.values()))
+
+    def test_degenerate_retries(self) -> None:
+        """Test that redrawn degenerate samples are counted.
+
+        :return: None
+        """
+        run_stats = stats.RansacStats()
+        points = [line2d.Point2D(1, 1)] * 20 + [line2d.Point2D(2, 3)]
+        params = ransac.RansacParams(samples=2, iterations=20, confidence=0.99, threshold=0.1,
+                                     seed=0)
+
+        ransac.find_inliers(points, line2d.Line2D(), params, stats=run_stats)
+
+        self.assertGreater(run_stats.degenerate_retries, 0)
+        self.assertEqual(run_stats.hypotheses_generated, run_stats.iterations)
+
+    def test_reset(self) -> None:
+        """Test that statistics are reset between runs.
+
+        :return: None
+        """
+        run_stats = stats.RansacStats()
+        params = ransac.RansacParams(samples=2, iterations=200, confidence=0.99, threshold=0.1,
+                                     seed=1)
+
+        ransac.find_inliers(self.points, line2d.Line2D(), params, stats=run_stats)
+        first = (run_stats.hypotheses_generated, list(run_stats.best_support))
+        ransac.find_inliers(self.points, line2d.Line2D(), params, stats=run_stats)
+
+        self.assertEqual((run_stats.hypotheses_generated, run_stats.best_support), first)
+
+    def test_find_inliers_custom(self) -> None:
+        """Test that find_inliers_custom fills in the statistics.
+
+        :return: None
+        """
+        run_stats = stats.RansacStats()
+        params = ransac.RansacParams(samples=2, iterations=30, confidence=0.99, threshold=0.1,
+                                     expected_angle=63.43, seed=0)
+
+        results = ransac.find_inliers_custom(self.points, line2d.Line2D(), params, stats=run_stats)
+
+        self.assertEqual(len(results[0][2]), 20)
+        self.assertEqual(run_stats.iterations, 30)
+        self.assertEqual(run_stats.hypotheses_generated, 30)
+        self.assertGreater(run_stats.hypotheses_scored, 0)
+        self.assertEqual(run_stats.best_support[-1][1], 20)
+        self.assertIn('verification', run_stats.timings)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+"""Test cases for the streaming module.
+
+This module contains tests for the streaming RANSAC class.
+"""
+
+# Standard library imports
+import unittest
+
+# Third party imports
+import numpy as np
+
+# Local application imports
+from pyransac import line2d
+from pyransac import streaming
+
+
+def _make_batch(rng: np.random.Generator, start: int, slope: float) -> line2d.PointCloud2D:
+    """Make a batch of points on a line with half of them outliers.
+
+    """
+    x = rng.uniform(0, 100, 200)
+    y = slope * x + 1 + rng.normal(0, 0.05, 200)
+    outliers = rng.random(200) < 0.5
+    y[outliers] = rng.uniform(-200, 200, outliers.sum())
+    return line2d.PointCloud2D(x, y, np.arange(start, start + 200))
+
+
+class TestStreamingRansac(unittest.TestCase):
+    """Test the streaming RANSAC class.
+
+    """
+    def test_empty(self) -> None:
+        """Test that an empty window has no best model.
+
+        :return: None
+        """
+        stream = streaming.StreamingRansac(threshold=0.5, seed=0)
+
+        self.assertIsNone(stream.best_model)
+        self.assertEqual(stream.support, 0)
+        self.assertEqual(len(stream.inliers()), 0)
+
+    def test_add(self) -> None:
+        """Test that the best model is found as batches are added.
+
+        :return: None
+        """
+        rng = np.random.default_rng(0)
+        stream = streaming.StreamingRansac(threshold=0.5, seed=0)
+
+        for start in range(0, 2000, 200):
+            stream.add(_make_batch(rng, start, 2))
+
+        self.assertEqual(len(stream), 2000)
+        self.assertAlmostEqual(stream.best_model.slope, 2, places=1)
+        self.assertEqual(len(stream.inliers()), stream.support)
+
+    def test_support_matches_full_scan(self) -> None:
+        """Test that incremental support counts match a full rescan.
+
+        :return: None
+        """
+        rng = np.random.default_rng(1)
+        stream = streaming.StreamingRansac(threshold=0.5, pool_size=8, seed=1)
+        batches = [_make_batch(rng, start, 1) for start in range(0, 2000, 200)]
+
+        for batch in batches:
+            stream.add(batch)
+        for batch in batches[:5]:
+            stream.remove(batch)
+
+        window = line2d.PointCloud2D(np.concatenate([batch.x for batch in batches[5:]]),
+                                     np.concatenate([batch.y for batch in batches[5:]]))
+        model = stream.best_model
+
+        self.assertEqual(len(stream), 1000)
+        self.assertEqual(stream.support, np.count_nonzero(model.calc_errors(window) <= 0.5))
+
+    def test_window_follows_stream(self) -> None:
+        """Test that the best model follows a change of line in the stream.
+
+        :return: None
+        """
+        rng = np.random.default_rng(2)
+        stream = streaming.StreamingRansac(threshold=0.5, refresh_rate=16, seed=2)
+        batches = []
+
+        for start in range(0, 8000, 200):
+            batches.append(_make_batch(rng, start, 1 if start < 4000 else -1))
+            stream.add(batches[-1])
+            if len(batches) > 5:
+                stream.remove(batches.pop(0))
+
+        self.assertAlmostEqual(stream.best_model.slope, -1, places=1)
+        self.assertTrue((stream.inliers().index >= 4000).all())
+
+    def test_remove_unknown_point(self) -> None:
+        """Test that removing a point outside the window raises an error.
+
+        :return: None
+        """
+        stream = streaming.StreamingRansac(threshold=0.5)
+        stream.add([line2d.Point2D(1, 1), line2d.Point2D(2, 2)])
+
+        self.assertRaises(ValueError, stream.remove, [line2d.Point2D(3, 3)])
+
+    def test_remove_unknown_point_keeps_window(self) -> None:
+        """Test that a batch with an unknown point leaves the window unchanged.
+
+        :return: None
+        """
+        stream = streaming.StreamingRansac(threshold=0.5, seed=0)
+        stream.add([line2d.Point2D(i, i) for i in range(0, 20)])
+
+        self.assertRaises(ValueError, stream.remove,
+                          [line2d.Point2D(0, 0), line2d.Point2D(1, 1), line2d.Point2D(99, 99)])
+        self.assertEqual(len(stream), 20)
+        self.assertEqual(stream.support, 20)
+
+        stream.remove([line2d.Point2D(0, 0), line2d.Point2D(1, 1)])
+        self.assertEqual(len(stream), 18)
+        self.assertEqual(stream.support, 18)
+
+    def test_remove_duplicate_points(self) -> None:
+        """Test that a batch cannot remove a point more times than it was added.
+
+        :return: None
+        """
+        stream = streaming.StreamingRansac(threshold=0.5)
+        stream.add([line2d.Point2D(1, 1), line2d.Point2D(2, 2)])
+
+        self.assertRaises(ValueError, stream.remove, [line2d.Point2D(1, 1), line2d.Point2D(1, 1)])
+        self.assertEqual(len(stream), 2)
+
+    def test_mixed_indexes(self) -> None:
+        """Test that points keep their own index when others in the batch have none.
+
+        :return: None
+        """
+        stream = streaming.StreamingRansac(threshold=0.5)
+        stream.add([line2d.Point2D(0, 0, 0), line2d.Point2D(1, 1)])
+
+        stream.remove([line2d.Point2D(0, 0, 0)])
+
+        self.assertEqual(len(stream), 1)
+        self.assertRaises(ValueError, stream.remove, [line2d.Point2D(0, 0)])
+
+
+if __name__ == '__main__':
+    unittest.main()
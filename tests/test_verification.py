@@ -0,0 +1,118 @@
+"""Test cases for the verification module.
+
+This module contains tests for the hypothesis pre-verification tests.
+"""
+
+# Standard library imports
+import unittest
+from unittest import mock
+
+# Third party imports
+import numpy as np
+
+# Local application imports
+from pyransac import line2d
+from pyransac import ransac
+from pyransac import verification
+
+
+class TestVerification(unittest.TestCase):
+    """Test the verification module.
+
+    """
+    def setUp(self) -> None:
+        """Make 600 points on y = x among 1400 outliers, so that most
+        hypotheses are bad and pre-verification has some to reject.
+
+        :return: None
+        """
+        rng = np.random.default_rng(0)
+        x = rng.uniform(0, 100, 2000)
+        y = np.concatenate((x[:600] + rng.normal(0, 0.1, 600), rng.uniform(0, 100, 1400)))
+
+        self.cloud = line2d.PointCloud2D(x, y)
+        self.good_model = line2d.Line2D(slope=1, y_int=0, x_int=0)
+        self.bad_model = line2d.Line2D(slope=-1, y_int=300, x_int=300)
+
+    def test_tdd_verifier(self) -> None:
+        """Test that the T(d,d) test rejects a line supported by no points.
+
+        :return: None
+        """
+        verifier = verification.TddVerifier(d=3)
+        verifier.reset(self.cloud, 0.5, np.random.default_rng(0))
+
+        self.assertFalse(verifier.is_promising(self.bad_model))
+
+    def test_sprt_verifier(self) -> None:
+        """Test that SPRT accepts the true line and rejects a bad line.
+
+        :return: None
+        """
+        verifier = verification.SprtVerifier()
+        verifier.reset(self.cloud, 0.5, np.random.default_rng(0))
+
+        self.assertTrue(verifier.is_promising(self.good_model))
+        self.assertFalse(verifier.is_promising(self.bad_model))
+
+    def test_sprt_verified_support(self) -> None:
+        """Test that SPRT keeps the support of the hypotheses it passes.
+
+        :return: None
+        """
+        verifier = verification.SprtVerifier()
+        verifier.reset(self.cloud, 0.5, np.random.default_rng(0))
+
+        self.assertTrue(verifier.is_promising(self.good_model))
+        self.assertEqual(verifier.verified_support(),
+                         np.count_nonzero(self.good_model.calc_errors(self.cloud) <= 0.5))
+        self.assertFalse(verifier.is_promising(self.bad_model))
+        self.assertIsNone(verifier.verified_support())
+        self.assertIsNone(verification.TddVerifier().verified_support())
+
+    def test_sprt_verifier_list_input(self) -> None:
+        """Test that SPRT works on data that is not array-backed.
+
+        :return: None
+        """
+        verifier = verification.SprtVerifier(chunk=4)
+        verifier.reset(self.cloud.to_points()[:100], 0.5, np.random.default_rng(0))
+
+        self.assertFalse(verifier.is_promising(self.bad_model))
+
+    def test_find_inliers_with_verifiers(self) -> None:
+        """Test that find_inliers finds the line with each verifier.
+
+        :return: None
+        """
+        ransac_params = ransac.RansacParams(samples=2, iterations=1000, confidence=0.999,
+                                            threshold=0.5, seed=0)
+
+        for verifier in (verification.TddVerifier(), verification.SprtVerifier()):
+            inliers = ransac.find_inliers(points=self.cloud,
+                                          model=line2d.Line2D(),
+                                          params=ransac_params,
+                                          verifier=verifier)
+
+            self.assertGreater(len(inliers), 550)
+            np.testing.assert_allclose(inliers.y, inliers.x, atol=1)
+
+    def test_sprt_not_scored_twice(self) -> None:
+        """Test that hypotheses passed by SPRT are not scored again.
+
+        :return: None
+        """
+        ransac_params = ransac.RansacParams(samples=2, iterations=1000, confidence=0.999,
+                                            threshold=0.5, seed=0)
+
+        wrapped = ransac._score  # pylint: disable=protected-access
+        with mock.patch.object(ransac, '_score', wraps=wrapped) as score:
+            inliers = ransac.find_inliers(self.cloud, line2d.Line2D(), ransac_params,
+                                          verifier=verification.SprtVerifier())
+
+        self.assertGreater(len(inliers), 550)
+        self.assertEqual(score.call_count, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()